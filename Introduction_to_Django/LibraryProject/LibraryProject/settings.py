@@ -38,9 +38,13 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'bookshelf',
+    'django_perf.instrumentation',
+    'django_perf.benchmarks',
+    'benchmarks',
 ]
 
 MIDDLEWARE = [
+    'django_perf.instrumentation.middleware.InstrumentationMiddleware',  # outermost, so it times everything
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -121,3 +125,8 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Query and latency instrumentation (django_perf/instrumentation/middleware.py)
+INSTRUMENTATION_SAMPLE_RATE = 1.0 if DEBUG else 0.1  # share of requests whose queries are recorded
+INSTRUMENTATION_SERVER_TIMING = True  # Server-Timing header on sampled responses to INTERNAL_IPS (any in DEBUG)
+INSTRUMENTATION_METRICS_TOKEN = None  # bearer token for /metrics/; unset: INTERNAL_IPS only (any in DEBUG)
@@ -0,0 +1,25 @@
+"""
+Benchmark scenarios for the bookshelf, whose only pages are the admin's:
+the book changelist browsed, searched and filtered.
+"""
+from django.contrib.auth.models import User
+from django.core.management.base import CommandError
+from django.utils.http import urlencode
+
+from bookshelf.models import Book
+from django_perf.benchmarks.runner import Scenario
+
+
+def get_scenarios():
+    admin = User.objects.filter(is_superuser=True).order_by('id').first()
+    book = Book.objects.order_by('id').first()
+    if admin is None or book is None:
+        raise CommandError("Nothing to benchmark; run `manage.py seed_benchmark` first.")
+    last_page = max(1, -(-Book.objects.count() // 100))  # the changelist's default page size
+    return [
+        Scenario('admin-book-changelist', '/admin/bookshelf/book/', user=admin),
+        Scenario('admin-book-last-page', f'/admin/bookshelf/book/?p={last_page}', user=admin),
+        Scenario('admin-book-search', '/admin/bookshelf/book/?q=latency', user=admin),
+        Scenario('admin-book-by-year', f'/admin/bookshelf/book/?publication_year={book.publication_year}', user=admin),
+        Scenario('admin-book-by-author', '/admin/bookshelf/book/?' + urlencode({'author': book.author}), user=admin),
+    ]
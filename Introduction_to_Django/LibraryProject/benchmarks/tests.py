@@ -0,0 +1,26 @@
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from bookshelf.models import Book
+
+
+class BenchmarkTests(TestCase):
+    def setUp(self):
+        call_command('seed_benchmark', books=200, authors=20, stdout=StringIO())
+
+    def test_seed(self):
+        self.assertEqual(Book.objects.count(), 200)
+        self.assertLessEqual(Book.objects.values('author').distinct().count(), 20)
+        with self.assertRaises(CommandError):
+            call_command('seed_benchmark', books=1, stdout=StringIO())
+
+    def test_report(self):
+        out = StringIO()
+        call_command('run_benchmarks', repeat=2, warmup=0, stdout=out)
+        report = json.loads(out.getvalue())
+        for name, result in report['scenarios'].items():
+            self.assertEqual(result['status'], 200, name)
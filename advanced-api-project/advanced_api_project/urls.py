@@ -20,4 +20,5 @@ from django.urls import path, include
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('api.urls')),  # include our api endpoints
+    path('metrics/', include('django_perf.instrumentation.urls')),
 ]
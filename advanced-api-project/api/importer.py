@@ -0,0 +1,232 @@
+"""
+Bulk upsert import of book catalogues, shared by ``manage.py import_books``
+and ``POST /api/books/import/``.
+
+Input is CSV (with a header row) or NDJSON (one JSON object per line), read
+as a stream so the catalogue never has to fit in memory. Each row has a
+``title``, a ``publication_year`` and either an ``author`` id or an
+``author_name``; an optional ``id`` makes the row update that book (or
+create it with that id), so an export can be edited and loaded back.
+
+Rows are handled in batches. Each row of a batch is validated by calling
+``BookImportSerializer``'s own fields, ``validate_<field>`` methods and
+``validate`` directly, which skips most of ``Serializer.run_validation``'s
+per-row overhead; only the rows that fail go through ``run_validation``
+itself, to report why they are invalid.
+The batch's authors are resolved with one query for the ids and one for
+the names (plus one insert for names not seen before), and the valid rows
+are written with a single ``bulk_create(update_conflicts=True)`` inside
+their own transaction. Invalid rows are skipped and reported with their row
+number. ``bulk_create`` sends no signals.
+"""
+import codecs
+import csv
+import json
+import time
+from itertools import islice
+
+from django.conf import settings
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from rest_framework import serializers
+from rest_framework.fields import SkipField
+
+from .models import Author, Book
+from .serializers import BookSerializer
+
+FORMATS = ('csv', 'ndjson')
+
+
+def default_batch_size():
+    """Rows per validation batch and per INSERT."""
+    return getattr(settings, 'BOOK_IMPORT_BATCH_SIZE', 5000)
+
+
+def max_errors():
+    """Invalid rows reported in full; the rest are only counted."""
+    return getattr(settings, 'BOOK_IMPORT_MAX_ERRORS', 100)
+
+
+def read_rows(stream, format):
+    """
+    Yield the rows of a binary ``stream`` (anything that iterates over lines
+    of bytes) as dicts. Empty CSV cells are dropped, so optional columns can
+    be left blank; an NDJSON line that is not JSON is yielded as is and
+    fails validation.
+    """
+    lines = codecs.iterdecode(stream, 'utf-8-sig')
+    if format == 'csv':
+        for row in csv.DictReader(lines):
+            yield {key: value for key, value in row.items() if key and value not in ('', None)}
+        return
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield line
+
+
+class BookImportSerializer(BookSerializer):
+    """
+    One imported row. ``author`` ids must exist: ``validate`` checks them
+    against ``context['author_ids']``, which the importer fills with one
+    query per batch. ``author_name`` is resolved after validation.
+    """
+    id = serializers.IntegerField(required=False, min_value=1)
+    author = serializers.IntegerField(required=False, min_value=1)
+    author_name = serializers.CharField(max_length=100, required=False)
+
+    class Meta(BookSerializer.Meta):
+        fields = ['id', 'title', 'publication_year', 'author', 'author_name']
+
+    def validate(self, attrs):
+        if 'author' in attrs:
+            if attrs['author'] not in self.context['author_ids']:
+                message = f'Invalid pk "{attrs["author"]}" - object does not exist.'
+                raise serializers.ValidationError({'author': [message]})
+            attrs['author_id'] = attrs.pop('author')
+            attrs.pop('author_name', None)
+        elif 'author_name' not in attrs:
+            raise serializers.ValidationError({'author': ['This field is required.']})
+        return attrs
+
+
+class ImportStats:
+    def __init__(self):
+        self.rows = self.created = self.updated = self.invalid = 0
+        self.errors = []
+        self.started = time.perf_counter()
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def as_dict(self):
+        return {
+            'rows': self.rows,
+            'created': self.created,
+            'updated': self.updated,
+            'invalid': self.invalid,
+            'errors': self.errors,
+            'seconds': round(self.elapsed, 3),
+        }
+
+
+class BookImporter:
+    """
+    Upsert books from an iterable of row dicts. ``on_batch`` is called with
+    the running ``ImportStats`` after every batch, for progress reports.
+    """
+    update_fields = ['title', 'publication_year', 'author']
+
+    def __init__(self, batch_size=None, on_batch=None):
+        self.batch_size = batch_size or default_batch_size()
+        self.on_batch = on_batch
+        self.serializer = BookImportSerializer(context={'author_ids': set()})
+        self.steps = [
+            (field, getattr(self.serializer, f'validate_{field.field_name}', None))
+            for field in self.serializer._writable_fields
+        ]
+
+    def run(self, rows):
+        stats = ImportStats()
+        rows = iter(rows)
+        explicit_ids = False
+        while batch := list(islice(rows, self.batch_size)):
+            valid = self.validate(batch, stats)
+            if valid:
+                with transaction.atomic():
+                    self.resolve_author_names(valid)
+                    explicit_ids |= self.upsert(valid, stats)
+            stats.rows += len(batch)
+            if self.on_batch is not None:
+                self.on_batch(stats)
+        if explicit_ids:
+            self.reset_sequence()
+        return stats
+
+    def validate(self, batch, stats):
+        """Return the validated attrs of the valid rows, recording the rest."""
+        author_ids = set()
+        for row in batch:
+            if isinstance(row, dict) and row.get('author') not in (None, ''):
+                try:
+                    author_ids.add(int(row['author']))
+                except (TypeError, ValueError):
+                    pass  # reported by the serializer
+        self.serializer.context['author_ids'] = set(
+            Author.objects.filter(pk__in=author_ids).values_list('pk', flat=True)
+        )
+
+        valid = {}
+        for number, row in enumerate(batch, start=stats.rows + 1):
+            attrs = self.check(row)
+            if attrs is None:
+                try:
+                    attrs = self.serializer.run_validation(row)
+                except serializers.ValidationError as exc:
+                    stats.invalid += 1
+                    if len(stats.errors) < max_errors():
+                        stats.errors.append({'row': number, 'errors': exc.detail})
+                    continue
+            # Within a batch the last row for an id wins
+            valid[attrs.get('id', -number)] = attrs
+        return list(valid.values())
+
+    def check(self, row):
+        """
+        The attrs ``BookImportSerializer`` returns for ``row``, from its
+        fields and validators called one by one; None if any of them rejects
+        the row (``run_validation`` then says why).
+        """
+        if type(row) is not dict:
+            return None
+        attrs = {}
+        try:
+            for field, validate in self.steps:
+                if field.field_name not in row:
+                    if field.required:
+                        return None
+                    continue
+                value = field.run_validation(row[field.field_name])
+                attrs[field.source] = validate(value) if validate else value
+            if self.serializer.validators:
+                self.serializer.run_validators(attrs)
+            return self.serializer.validate(attrs)
+        except (serializers.ValidationError, SkipField):
+            return None
+
+    def resolve_author_names(self, valid):
+        """Swap ``author_name`` for an ``author_id``, creating missing authors."""
+        names = {attrs['author_name'] for attrs in valid if 'author_name' in attrs}
+        if not names:
+            return
+        ids = {}
+        for name, pk in Author.objects.filter(name__in=names).order_by('name', 'id').values_list('name', 'id'):
+            ids.setdefault(name, pk)
+        missing = [Author(name=name) for name in names if name not in ids]
+        for author in Author.objects.bulk_create(missing):
+            ids[author.name] = author.pk
+        for attrs in valid:
+            if 'author_name' in attrs:
+                attrs['author_id'] = ids[attrs.pop('author_name')]
+
+    def upsert(self, valid, stats):
+        """Insert or update ``valid``; return whether any row brought its own id."""
+        given = [attrs['id'] for attrs in valid if 'id' in attrs]
+        existing = set(Book.objects.filter(pk__in=given).values_list('pk', flat=True)) if given else set()
+        Book.objects.bulk_create(
+            [Book(**attrs) for attrs in valid],
+            update_conflicts=True, unique_fields=['id'], update_fields=self.update_fields,
+        )
+        stats.updated += len(existing)
+        stats.created += len(valid) - len(existing)
+        return len(given) > len(existing)
+
+    def reset_sequence(self):
+        # Explicit ids do not advance the id sequence on PostgreSQL (no-op on SQLite)
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), [Book]):
+                cursor.execute(sql)
@@ -0,0 +1,42 @@
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.importer import FORMATS, BookImporter, default_batch_size, read_rows
+
+
+class Command(BaseCommand):
+    help = "Bulk upsert books from a CSV or NDJSON file (see api/importer.py)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import, or - for standard input.")
+        parser.add_argument('--format', choices=FORMATS, help="Default: from the file extension.")
+        parser.add_argument('--batch-size', type=int, default=default_batch_size(), help="Rows per batch.")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        format = options['format'] or Path(path).suffix.lstrip('.').lower()
+        if format not in FORMATS:
+            raise CommandError("Cannot tell the format from the file name; pass --format.")
+
+        importer = BookImporter(options['batch_size'], on_batch=self.progress)
+        if path == '-':
+            stats = importer.run(read_rows(sys.stdin.buffer, format))
+        else:
+            try:
+                with open(path, 'rb') as stream:
+                    stats = importer.run(read_rows(stream, format))
+            except OSError as exc:
+                raise CommandError(exc)
+
+        for error in stats.errors:
+            self.stderr.write(f"Row {error['row']}: {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {stats.rows} rows in {stats.elapsed:.1f}s: {stats.created} created, "
+            f"{stats.updated} updated, {stats.invalid} invalid."
+        ))
+
+    def progress(self, stats):
+        rate = stats.rows / stats.elapsed if stats.elapsed else 0
+        self.stdout.write(f"[{stats.elapsed:7.1f}s] {stats.rows} rows ({rate:,.0f}/s), {stats.invalid} invalid")
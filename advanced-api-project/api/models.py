@@ -5,6 +5,10 @@ from django.db import models
 class Author(models.Model):
     name = models.CharField(max_length=100)  # Stores the author's name
 
+    class Meta:
+        # AuthorListView's keyset pagination orders by (name, id)
+        indexes = [models.Index(fields=['name', 'id'], name='author_name_idx')]
+
     def __str__(self):
         return self.name
 
@@ -17,8 +21,23 @@ class Book(models.Model):
     author = models.ForeignKey(
         Author,
         related_name="books",   # Allows reverse lookup: author.books.all()
-        on_delete=models.CASCADE  # Delete books if the related author is deleted
+        on_delete=models.CASCADE,  # Delete books if the related author is deleted
+        db_index=False  # book_author_title_idx below starts with author
     )
 
+    class Meta:
+        # BookListView filters on title, author or publication_year and
+        # orders by title (the default) or publication_year, with the id as
+        # the keyset pagination's tie-breaker (api.pagination). Each index
+        # serves one filter + ordering pair as a single range scan; a title
+        # filter matches a handful of rows and needs no ordering index.
+        indexes = [
+            models.Index(fields=['title', 'id'], name='book_title_idx'),
+            models.Index(fields=['publication_year', 'id'], name='book_year_idx'),
+            models.Index(fields=['publication_year', 'title', 'id'], name='book_year_title_idx'),
+            models.Index(fields=['author', 'title', 'id'], name='book_author_title_idx'),
+            models.Index(fields=['author', 'publication_year', 'id'], name='book_author_year_idx'),
+        ]
+
     def __str__(self):
         return f"{self.title} ({self.publication_year})"
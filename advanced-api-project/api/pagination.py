@@ -0,0 +1,169 @@
+"""
+Keyset (cursor) pagination for the book list.
+
+An unpaginated list renders the whole table, and page number pagination runs
+a ``COUNT(*)`` plus an ``OFFSET`` scan that grows with the page number.
+Keyset pagination instead remembers the sort key of the last row it returned
+and asks for the rows after it, so with an index on the sort key (see the
+indexes on ``Book``) every page is an index range scan no matter how deep it
+is or how big the table grows.
+
+The sort key is whatever ordering the view's ``OrderingFilter`` applied, with
+the primary key appended as a tie-breaker. Clients follow the opaque
+``next``/``previous`` links.
+"""
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def _flip(field):
+    return field[1:] if field.startswith('-') else f'-{field}'
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginate on the queryset's ordering plus the primary key, using opaque
+    cursor tokens.
+
+    The ordering fields must be non-null and hold JSON-native values
+    (strings and numbers), since their values go into the cursor.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+        cursor = self.decode_cursor(request)
+
+        ordering = self.ordering
+        reverse = cursor is not None and cursor[1]
+        if cursor is not None:
+            queryset = queryset.filter(self.after(self.to_python(queryset.model, cursor[0]), reverse))
+        if reverse:
+            ordering = [_flip(field) for field in ordering]
+        rows = list(queryset.order_by(*ordering)[:self.page_size + 1])
+
+        has_more = len(rows) > self.page_size
+        page = rows[:self.page_size]
+        if reverse:
+            page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        self.page = page
+        return page
+
+    def get_ordering(self, queryset):
+        """The queryset's ordering with the primary key appended, if missing."""
+        ordering = [field for field in queryset.query.order_by if isinstance(field, str)]
+        pk_names = {'pk', queryset.model._meta.pk.name}
+        if not any(field.lstrip('-') in pk_names for field in ordering):
+            ordering.append('-pk' if ordering and ordering[0].startswith('-') else 'pk')
+        return ordering
+
+    def to_python(self, model, values):
+        """
+        Convert cursor values with their ordering fields, so a tampered
+        cursor is a 404 instead of an error in the query.
+        """
+        if len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        opts = model._meta
+        converted = []
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip('-')
+            model_field = opts.pk if name == 'pk' else opts.get_field(name)
+            if not isinstance(value, (str, int, float)):
+                raise NotFound(self.invalid_cursor_message)
+            try:
+                value = model_field.to_python(value)
+            except (TypeError, ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+            converted.append(value)
+        return converted
+
+    def after(self, values, reverse=False):
+        """
+        Filter for the rows that sort after ``values`` (before, if
+        ``reverse``): the first key beyond its value, or equal to it and the
+        second key beyond its value, and so on.
+
+        The leading ``>=`` on the first key is implied by the rest; it is
+        spelled out so the database seeks into the index instead of
+        scanning it from the start.
+        """
+        if len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        condition, equal = Q(), {}
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') != reverse else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        first = self.ordering[0]
+        lookup = 'lte' if first.startswith('-') != reverse else 'gte'
+        return Q(**{f'{first.lstrip("-")}__{lookup}': values[0]}) & condition
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    # -----------------------
+    # Cursor tokens
+    # -----------------------
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            data = json.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+            values = data['v']
+            if not isinstance(values, list):
+                raise ValueError(token)
+            return values, bool(data.get('r'))
+        except (TypeError, ValueError, KeyError, UnicodeEncodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, row, reverse=False):
+        data = {'v': [getattr(row, field.lstrip('-')) for field in self.ordering]}
+        if reverse:
+            data['r'] = 1
+        token = base64.urlsafe_b64encode(json.dumps(data, separators=(',', ':')).encode('ascii'))
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, token.decode('ascii'))
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1])
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
@@ -1,11 +1,12 @@
 from rest_framework import serializers
 from .models import Author, Book
+from django_perf.readplan import ReadPlanMixin
 import datetime
 
 
 # BookSerializer is responsible for converting Book model instances into JSON (and vice versa).
 # It also includes validation to prevent invalid data entry.
-class BookSerializer(serializers.ModelSerializer):
+class BookSerializer(ReadPlanMixin, serializers.ModelSerializer):
     class Meta:
         model = Book
         fields = ['id', 'title', 'publication_year', 'author']
@@ -20,9 +21,19 @@ class BookSerializer(serializers.ModelSerializer):
 
 # AuthorSerializer is responsible for serializing Author instances.
 # It includes a nested representation of related books using BookSerializer.
-class AuthorSerializer(serializers.ModelSerializer):
+class AuthorSerializer(ReadPlanMixin, serializers.ModelSerializer):
     books = BookSerializer(many=True, read_only=True)  # Nested serializer
 
     class Meta:
         model = Author
         fields = ['id', 'name', 'books']
+
+
+# AuthorListSerializer is what the author endpoints return: the author with
+# a capped list of books (see AuthorListView) and how many there are in all.
+class AuthorListSerializer(AuthorSerializer):
+    books_count = serializers.IntegerField(read_only=True)
+    books = BookSerializer(many=True, read_only=True, source='newest_books')
+
+    class Meta(AuthorSerializer.Meta):
+        fields = ['id', 'name', 'books_count', 'books']
@@ -1,3 +1,365 @@
-from django.test import TestCase
+import base64
+import csv
+import gzip
+import io
+import json
+import tempfile
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from django_perf import export
+from django_perf.tokencache.authentication import token_cache
+
+from .importer import BookImporter, BookImportSerializer, read_rows
+from .models import Author, Book
+from .pagination import KeysetPagination
+from .serializers import AuthorSerializer
+
+
+class TokenCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        token_cache.local.clear()
+        self.user = User.objects.create_user(username="alice", password="password123")
+        self.client = APIClient()
+        response = self.client.post(
+            reverse("api-token-auth"), {"username": "alice", "password": "password123"}
+        )
+        self.key = response.data["token"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.key}")
+
+    def test_login_primes_cache(self):
+        # Only the book listing itself hits the database
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("book-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_miss_falls_back_to_database(self):
+        cache.clear()
+        token_cache.local.clear()
+        with self.assertNumQueries(2):
+            self.client.get(reverse("book-list"))
+        with self.assertNumQueries(1):
+            self.client.get(reverse("book-list"))
+
+    def test_deleted_token_is_rejected(self):
+        self.client.get(reverse("book-list"))
+        Token.objects.filter(key=self.key).delete()
+        response = self.client.get(reverse("book-list"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_is_rejected(self):
+        self.client.get(reverse("book-list"))
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(reverse("book-list"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class FastJSONTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="alice", password="password123")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        Book.objects.create(title="Süßes Buch", publication_year=2001, author=Author.objects.create(name="Anna"))
+
+    def test_renders_like_drf(self):
+        response = self.client.get(reverse("book-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content, JSONRenderer().render(response.data))
+
+    def test_read_plan_matches_drf(self):
+        planned = self.client.get(reverse("book-list")).content
+        with override_settings(SERIALIZER_READ_PLANS=False):
+            self.assertEqual(self.client.get(reverse("book-list")).content, planned)
+
+    def test_nested_books_match_drf(self):
+        author = Author.objects.get()
+        planned = AuthorSerializer(author).data
+        with override_settings(SERIALIZER_READ_PLANS=False):
+            self.assertEqual(AuthorSerializer(author).data, planned)
+        self.assertEqual(planned["books"][0]["author"], author.id)
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.author = Author.objects.create(name="Anna")
+        # Few distinct titles and years, so pages split runs of equal keys
+        Book.objects.bulk_create(
+            Book(title=f"Book {i % 4}", publication_year=2000 + i % 3, author=self.author) for i in range(25)
+        )
+        self.client = APIClient()
+
+    def walk(self, params):
+        url, pages = reverse("book-list"), []
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append(response.data)
+            url, params = response.data["next"], None
+        return pages
+
+    def test_pages_follow_ordering(self):
+        for ordering, key in [("title", "title"), ("-publication_year", "publication_year")]:
+            pages = self.walk({"ordering": ordering, "page_size": 4})
+            rows = [book for page in pages for book in page["results"]]
+            expected = Book.objects.order_by(ordering, "-id" if ordering.startswith("-") else "id")
+            self.assertEqual([book["id"] for book in rows], [book.id for book in expected])
+            self.assertEqual(len(pages), 7)
+            self.assertIsNone(pages[0]["previous"])
+
+    def test_previous_walks_back(self):
+        pages = self.walk({"page_size": 4})
+        response = self.client.get(pages[-1]["previous"])
+        self.assertEqual(response.data["results"], pages[-2]["results"])
+        response = self.client.get(response.data["previous"])
+        self.assertEqual(response.data["results"], pages[-3]["results"])
+
+    def test_filters_apply_to_every_page(self):
+        pages = self.walk({"publication_year": 2001, "page_size": 3})
+        rows = [book for page in pages for book in page["results"]]
+        self.assertEqual(len(rows), Book.objects.filter(publication_year=2001).count())
+        self.assertEqual({book["publication_year"] for book in rows}, {2001})
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse("book-list"), {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_tampered_cursor_values(self):
+        for url, params, values in [
+            (reverse("book-list"), {"ordering": "publication_year"}, ["x", "y"]),
+            (reverse("book-list"), {"ordering": "publication_year"}, [{"a": 1}, 1]),
+            (reverse("book-list"), {}, [1]),
+            (reverse("author-list"), {}, ["Anna", "zz"]),
+        ]:
+            token = base64.urlsafe_b64encode(json.dumps({"v": values}).encode()).decode()
+            response = self.client.get(url, {**params, "cursor": token})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, values)
+
+    def test_pages_are_index_scans(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("Reads SQLite query plans")
+        pagination = KeysetPagination()
+        for queryset in [
+            Book.objects.order_by("title"),
+            Book.objects.order_by("-publication_year"),
+            Book.objects.filter(author=self.author).order_by("-publication_year"),
+            Book.objects.filter(publication_year=2001).order_by("title"),
+        ]:
+            pagination.ordering = pagination.get_ordering(queryset)
+            first = queryset.order_by(*pagination.ordering).first()
+            values = [getattr(first, field.lstrip("-")) for field in pagination.ordering]
+            for page in [queryset, queryset.filter(pagination.after(values))]:
+                plan = page.order_by(*pagination.ordering)[:21].explain()
+                self.assertIn("USING INDEX", plan)
+                self.assertNotIn("TEMP B-TREE", plan)
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        anna, bob = Author.objects.create(name="Anna"), Author.objects.create(name="Bob")
+        Book.objects.bulk_create(
+            Book(title=f"Book, {i}", publication_year=2000 + i % 2, author=anna if i % 3 else bob) for i in range(30)
+        )
+        self.client = APIClient()
+
+    def export(self, format, params=None, **headers):
+        response = self.client.get(reverse("book-list"), {"export": format, **(params or {})}, **headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return response, b"".join(response.streaming_content)
+
+    def test_csv_follows_filters_and_ordering(self):
+        params = {"publication_year": 2001, "ordering": "-title"}
+        _, body = self.export("csv", params)
+        rows = list(csv.reader(io.StringIO(body.decode())))
+        self.assertEqual(rows[0], ["id", "title", "publication_year", "author"])
+        expected = Book.objects.filter(publication_year=2001).order_by("-title")
+        self.assertEqual(
+            rows[1:], [[str(b.id), b.title, str(b.publication_year), str(b.author_id)] for b in expected]
+        )
+
+    def test_ndjson_matches_list(self):
+        response, body = self.export("ndjson", {"author": Author.objects.get(name="Bob").pk})
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="books.ndjson"')
+        listed = self.client.get(reverse("book-list"), {"author": Author.objects.get(name="Bob").pk, "page_size": 100})
+        self.assertEqual([json.loads(line) for line in body.decode().splitlines()], listed.json()["results"])
+
+    def test_gzip(self):
+        _, plain = self.export("csv")
+        response, body = self.export("csv", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(body), plain)
+
+    def test_ndjson_without_orjson(self):
+        _, fast = self.export("ndjson")
+        with mock.patch.object(export, "orjson", None):
+            _, slow = self.export("ndjson")
+        self.assertEqual(slow, fast)
+
+    def test_streams_in_chunks(self):
+        with mock.patch("api.views.BookListView.export_chunk_size", 7):
+            response = self.client.get(reverse("book-list"), {"export": "ndjson"})
+            chunks = list(response.streaming_content)
+        self.assertEqual([chunk.count(b"\n") for chunk in chunks], [7, 7, 7, 7, 2])
+
+
+@override_settings(AUTHOR_EMBEDDED_BOOKS=3)
+class AuthorEndpointTests(TestCase):
+    def setUp(self):
+        self.authors = [Author.objects.create(name=name) for name in ["Cleo", "Anna", "Bob", "Dan"]]
+        Book.objects.bulk_create(
+            Book(title=f"Book {i}", publication_year=1990 + i, author=author)
+            for n, author in enumerate(self.authors) for i in range(n * 2)
+        )
+        self.client = APIClient()
+
+    def test_list_is_ordered_by_name_with_capped_books(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("author-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data["results"]
+        self.assertEqual([author["name"] for author in results], ["Anna", "Bob", "Cleo", "Dan"])
+        for author in results:
+            books = Book.objects.filter(author_id=author["id"]).order_by("-publication_year", "-id")
+            self.assertEqual(author["books_count"], books.count())
+            self.assertEqual([book["id"] for book in author["books"]], [book.id for book in books[:3]])
+
+    def test_cursor_pages(self):
+        response = self.client.get(reverse("author-list"), {"page_size": 3, "ordering": "-name"})
+        self.assertEqual([author["name"] for author in response.data["results"]], ["Dan", "Cleo", "Bob"])
+        response = self.client.get(response.data["next"])
+        self.assertEqual([author["name"] for author in response.data["results"]], ["Anna"])
+        self.assertIsNone(response.data["next"])
+
+    def test_detail(self):
+        author = self.authors[3]
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("author-detail", args=[author.pk]))
+        self.assertEqual(response.data["books_count"], 6)
+        self.assertEqual([book["publication_year"] for book in response.data["books"]], [1995, 1994, 1993])
+
+    def test_author_without_books(self):
+        response = self.client.get(reverse("author-detail", args=[self.authors[0].pk]))
+        self.assertEqual((response.data["books_count"], response.data["books"]), (0, []))
+
+
+class ImportTests(TestCase):
+    def setUp(self):
+        self.author = Author.objects.create(name="Anna")
+        self.book = Book.objects.create(title="Old title", publication_year=1990, author=self.author)
+        self.user = User.objects.create_user(username="alice", password="password123")
+        self.client = APIClient()
+
+    def run_import(self, text, format, **kwargs):
+        return BookImporter(**kwargs).run(read_rows(io.BytesIO(text.encode()), format))
+
+    def test_csv_creates_books_and_missing_authors(self):
+        stats = self.run_import(
+            "\ufefftitle,publication_year,author,author_name\n"
+            f"First,2001,{self.author.pk},\n"
+            "Second,2002,,Bob\n"
+            "Third,2003,,Bob\n",
+            "csv",
+        )
+        self.assertEqual((stats.rows, stats.created, stats.updated, stats.invalid), (3, 3, 0, 0))
+        bob = Author.objects.get(name="Bob")
+        self.assertEqual(
+            list(Book.objects.filter(title__in=["Second", "Third"]).values_list("author", flat=True)),
+            [bob.pk, bob.pk],
+        )
+        self.assertEqual(Book.objects.get(title="First").author, self.author)
+
+    def test_ndjson_upserts_by_id(self):
+        rows = [
+            {"id": self.book.pk, "title": "New title", "publication_year": 1991, "author": self.author.pk},
+            {"id": 500, "title": "Given id", "publication_year": 2000, "author_name": "Anna"},
+        ]
+        stats = self.run_import("".join(json.dumps(row) + "\n" for row in rows), "ndjson")
+        self.assertEqual((stats.created, stats.updated), (1, 1))
+        self.book.refresh_from_db()
+        self.assertEqual((self.book.title, self.book.publication_year), ("New title", 1991))
+        self.assertEqual(Book.objects.get(pk=500).author, self.author)
+        self.assertEqual(Author.objects.count(), 1)
+
+    def test_invalid_rows_are_reported_and_skipped(self):
+        stats = self.run_import(
+            "title,publication_year,author\n"
+            f"Good,2000,{self.author.pk}\n"
+            f"Future,3000,{self.author.pk}\n"
+            "Orphan,2000,9999\n"
+            "No author,2000,\n",
+            "csv",
+        )
+        self.assertEqual((stats.created, stats.invalid), (1, 3))
+        self.assertEqual([error["row"] for error in stats.errors], [2, 3, 4])
+        self.assertIn("publication_year", stats.errors[0]["errors"])
+        self.assertIn("author", stats.errors[1]["errors"])
+        self.assertFalse(Book.objects.filter(title__in=["Future", "Orphan", "No author"]).exists())
+
+    def test_only_invalid_rows_reach_run_validation(self):
+        rows = [
+            {"title": " Clean ", "publication_year": "2001", "author": str(self.author.pk)},
+            {"title": "Spaced", "publication_year": " 2002 ", "author_name": "Anna"},
+            {"title": "Float", "publication_year": 2003.0, "author_name": "Anna"},
+            {"title": "Null", "publication_year": 2004, "author": None},
+        ]
+        text = "".join(json.dumps(row) + "\n" for row in rows)
+        run_validation = BookImportSerializer.run_validation
+        with mock.patch.object(BookImportSerializer, "run_validation", autospec=True,
+                               side_effect=run_validation) as validate:
+            stats = self.run_import(text, "ndjson")
+        self.assertEqual([call.args[1]["title"] for call in validate.call_args_list], ["Null"])
+        self.assertEqual((stats.created, stats.invalid), (3, 1))
+        self.assertEqual(stats.errors[0]["row"], 4)
+        self.assertEqual(
+            dict(Book.objects.filter(title__in=["Clean", "Spaced", "Float"]).values_list("title", "publication_year")),
+            {"Clean": 2001, "Spaced": 2002, "Float": 2003},
+        )
+
+    def test_bad_ndjson_line(self):
+        stats = self.run_import('{"title": "Broken"\n', "ndjson")
+        self.assertEqual((stats.invalid, stats.errors[0]["row"]), (1, 1))
+
+    def test_queries_per_batch_do_not_grow_with_rows(self):
+        lines = "".join(f"Book {i},2000,,Author {i % 3}\n" for i in range(40))
+        # Per batch: savepoint, author names, books, release; plus one insert of the new authors
+        with self.assertNumQueries(4 * 4 + 1):
+            stats = self.run_import("title,publication_year,author,author_name\n" + lines, "csv", batch_size=10)
+        self.assertEqual(stats.created, 40)
+
+    def test_endpoint(self):
+        url = reverse("book-import")
+        body = f"title,publication_year,author\nPosted,2005,{self.author.pk}\n"
+        response = self.client.post(url, body, content_type="text/csv")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.client.force_authenticate(self.user)
+        response = self.client.post(url, body, content_type="text/csv")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data["created"], response.data["invalid"]), (1, 0))
+        self.assertTrue(Book.objects.filter(title="Posted").exists())
+
+        response = self.client.post(url, body, content_type="application/xml")
+        self.assertEqual(response.status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
+    def test_command(self):
+        out = io.StringIO()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "books.ndjson"
+            path.write_text(f'{{"title": "From file", "publication_year": 2010, "author": {self.author.pk}}}\n')
+            call_command("import_books", str(path), stdout=out)
+        self.assertIn("1 created, 0 updated, 0 invalid", out.getvalue())
+        self.assertTrue(Book.objects.filter(title="From file").exists())
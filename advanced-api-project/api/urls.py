@@ -1,10 +1,14 @@
 from django.urls import path
 from .views import (
+    AuthorDetailView,
+    AuthorListView,
     BookListView,
     BookDetailView,
     BookCreateView,
     BookUpdateView,
     BookDeleteView,
+    BookImportView,
+    CachedObtainAuthToken,
 )
 
 urlpatterns = [
@@ -13,4 +17,8 @@ urlpatterns = [
     path("books/create/", BookCreateView.as_view(), name="book-create"),
     path("books/update/<int:pk>/", BookUpdateView.as_view(), name="book-update"),
     path("books/delete/<int:pk>/", BookDeleteView.as_view(), name="book-delete"),
+    path("books/import/", BookImportView.as_view(), name="book-import"),
+    path("authors/", AuthorListView.as_view(), name="author-list"),
+    path("authors/<int:pk>/", AuthorDetailView.as_view(), name="author-detail"),
+    path("api-token-auth/", CachedObtainAuthToken.as_view(), name="api-token-auth"),
 ]
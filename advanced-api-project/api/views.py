@@ -1,12 +1,30 @@
-from rest_framework import generics
+import logging
+from collections import defaultdict
+
+from rest_framework import generics, filters
+from rest_framework.authtoken.models import Token
+from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.exceptions import UnsupportedMediaType
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
-from django_filters import rest_framework as drf_filters
-from .models import Book
-from .serializers import BookSerializer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from django.conf import settings
+from django.db.models import Count, F, OuterRef, Subquery, Window
+from django.db.models.functions import Coalesce, RowNumber
+from django_filters.rest_framework import DjangoFilterBackend
+from django_perf.tokencache.authentication import prime_token
+from django_perf.export import ExportMixin
+from .importer import BookImporter, read_rows
+from .models import Author, Book
+from .pagination import KeysetPagination
+from .serializers import AuthorListSerializer, BookSerializer
+
+logger = logging.getLogger(__name__)
 
 
-# List all books (read-only for everyone, write restricted)
-class BookListView(generics.ListAPIView):
+# List all books (read-only for everyone, write restricted);
+# ?export=csv|ndjson streams every matching book instead of one page
+class BookListView(ExportMixin, generics.ListAPIView):
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
@@ -18,12 +36,18 @@ class BookListView(generics.ListAPIView):
     filterset_fields = ['title', 'author', 'publication_year']
 
     # Search options
-    search_fields = ['title', 'author']
+    search_fields = ['title', 'author__name']
 
     # Ordering options
     ordering_fields = ['title', 'publication_year']
     ordering = ['title']  # default ordering
 
+    # Cursor pages, each an index range scan (see Book.Meta.indexes)
+    pagination_class = KeysetPagination
+
+    export_fields = ('id', 'title', 'publication_year', 'author')
+    export_filename = 'books'
+
 
 # Get details of a single book
 class BookDetailView(generics.RetrieveAPIView):
@@ -51,3 +75,97 @@ class BookDeleteView(generics.DestroyAPIView):
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     permission_classes = [IsAuthenticated]
+
+
+# Bulk upsert books from a CSV or NDJSON request body (see api.importer)
+class BookImportView(APIView):
+    permission_classes = [IsAuthenticated]
+    formats = {'text/csv': 'csv', 'application/x-ndjson': 'ndjson'}
+
+    def post(self, request):
+        format = self.formats.get(request.content_type.split(';')[0].strip())
+        if format is None:
+            raise UnsupportedMediaType(request.content_type)
+        importer = BookImporter(on_batch=self.progress)
+        stats = importer.run(read_rows(request.stream or (), format))
+        return Response(stats.as_dict())
+
+    def progress(self, stats):
+        logger.info("Book import by %s: %d rows in %.1fs, %d invalid",
+                    self.request.user, stats.rows, stats.elapsed, stats.invalid)
+
+
+def authors_with_counts():
+    """
+    Authors annotated with ``books_count``. The count is a correlated
+    subquery rather than a join + GROUP BY, so it is only computed for the
+    authors on the page (each one a range count on book_author_year_idx).
+    """
+    counts = Book.objects.filter(author=OuterRef('pk')).order_by().values('author').annotate(n=Count('*'))
+    return Author.objects.annotate(books_count=Coalesce(Subquery(counts.values('n')), 0))
+
+
+def attach_newest_books(authors):
+    """
+    Set ``newest_books`` on each author: up to AUTHOR_EMBEDDED_BOOKS of their
+    books, newest first, all fetched in one query.
+
+    The books of the page's authors are numbered per author with
+    ROW_NUMBER() in the order of book_author_year_idx, and only the first
+    ones are kept, so the embedded list is capped in SQL whatever the author
+    has written.
+    """
+    if not authors:
+        return
+    cap = getattr(settings, 'AUTHOR_EMBEDDED_BOOKS', 10)
+    newest = [F('publication_year').desc(), F('id').desc()]
+    ranked = Book.objects.filter(author_id__in=[author.pk for author in authors]).annotate(
+        rank=Window(RowNumber(), partition_by=F('author_id'), order_by=newest),
+    )
+    books = defaultdict(list)
+    for book in ranked.filter(rank__lte=cap).order_by('author_id', *newest):
+        books[book.author_id].append(book)
+    for author in authors:
+        author.newest_books = books[author.pk]
+
+
+# List authors with their newest books, cursor-paginated by name
+class AuthorListView(generics.ListAPIView):
+    serializer_class = AuthorListSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    filter_backends = [filters.OrderingFilter]
+    ordering_fields = ['name']
+    ordering = ['name']  # served by author_name_idx
+    pagination_class = KeysetPagination
+
+    def get_queryset(self):
+        return authors_with_counts()
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        attach_newest_books(page)
+        return page
+
+
+# Get one author with their newest books
+class AuthorDetailView(generics.RetrieveAPIView):
+    serializer_class = AuthorListSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+    def get_queryset(self):
+        return authors_with_counts()
+
+    def get_object(self):
+        author = super().get_object()
+        attach_newest_books([author])
+        return author
+
+
+# Obtain (or look up) a user's token and prime the token cache with it
+class CachedObtainAuthToken(ObtainAuthToken):
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        token, created = Token.objects.get_or_create(user=serializer.validated_data['user'])
+        prime_token(token)
+        return Response({'token': token.key})
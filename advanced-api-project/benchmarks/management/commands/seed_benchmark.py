@@ -0,0 +1,59 @@
+"""
+Seed authors and books for the benchmarks.
+
+Books per author follow a power law (a few prolific authors, a long tail
+of one-book authors) and publication years lean towards recent decades.
+Rows go in with ``bulk_create``.
+
+Use a scratch database: the command refuses to run twice on the same one.
+"""
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.models import Author, Book
+from django_perf.benchmarks.seeding import insert, power_law, sentence
+
+PREFIX = 'Bench'
+
+
+class Command(BaseCommand):
+    help = "Bulk-seed authors and books for the benchmarks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--authors', type=int, default=100_000)
+        parser.add_argument('--books', type=int, default=1_000_000)
+        parser.add_argument('--alpha', type=float, default=0.9, help="Power-law exponent of popularity.")
+        parser.add_argument('--batch-size', type=int, default=5000, help="Rows per INSERT.")
+        parser.add_argument('--seed', type=int, default=42, help="Random seed, for reproducible datasets.")
+
+    def handle(self, *args, **options):
+        if Author.objects.filter(name__startswith=PREFIX).exists():
+            raise CommandError("This database is already seeded; point the settings at a fresh one.")
+        rng = random.Random(options['seed'])
+        n_authors, batch_size = options['authors'], options['batch_size']
+        started = time.perf_counter()
+
+        with transaction.atomic():
+            author_pks = insert(Author, (
+                Author(name=f'{PREFIX} {sentence(rng, 1, 2).title()} {i}') for i in range(n_authors)
+            ), batch_size)
+            self.log(f"Inserted {n_authors} authors", started)
+
+            weights = power_law(n_authors, options['alpha'], rng)
+            insert(Book, (
+                Book(
+                    title=sentence(rng, 2, 7).capitalize(),
+                    publication_year=2024 - int(rng.expovariate(1 / 25)) % 125,
+                    author_id=author_pks[author],
+                )
+                for author in rng.choices(range(n_authors), cum_weights=weights, k=options['books'])
+            ), batch_size)
+            self.log(f"Inserted {options['books']} books", started)
+
+        self.stdout.write(self.style.SUCCESS("Seeded. Run `manage.py run_benchmarks` next."))
+
+    def log(self, message, started):
+        self.stdout.write(f"[{time.perf_counter() - started:7.1f}s] {message}")
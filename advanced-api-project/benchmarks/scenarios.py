@@ -0,0 +1,64 @@
+"""
+Benchmark scenarios for the books API: the list with each declared filter,
+ordering and search, a page deep into the list, the streaming exports and
+the detail view; the author list and detail with their embedded books. And
+the book and author pages ``benchmark_serializers`` renders.
+"""
+import base64
+import json
+
+from django.core.management.base import CommandError
+from django.db.models import Count
+
+from api.models import Author, Book
+from api.serializers import AuthorListSerializer, BookSerializer
+from django_perf.benchmarks.runner import Scenario, SerializerCase
+
+
+def get_scenarios():
+    book = Book.objects.order_by('id').first()
+    if book is None:
+        raise CommandError("No books to benchmark; run `manage.py seed_benchmark` first.")
+    prolific = Author.objects.annotate(n=Count('books')).order_by('-n', 'id').first()
+    # A cursor (see api.pagination) halfway down the default title ordering
+    middle = Book.objects.order_by('title', 'id').values_list('title', 'id')[Book.objects.count() // 2]
+    cursor = base64.urlsafe_b64encode(json.dumps({'v': list(middle)}).encode()).decode()
+    middle_author = Author.objects.order_by('name', 'id').values_list('name', 'id')[Author.objects.count() // 2]
+    author_cursor = base64.urlsafe_b64encode(json.dumps({'v': list(middle_author)}).encode()).decode()
+    return [
+        Scenario('book-list', '/api/books/'),
+        Scenario('book-list-by-author', f'/api/books/?author={prolific.pk}'),
+        Scenario('book-list-deep', f'/api/books/?cursor={cursor}'),
+        Scenario('book-list-by-year', '/api/books/?publication_year=1999'),
+        Scenario('book-list-by-year-oldest', '/api/books/?publication_year=1999&ordering=publication_year'),
+        Scenario('book-list-by-title', f'/api/books/?title={book.title}'),
+        Scenario('book-list-newest', '/api/books/?ordering=-publication_year'),
+        Scenario('book-list-by-author-newest', f'/api/books/?author={prolific.pk}&ordering=-publication_year'),
+        Scenario('book-search', '/api/books/?search=latency'),
+        Scenario('book-export-csv', '/api/books/?export=csv'),
+        Scenario('book-export-ndjson', '/api/books/?export=ndjson'),
+        Scenario('book-export-csv-gzip', '/api/books/?export=csv', headers={'HTTP_ACCEPT_ENCODING': 'gzip'}),
+        Scenario('book-export-by-author', f'/api/books/?export=csv&author={prolific.pk}'),
+        Scenario('book-detail', f'/api/books/{book.pk}/'),
+        Scenario('author-list', '/api/authors/'),
+        Scenario('author-list-deep', f'/api/authors/?cursor={author_cursor}'),
+        Scenario('author-list-by-name-desc', '/api/authors/?ordering=-name'),
+        Scenario('author-detail-prolific', f'/api/authors/{prolific.pk}/'),
+    ]
+
+
+def get_serializer_cases(size):
+    authors = [Author(id=i, name=f'Author {i}') for i in range(1, size + 1)]
+    books = [
+        Book(id=i + 1, title=f'Book number {i} on latency — ünïcode too', publication_year=1950 + i % 70,
+             author=authors[i % size])
+        for i in range(size)
+    ]
+    for author in authors:
+        # An author list page, each embedding its newest books (api.views.attach_newest_books)
+        author.newest_books = books[author.id % size:][:5]
+        author.books_count = 12
+    return {
+        'books': SerializerCase(BookSerializer, books),
+        'authors': SerializerCase(AuthorListSerializer, authors),
+    }
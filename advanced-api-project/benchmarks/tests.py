@@ -0,0 +1,33 @@
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from api.models import Author, Book
+
+
+class BenchmarkTests(TestCase):
+    def setUp(self):
+        call_command('seed_benchmark', authors=30, books=300, stdout=StringIO())
+
+    def test_seed(self):
+        self.assertEqual(Author.objects.count(), 30)
+        self.assertEqual(Book.objects.count(), 300)
+        with self.assertRaises(CommandError):
+            call_command('seed_benchmark', authors=1, books=0, stdout=StringIO())
+
+    def test_report(self):
+        out = StringIO()
+        call_command('run_benchmarks', repeat=2, warmup=0, stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertIn('book-list-by-author', report['scenarios'])
+        for name, result in report['scenarios'].items():
+            self.assertEqual(result['status'], 200, name)
+
+    def test_serializer_benchmark(self):
+        out = StringIO()
+        call_command('benchmark_serializers', sizes=[50], repeat=1, stdout=out)
+        for name, result in json.loads(out.getvalue())['50'].items():
+            self.assertTrue(result['identical_output'], name)
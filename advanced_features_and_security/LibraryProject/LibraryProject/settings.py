@@ -2,6 +2,7 @@
 Django settings for LibraryProject project.
 """
 
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -30,6 +31,9 @@ INSTALLED_APPS = [
     "relationship_app",
     "csp",
     "django_extensions",  # enable runserver_plus
+    "django_perf.instrumentation",
+    "django_perf.benchmarks",
+    "benchmarks",
 ]
 
 
@@ -37,6 +41,7 @@ INSTALLED_APPS = [
 # Middleware
 # -------------------------
 MIDDLEWARE = [
+    "django_perf.instrumentation.middleware.InstrumentationMiddleware",  # outermost, so it times everything
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -113,6 +118,25 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # -------------------------
 AUTH_USER_MODEL = "bookshelf.CustomUser"
 
+# has_perm() answers from the cached permission set (relationship_app/access.py)
+AUTHENTICATION_BACKENDS = ["relationship_app.access.CachedPermissionBackend"]
+
+
+# -------------------------
+# Cache
+# -------------------------
+# Local memory by default; set REDIS_URL to share it between workers.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+if os.environ.get("REDIS_URL"):
+    CACHES["default"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ["REDIS_URL"],
+    }
+
 
 # -------------------------
 # Security Settings
@@ -140,3 +164,11 @@ SECURE_HSTS_PRELOAD = True
 
 # Tell Django to trust the X-Forwarded-Proto header set by the proxy
 SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
+
+# Query and latency instrumentation (django_perf/instrumentation/middleware.py)
+INSTRUMENTATION_SAMPLE_RATE = 1.0 if DEBUG else 0.1  # share of requests whose queries are recorded
+INSTRUMENTATION_SERVER_TIMING = True  # Server-Timing header on sampled responses to INTERNAL_IPS (any in DEBUG)
+INSTRUMENTATION_METRICS_TOKEN = None  # bearer token for /metrics/; unset: INTERNAL_IPS only (any in DEBUG)
+
+# Permission and role cache (relationship_app/access.py)
+ACCESS_CACHE_TIMEOUT = 300  # seconds; entries are also invalidated by version bumps
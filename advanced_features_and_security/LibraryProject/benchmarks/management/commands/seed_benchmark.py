@@ -0,0 +1,67 @@
+"""
+Seed users and a large book catalogue for the benchmarks. Who added each
+book and which author wrote it follow power laws (a few busy librarians and
+prolific authors, a long tail). Rows go in with ``bulk_create``, so no
+profile is created for the seeded users.
+
+Use a scratch database: the command refuses to run twice on the same one.
+"""
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from django_perf.benchmarks.seeding import insert, power_law, sentence
+from bookshelf.models import Book
+
+User = get_user_model()
+
+PREFIX = 'bench'
+
+
+class Command(BaseCommand):
+    help = "Bulk-seed users and bookshelf books for the benchmarks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100_000)
+        parser.add_argument('--books', type=int, default=500_000)
+        parser.add_argument('--authors', type=int, default=50_000, help="Distinct author names.")
+        parser.add_argument('--alpha', type=float, default=0.9, help="Power-law exponent of popularity.")
+        parser.add_argument('--batch-size', type=int, default=5000, help="Rows per INSERT.")
+        parser.add_argument('--seed', type=int, default=42, help="Random seed, for reproducible datasets.")
+
+    def handle(self, *args, **options):
+        if User.objects.filter(username__startswith=PREFIX).exists():
+            raise CommandError("This database is already seeded; point the settings at a fresh one.")
+        rng = random.Random(options['seed'])
+        n_users, batch_size = options['users'], options['batch_size']
+        started = time.perf_counter()
+
+        authors = [f'{sentence(rng, 1, 2).title()} {i}' for i in range(options['authors'])]
+        with transaction.atomic():
+            User.objects.create_superuser(PREFIX, f'{PREFIX}@example.com', password='benchmark')
+            password = make_password('benchmark')
+            user_pks = insert(User, (
+                User(username=f'{PREFIX}{i}', email=f'{PREFIX}{i}@example.com', password=password,
+                     first_name=sentence(rng, 1, 1).title(), last_name=sentence(rng, 1, 1).title())
+                for i in range(n_users)
+            ), batch_size)
+            self.log(f"Inserted {n_users} users", started)
+
+            adders = rng.choices(user_pks, cum_weights=power_law(n_users, options['alpha'], rng),
+                                 k=options['books']) if user_pks else []
+            author_weights = power_law(len(authors), options['alpha'], rng)
+            insert(Book, (
+                Book(title=sentence(rng, 2, 7).capitalize(), author=author, added_by_id=added_by,
+                     publication_year=rng.randint(1900, 2025))
+                for author, added_by in zip(rng.choices(authors, cum_weights=author_weights, k=len(adders)), adders)
+            ), batch_size)
+            self.log(f"Inserted {len(adders)} books", started)
+
+        self.stdout.write(self.style.SUCCESS("Seeded. Run `manage.py run_benchmarks` next."))
+
+    def log(self, message, started):
+        self.stdout.write(f"[{time.perf_counter() - started:7.1f}s] {message}")
@@ -0,0 +1,38 @@
+"""
+Benchmark scenarios for the library: the admin's user changelist and the
+bookshelf book list, browsed, paged to the end and searched, by a superuser
+and by a librarian whose access goes through group permissions.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.core.management.base import CommandError
+
+from bookshelf.models import Book
+from bookshelf.views import BOOKS_PER_PAGE
+from django_perf.benchmarks.runner import Scenario
+
+User = get_user_model()
+
+
+def get_scenarios():
+    admin = User.objects.filter(is_superuser=True).order_by('id').first()
+    if admin is None:
+        raise CommandError("Nothing to benchmark; run `manage.py seed_benchmark` first.")
+    last_page = max(1, -(-User.objects.count() // 100))  # the changelist's default page size
+    last_book_page = max(1, -(-Book.objects.count() // BOOKS_PER_PAGE))
+    librarians, _ = Group.objects.get_or_create(name='Librarians')
+    librarians.permissions.add(Permission.objects.get(codename='can_view', content_type__app_label='bookshelf'))
+    librarian = User.objects.filter(is_superuser=False).order_by('id').first()
+    librarian.groups.add(librarians)
+    return [
+        Scenario('admin-user-changelist', '/admin/bookshelf/customuser/', user=admin),
+        Scenario('admin-user-last-page', f'/admin/bookshelf/customuser/?p={last_page}', user=admin),
+        Scenario('admin-user-search', '/admin/bookshelf/customuser/?q=latency', user=admin),
+        Scenario('admin-user-staff', '/admin/bookshelf/customuser/?is_staff__exact=1', user=admin),
+        Scenario('book-list', '/books/', user=admin),
+        Scenario('book-list-last-page', f'/books/?page={last_book_page}', user=admin),
+        Scenario('book-list-librarian', '/books/', user=librarian),
+        Scenario('book-search', '/books/?q=latency', user=admin),
+        Scenario('book-search-author', '/books/?q=Cache', user=admin),
+        Scenario('book-search-short', '/books/?q=la', user=admin),
+    ]
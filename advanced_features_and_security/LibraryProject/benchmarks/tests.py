@@ -0,0 +1,27 @@
+import json
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from bookshelf.models import Book
+
+
+class BenchmarkTests(TestCase):
+    def setUp(self):
+        call_command('seed_benchmark', users=50, books=200, authors=20, stdout=StringIO())
+
+    def test_seed(self):
+        self.assertEqual(get_user_model().objects.count(), 51)
+        self.assertEqual(Book.objects.count(), 200)
+        with self.assertRaises(CommandError):
+            call_command('seed_benchmark', books=1, stdout=StringIO())
+
+    def test_report(self):
+        out = StringIO()
+        call_command('run_benchmarks', repeat=2, warmup=0, stdout=out)
+        report = json.loads(out.getvalue())
+        for name, result in report['scenarios'].items():
+            self.assertEqual(result['status'], 200, name)
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:52
+
+from django.db import migrations, models
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for column in ('title', 'author'):
+            schema_editor.execute(
+                f'CREATE INDEX bookshelf_book_{column}_trgm ON bookshelf_book '
+                f'USING gin (UPPER({column}) gin_trgm_ops)'
+            )
+    elif connection.vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE bookshelf_book_fts USING fts5("
+            "title, author, content='bookshelf_book', content_rowid='id', tokenize='trigram')"
+        )
+        schema_editor.execute(
+            'CREATE TRIGGER bookshelf_book_fts_insert AFTER INSERT ON bookshelf_book BEGIN '
+            'INSERT INTO bookshelf_book_fts (rowid, title, author) VALUES (new.id, new.title, new.author); '
+            'END'
+        )
+        schema_editor.execute(
+            'CREATE TRIGGER bookshelf_book_fts_delete AFTER DELETE ON bookshelf_book BEGIN '
+            "INSERT INTO bookshelf_book_fts (bookshelf_book_fts, rowid, title, author) "
+            "VALUES ('delete', old.id, old.title, old.author); "
+            'END'
+        )
+        schema_editor.execute(
+            'CREATE TRIGGER bookshelf_book_fts_update AFTER UPDATE OF title, author ON bookshelf_book BEGIN '
+            "INSERT INTO bookshelf_book_fts (bookshelf_book_fts, rowid, title, author) "
+            "VALUES ('delete', old.id, old.title, old.author); "
+            'INSERT INTO bookshelf_book_fts (rowid, title, author) VALUES (new.id, new.title, new.author); '
+            'END'
+        )
+        # Backfill existing books
+        schema_editor.execute("INSERT INTO bookshelf_book_fts (bookshelf_book_fts) VALUES ('rebuild')")
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        for column in ('title', 'author'):
+            schema_editor.execute(f'DROP INDEX IF EXISTS bookshelf_book_{column}_trgm')
+    elif connection.vendor == 'sqlite':
+        for trigger in ('insert', 'delete', 'update'):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS bookshelf_book_fts_{trigger}')
+        schema_editor.execute('DROP TABLE IF EXISTS bookshelf_book_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookshelf', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['title', 'id'], name='bookshelf_title_idx'),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
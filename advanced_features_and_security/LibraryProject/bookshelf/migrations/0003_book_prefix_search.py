@@ -0,0 +1,36 @@
+from django.db import migrations
+
+
+def create_prefix_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    for column in ('title', 'author'):
+        if connection.vendor == 'postgresql':
+            # istartswith is UPPER(column) LIKE UPPER(%s); text_pattern_ops
+            # lets a btree serve LIKE prefixes under any collation
+            schema_editor.execute(
+                f'CREATE INDEX bookshelf_book_{column}_prefix ON bookshelf_book '
+                f'(UPPER({column}) text_pattern_ops)'
+            )
+        elif connection.vendor == 'sqlite':
+            # istartswith is a case-insensitive LIKE, which SQLite only turns
+            # into a range search on a NOCASE index
+            schema_editor.execute(
+                f'CREATE INDEX bookshelf_book_{column}_prefix ON bookshelf_book ({column} COLLATE NOCASE)'
+            )
+
+
+def drop_prefix_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor in ('postgresql', 'sqlite'):
+        for column in ('title', 'author'):
+            schema_editor.execute(f'DROP INDEX IF EXISTS bookshelf_book_{column}_prefix')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookshelf', '0002_book_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_prefix_indexes, drop_prefix_indexes),
+    ]
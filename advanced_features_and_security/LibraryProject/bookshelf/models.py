@@ -56,6 +56,10 @@ class Book(models.Model):
             ("can_edit", "Can edit book"),
             ("can_delete", "Can delete book"),
         ]
+        indexes = [
+            # book_list's ordering; search goes through bookshelf/search.py
+            models.Index(fields=["title", "id"], name="bookshelf_title_idx"),
+        ]
 
     def __str__(self):
         return f"{self.title} by {self.author} ({self.publication_year})"
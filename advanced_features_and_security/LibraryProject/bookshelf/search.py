@@ -0,0 +1,48 @@
+"""
+Substring search over book titles and authors.
+
+``title__icontains`` scans the whole table, so the search is backed by a
+trigram index instead:
+
+* On PostgreSQL, ``pg_trgm`` GIN indexes on ``UPPER(title)`` and
+  ``UPPER(author)`` serve the ``icontains`` lookups Django already
+  generates.
+* On SQLite, used for local and test runs, ``bookshelf_book_fts`` is an FTS5
+  table with the trigram tokenizer over the same two columns. It reads its
+  text from ``bookshelf_book`` and triggers keep it current, so rows written
+  by ``bulk_create`` or ``update()`` are indexed too.
+
+Trigrams need three characters; shorter queries fall back to a prefix match
+(``istartswith``), served by btree indexes on the same columns:
+``UPPER(column) text_pattern_ops`` on PostgreSQL, ``column COLLATE NOCASE``
+on SQLite.
+``search_books`` only filters, so the caller's ordering and pagination apply.
+"""
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import Book
+
+FTS_TABLE = 'bookshelf_book_fts'
+MIN_TRIGRAM_LENGTH = 3
+
+
+def _fts_query(q):
+    # One quoted phrase, so user input is never parsed as FTS5 syntax
+    return '"{}"'.format(q.replace('"', '""'))
+
+
+def search_books(q, queryset=None):
+    """Return the books whose title or author contains ``q``."""
+    if queryset is None:
+        queryset = Book.objects.all()
+    q = q.strip()
+    if not q:
+        return queryset
+    if len(q) < MIN_TRIGRAM_LENGTH:
+        return queryset.filter(Q(title__istartswith=q) | Q(author__istartswith=q))
+    if connection.vendor == 'sqlite':
+        matches = RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', (_fts_query(q),))
+        return queryset.filter(pk__in=matches)
+    return queryset.filter(Q(title__icontains=q) | Q(author__icontains=q))
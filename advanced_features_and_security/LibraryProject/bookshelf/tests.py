@@ -1,3 +1,78 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from .models import Book
+from .search import search_books
+from .views import BOOKS_PER_PAGE
+
+User = get_user_model()
+
+
+class BookListTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("alice", "alice@example.com", password="password123")
+        self.user.user_permissions.add(Permission.objects.get(codename="can_view"))
+        self.client.force_login(self.user)
+        Book.objects.bulk_create([
+            Book(title=f"Volume {i:03}", author="Anon", publication_year=2000, added_by=self.user)
+            for i in range(BOOKS_PER_PAGE + 5)
+        ])
+        self.dune = Book.objects.create(
+            title="Dune", author="Frank Herbert", publication_year=1965, added_by=self.user
+        )
+        Book.objects.create(title="Dune", author="Brian Herbert", publication_year=1999, added_by=self.user)
+
+    def get(self, **params):
+        return self.client.get(reverse("book_list"), params, secure=True)
+
+    def titles(self, response):
+        return [book.title for book in response.context["page"]]
+
+    def test_requires_permission(self):
+        self.client.force_login(User.objects.create_user("bob", "bob@example.com", password="password123"))
+        self.assertEqual(self.get().status_code, 403)
+
+    def test_pages_are_ordered_by_title_then_id(self):
+        response = self.get()
+        page = response.context["page"]
+        self.assertEqual(len(page), BOOKS_PER_PAGE)
+        self.assertEqual(page.paginator.count, BOOKS_PER_PAGE + 7)
+        self.assertEqual([book.pk for book in page[:2]], list(
+            Book.objects.filter(title="Dune").order_by("id").values_list("pk", flat=True)
+        ))
+        self.assertEqual(page[0].get_deferred_fields(), {"added_by_id"})
+
+        response = self.get(page=2)
+        self.assertEqual(self.titles(response), [f"Volume {i:03}" for i in range(BOOKS_PER_PAGE - 2, BOOKS_PER_PAGE + 5)])
+        self.assertContains(response, "Page 2 of 2")
+
+    def test_search_title_and_author(self):
+        self.assertEqual(self.titles(self.get(q="une")), ["Dune", "Dune"])
+        self.assertEqual(len(self.get(q="frank HERB").context["page"]), 1)
+        self.assertEqual(len(self.get(q="volume 05").context["page"]), 5)
+        self.assertEqual(self.titles(self.get(q="nope")), [])
+
+    def test_short_query_is_a_prefix_match(self):
+        self.assertEqual(self.titles(self.get(q="du")), ["Dune", "Dune"])
+        self.assertEqual(self.titles(self.get(q="un")), [])
+
+    def test_short_query_uses_the_prefix_indexes(self):
+        plan = search_books("du").explain()
+        self.assertIn("bookshelf_book_title_prefix", plan)
+        self.assertIn("bookshelf_book_author_prefix", plan)
+
+    def test_pagination_links_keep_the_query(self):
+        response = self.get(q="volume")
+        self.assertContains(response, 'href="?q=volume&amp;page=2"')
+
+    def test_index_follows_changes(self):
+        self.dune.title = "Children of Dune"
+        self.dune.save()
+        self.assertEqual(search_books("children").get(), self.dune)
+        Book.objects.filter(pk=self.dune.pk).update(author="F. Herbert")
+        self.assertFalse(search_books("Frank").exists())
+        self.dune.delete()
+        self.assertFalse(search_books("children").exists())
+        self.assertEqual(search_books('"; DROP').count(), 0)
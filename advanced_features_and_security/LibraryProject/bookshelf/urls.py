@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path("", views.book_list, name="book_list"),
+    path("create/", views.create_book, name="create_book"),
+    path("<int:pk>/edit/", views.edit_book, name="edit_book"),
+    path("<int:pk>/delete/", views.delete_book, name="delete_book"),
+]
@@ -1,20 +1,28 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import permission_required, login_required
+from django.core.paginator import Paginator
 from django.views.decorators.http import require_http_methods
 from .models import Book
 from .forms import BookForm, BookSearchForm
 from .forms import ExampleForm
+from .search import search_books
+
+BOOKS_PER_PAGE = 50
+
 
 @permission_required("bookshelf.can_view", raise_exception=True)
 def book_list(request):
     form = BookSearchForm(request.GET or None)
-    books = Book.objects.all()
+    # Only the displayed columns, in the order of the (title, id) index
+    books = Book.objects.only("title", "author", "publication_year").order_by("title", "id")
 
+    q = ""
     if form.is_valid():
         q = form.cleaned_data.get("q")
         if q:
-            books = books.filter(title__icontains=q)  # ORM prevents SQL injection
-    return render(request, "bookshelf/book_list.html", {"books": books, "form": form})
+            books = search_books(q, books)  # ORM prevents SQL injection
+    page = Paginator(books, BOOKS_PER_PAGE).get_page(request.GET.get("page"))
+    return render(request, "bookshelf/book_list.html", {"page": page, "form": form, "q": q})
 
 
 @permission_required("bookshelf.can_create", raise_exception=True)
@@ -0,0 +1,102 @@
+"""
+Cached permission and role resolution.
+
+``@permission_required`` asks ``user.has_perm``, which ``ModelBackend``
+answers with two queries (user and group permissions) on every request, and
+the role checks read ``user.userprofile`` with one more. Here a user's
+permission set and ``UserProfile.role`` are loaded together, once, and kept
+in the shared Django cache, so most requests make no permission or role
+queries at all. The views keep using ``permission_required`` and
+``user_passes_test``; ``CachedPermissionBackend`` is installed through
+``AUTHENTICATION_BACKENDS``.
+
+Entries are keyed on version stamps, like the blog's rendered-output cache:
+
+* every user has a version, bumped when the user, their groups, their own
+  permissions or their profile change;
+* one global version is bumped when a group's permissions change, a group is
+  deleted or a permission is created, edited or deleted, since that can
+  affect any number of users.
+
+Bumping a version makes the old entries unreachable and they age out (see
+the receivers in ``relationship_app.models``). Within a request the entry is
+also kept on the user object, so repeated checks do not go back to the cache.
+"""
+import time
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+from .models import UserProfile
+
+
+def timeout():
+    return getattr(settings, 'ACCESS_CACHE_TIMEOUT', 300)
+
+
+# ---------- Versions ----------
+GLOBAL_KEY = 'access:v:global'
+
+
+def _user_key(user_id):
+    return f'access:v:user:{user_id}'
+
+
+def _get_versions(keys):
+    """Return the current version of each key, creating missing ones."""
+    versions = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def bump(user_ids=(), everyone=False):
+    """Invalidate the cached access of the given users, or of everyone."""
+    keys = [_user_key(pk) for pk in user_ids]
+    if everyone:
+        keys.append(GLOBAL_KEY)
+    if keys:
+        cache.set_many({key: time.time_ns() for key in keys}, timeout=None)
+
+
+# ---------- Access entries ----------
+def _load(user):
+    permissions = ModelBackend().get_all_permissions(user)
+    role = UserProfile.objects.filter(user_id=user.pk).values_list('role', flat=True).first()
+    return {'permissions': frozenset(permissions), 'role': role}
+
+
+def get_access(user):
+    """
+    Return ``{'permissions': frozenset, 'role': str or None}`` for an active,
+    authenticated user: from the request, the shared cache or the database.
+    """
+    access = getattr(user, '_access_cache', None)
+    if access is None:
+        versions = ':'.join(str(version) for version in _get_versions([GLOBAL_KEY, _user_key(user.pk)]))
+        key = f'access:{user.pk}:{versions}'
+        access = cache.get(key)
+        if access is None:
+            access = _load(user)
+            cache.set(key, access, timeout())
+        user._access_cache = access
+    return access
+
+
+def user_role(user):
+    """The user's ``UserProfile.role``, or None without a profile."""
+    if not user.is_authenticated:
+        return None
+    return get_access(user)['role']
+
+
+class CachedPermissionBackend(ModelBackend):
+    """``ModelBackend`` whose ``has_perm`` reads the cached permission set."""
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        return get_access(user_obj)['permissions']
@@ -1,6 +1,8 @@
 from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
 from django.db import models
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 
 class UserProfile(models.Model):
@@ -21,3 +23,56 @@ class UserProfile(models.Model):
 def create_user_profile(sender, instance, created, **kwargs):
     if created:
         UserProfile.objects.create(user=instance)
+
+
+# ---------- Permission and role cache invalidation (relationship_app/access.py) ----------
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def bump_access_on_user_change(sender, instance, update_fields=None, **kwargs):
+    from . import access
+
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return  # every login saves last_login; nothing cached depends on it
+    access.bump(user_ids=[instance.pk])
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def bump_access_on_profile_change(sender, instance, **kwargs):
+    from . import access
+
+    access.bump(user_ids=[instance.user_id])
+
+
+@receiver(m2m_changed, sender=get_user_model().groups.through)
+@receiver(m2m_changed, sender=get_user_model().user_permissions.through)
+def bump_access_on_user_m2m_change(sender, instance, action, reverse, pk_set, **kwargs):
+    from . import access
+
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        access.bump(user_ids=[instance.pk])
+    elif pk_set is not None:
+        access.bump(user_ids=pk_set)
+    else:
+        access.bump(everyone=True)  # group.user_set.clear() does not say which users
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def bump_access_on_group_permissions_change(sender, action, **kwargs):
+    from . import access
+
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        access.bump(everyone=True)
+
+
+@receiver(post_delete, sender=Group)
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+def bump_access_on_group_delete_or_permission_change(sender, **kwargs):
+    from . import access
+
+    # A new permission is in every superuser's set; a renamed one in the sets
+    # of everyone who holds it
+    access.bump(everyone=True)
@@ -1,3 +1,107 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from .access import get_access, user_role
+from .models import UserProfile
+
+User = get_user_model()
+
+
+class AccessCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("alice", "alice@example.com", password="password123")
+        self.can_view = Permission.objects.get(codename="can_view")
+        self.librarians = Group.objects.create(name="Librarians")
+
+    def fresh(self):
+        # A new instance, as every request loads its own user
+        return User.objects.get(pk=self.user.pk)
+
+    def test_loaded_once_then_cached(self):
+        self.user.user_permissions.add(self.can_view)
+        user = self.fresh()
+        with self.assertNumQueries(3):  # user permissions, group permissions, profile
+            self.assertTrue(user.has_perm("bookshelf.can_view"))
+        user = self.fresh()
+        with self.assertNumQueries(0):
+            self.assertTrue(user.has_perm("bookshelf.can_view"))
+            self.assertFalse(user.has_perm("bookshelf.can_delete"))
+            self.assertEqual(user_role(user), "")
+
+    def test_user_permission_change(self):
+        self.assertFalse(self.fresh().has_perm("bookshelf.can_view"))
+        self.user.user_permissions.add(self.can_view)
+        self.assertTrue(self.fresh().has_perm("bookshelf.can_view"))
+        self.can_view.user_set.remove(self.user)
+        self.assertFalse(self.fresh().has_perm("bookshelf.can_view"))
+
+    def test_group_changes(self):
+        self.librarians.user_set.add(self.user)
+        self.assertFalse(self.fresh().has_perm("bookshelf.can_view"))
+        self.librarians.permissions.add(self.can_view)
+        self.assertTrue(self.fresh().has_perm("bookshelf.can_view"))
+        self.user.groups.clear()
+        self.assertFalse(self.fresh().has_perm("bookshelf.can_view"))
+        self.librarians.user_set.add(self.user)
+        self.assertTrue(self.fresh().has_perm("bookshelf.can_view"))
+        self.librarians.delete()
+        self.assertFalse(self.fresh().has_perm("bookshelf.can_view"))
+
+    def test_permission_changes(self):
+        admin = User.objects.create_superuser("root", "root@example.com", password="password123")
+        self.assertNotIn("bookshelf.can_archive", User.objects.get(pk=admin.pk).get_all_permissions())
+        Permission.objects.create(
+            codename="can_archive", name="Can archive", content_type=self.can_view.content_type,
+        )
+        self.assertIn("bookshelf.can_archive", User.objects.get(pk=admin.pk).get_all_permissions())
+
+        self.user.user_permissions.add(self.can_view)
+        self.assertTrue(self.fresh().has_perm("bookshelf.can_view"))
+        self.can_view.codename = "can_browse"
+        self.can_view.save()
+        self.assertFalse(self.fresh().has_perm("bookshelf.can_view"))
+        self.assertTrue(self.fresh().has_perm("bookshelf.can_browse"))
+
+    def test_profile_role_change(self):
+        self.assertEqual(user_role(self.fresh()), "")
+        UserProfile.objects.filter(user=self.user).update(role="Admin")  # no signal
+        self.assertEqual(user_role(self.fresh()), "")
+        profile = UserProfile.objects.get(user=self.user)
+        profile.role = "Librarian"
+        profile.save()
+        self.assertEqual(user_role(self.fresh()), "Librarian")
+        profile.delete()
+        self.assertIsNone(user_role(self.fresh()))
+
+    def test_superuser_and_inactive(self):
+        self.user.is_superuser = True
+        self.user.save()
+        self.assertTrue(self.fresh().has_perm("bookshelf.can_delete"))
+        self.user.is_active = False
+        self.user.save()
+        self.assertFalse(self.fresh().has_perm("bookshelf.can_delete"))
+
+    def test_login_does_not_invalidate(self):
+        get_access(self.fresh())
+        self.client.login(username="alice", password="password123")
+        user = self.fresh()
+        with self.assertNumQueries(0):
+            get_access(user)
+
+    def test_permission_required_view(self):
+        self.user.user_permissions.add(self.can_view)
+        self.client.force_login(self.user)
+        url = reverse("book_list")
+        self.client.get(url, secure=True)
+        with self.assertNumQueries(3):  # session, user, count of books (no books, no page query)
+            response = self.client.get(url, secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.user.user_permissions.remove(self.can_view)
+        self.assertEqual(self.client.get(url, secure=True).status_code, 403)
+
+    def test_anonymous(self):
+        self.assertIsNone(user_role(self.client.get("/", secure=True).wsgi_request.user))
@@ -19,6 +19,9 @@ from django.contrib.auth.decorators import user_passes_test
 # Permissions decorator
 from django.contrib.auth.decorators import permission_required
 
+# Cached role lookup (relationship_app/access.py)
+from .access import user_role
+
 
 # FBV to list all books
 def list_books(request):
@@ -90,14 +93,15 @@ def delete_book(request, book_id):
 # Role-based views
 # ==============================
 
+# Roles come from the cached access entry, not a user.userprofile query
 def is_admin(user):
-    return hasattr(user, "userprofile") and user.userprofile.role == "Admin"
+    return user_role(user) == "Admin"
 
 def is_librarian(user):
-    return hasattr(user, "userprofile") and user.userprofile.role == "Librarian"
+    return user_role(user) == "Librarian"
 
 def is_member(user):
-    return hasattr(user, "userprofile") and user.userprofile.role == "Member"
+    return user_role(user) == "Member"
 
 
 @user_passes_test(is_admin)
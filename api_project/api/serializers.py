@@ -1,7 +1,8 @@
 from rest_framework import serializers
 from .models import Book
+from django_perf.readplan import ReadPlanMixin
 
-class BookSerializer(serializers.ModelSerializer):
+class BookSerializer(ReadPlanMixin, serializers.ModelSerializer):
     class Meta:
         model = Book
         fields = '__all__'  # Include all fields from the Book model
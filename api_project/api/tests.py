@@ -1,3 +1,113 @@
-from django.test import TestCase
+import csv
+import gzip
+import io
+import json
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from django_perf.tokencache.authentication import token_cache
+
+from .models import Book
+
+
+class TokenCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        token_cache.local.clear()
+        self.user = User.objects.create_user(username="alice", password="password123")
+        self.client = APIClient()
+        response = self.client.post(
+            reverse("api_token_auth"), {"username": "alice", "password": "password123"}
+        )
+        self.key = response.data["token"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.key}")
+
+    def test_login_primes_cache(self):
+        # Only the book listing itself hits the database
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("book-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_miss_falls_back_to_database(self):
+        cache.clear()
+        token_cache.local.clear()
+        with self.assertNumQueries(2):
+            self.client.get(reverse("book-list"))
+        with self.assertNumQueries(1):
+            self.client.get(reverse("book-list"))
+
+    def test_deleted_token_is_rejected(self):
+        self.client.get(reverse("book-list"))
+        Token.objects.filter(key=self.key).delete()
+        response = self.client.get(reverse("book-list"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_is_rejected(self):
+        self.client.get(reverse("book-list"))
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(reverse("book-list"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class FastJSONTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="alice", password="password123")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        Book.objects.create(title="Süßes Buch", author="Anna")
+
+    def test_renders_like_drf(self):
+        response = self.client.get(reverse("book-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content, JSONRenderer().render(response.data))
+
+    def test_read_plan_matches_drf(self):
+        planned = self.client.get(reverse("book-list")).content
+        with override_settings(SERIALIZER_READ_PLANS=False):
+            self.assertEqual(self.client.get(reverse("book-list")).content, planned)
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="alice", password="password123")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.books = [Book.objects.create(title=f"Book, {i}", author="Anna") for i in range(5)]
+
+    def export(self, url_name, format, **headers):
+        response = self.client.get(reverse(url_name), {"export": format}, **headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return response, b"".join(response.streaming_content)
+
+    def test_csv(self):
+        response, body = self.export("book-list", "csv")
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        rows = list(csv.reader(io.StringIO(body.decode())))
+        self.assertEqual(rows[0], ["id", "title", "author"])
+        self.assertEqual(rows[1:], [[str(book.id), book.title, book.author] for book in self.books])
+
+    def test_ndjson(self):
+        response, body = self.export("book_all-list", "ndjson")
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        listed = self.client.get(reverse("book_all-list")).json()
+        self.assertEqual([json.loads(line) for line in body.decode().splitlines()], listed)
+
+    def test_gzip(self):
+        _, plain = self.export("book-list", "ndjson")
+        response, body = self.export("book-list", "ndjson", HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(gzip.decompress(body), plain)
+
+    def test_requires_auth(self):
+        response = APIClient().get(reverse("book-list"), {"export": "csv"})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -1,7 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import BookList, BookViewSet
-from rest_framework.authtoken.views import obtain_auth_token
+from .views import BookList, BookViewSet, CachedObtainAuthToken
 
 # Create the router and register the ViewSet
 router = DefaultRouter()
@@ -12,7 +11,7 @@ urlpatterns = [
     # ListAPIView for simple listing
     path('books/', BookList.as_view(), name='book-list'),
 
-    path('api-token-auth/', obtain_auth_token, name='api_token_auth'),
+    path('api-token-auth/', CachedObtainAuthToken.as_view(), name='api_token_auth'),
 
     # Include all routes from the router (CRUD operations)
     path('', include(router.urls)),
@@ -1,13 +1,32 @@
 from rest_framework import generics, viewsets
+from rest_framework.authtoken.models import Token
+from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.response import Response
+from django_perf.tokencache.authentication import prime_token
+from django_perf.export import ExportMixin
 from .models import Book
 from .serializers import BookSerializer
 
+# Both list views stream every book with ?export=csv|ndjson (see django_perf.export)
+class BookExportMixin(ExportMixin):
+    export_fields = ('id', 'title', 'author')
+    export_filename = 'books'
+
 # Existing ListAPIView
-class BookList(generics.ListAPIView):
+class BookList(BookExportMixin, generics.ListAPIView):
     queryset = Book.objects.all()
     serializer_class = BookSerializer
 
 # New ViewSet for full CRUD
-class BookViewSet(viewsets.ModelViewSet):
+class BookViewSet(BookExportMixin, viewsets.ModelViewSet):
     queryset = Book.objects.all()
     serializer_class = BookSerializer
+
+# Token login that also primes the token cache
+class CachedObtainAuthToken(ObtainAuthToken):
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        token, created = Token.objects.get_or_create(user=serializer.validated_data['user'])
+        prime_token(token)
+        return Response({'token': token.key})
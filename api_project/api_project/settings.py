@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -40,9 +41,14 @@ INSTALLED_APPS = [
     'rest_framework',
     'rest_framework.authtoken',
     'api',
+    'django_perf.instrumentation',
+    'django_perf.benchmarks',
+    'django_perf.tokencache',
+    'benchmarks',
 ]
 
 MIDDLEWARE = [
+    'django_perf.instrumentation.middleware.InstrumentationMiddleware',  # outermost, so it times everything
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -126,10 +132,46 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',  # <-- Token auth enabled
+        'django_perf.tokencache.authentication.CachedTokenAuthentication',  # <-- Token auth enabled, lookups cached
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',  # Only authenticated users can access by default
     ],
+    # orjson-backed JSON when installed, DRF's stdlib JSON otherwise (django_perf/fastjson.py)
+    'DEFAULT_RENDERER_CLASSES': [
+        'django_perf.fastjson.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'django_perf.fastjson.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
+# The token cache's shared tier needs a cache every worker sees; with local
+# memory (tests, single-process runs) it is skipped. Set REDIS_URL in
+# production.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+if os.environ.get('REDIS_URL'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['REDIS_URL'],
+    }
+
+# Token lookup cache (django_perf/tokencache/authentication.py)
+TOKEN_CACHE_MAX_SIZE = 10000  # entries in each process's LRU
+TOKEN_CACHE_LOCAL_TTL = 10  # seconds; bounds staleness in other processes
+TOKEN_CACHE_SHARED_TTL = 300  # seconds in the shared cache
+
+# Precompiled serializer read path (django_perf/readplan.py); False falls back to DRF's
+SERIALIZER_READ_PLANS = True
+
+# Query and latency instrumentation (django_perf/instrumentation/middleware.py)
+INSTRUMENTATION_SAMPLE_RATE = 1.0 if DEBUG else 0.1  # share of requests whose queries are recorded
+INSTRUMENTATION_SERVER_TIMING = True  # Server-Timing header on sampled responses to INTERNAL_IPS (any in DEBUG)
+INSTRUMENTATION_METRICS_TOKEN = None  # bearer token for /metrics/; unset: INTERNAL_IPS only (any in DEBUG)
@@ -0,0 +1,49 @@
+"""
+Seed books for the benchmarks, with author names drawn from a power law
+(a few prolific authors, a long tail). Rows go in with ``bulk_create``.
+
+Use a scratch database: the command refuses to run twice on the same one.
+"""
+import random
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.models import Book
+from django_perf.benchmarks.seeding import insert, power_law, sentence
+
+PREFIX = 'bench'
+
+
+class Command(BaseCommand):
+    help = "Bulk-seed books (and a user to read them) for the benchmarks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=1_000_000)
+        parser.add_argument('--authors', type=int, default=50_000, help="Distinct author names.")
+        parser.add_argument('--alpha', type=float, default=0.9, help="Power-law exponent of popularity.")
+        parser.add_argument('--batch-size', type=int, default=5000, help="Rows per INSERT.")
+        parser.add_argument('--seed', type=int, default=42, help="Random seed, for reproducible datasets.")
+
+    def handle(self, *args, **options):
+        if User.objects.filter(username=PREFIX).exists():
+            raise CommandError("This database is already seeded; point the settings at a fresh one.")
+        rng = random.Random(options['seed'])
+        started = time.perf_counter()
+
+        authors = [f'{sentence(rng, 1, 2).title()} {i}' for i in range(options['authors'])]
+        weights = power_law(len(authors), options['alpha'], rng)
+        with transaction.atomic():
+            User.objects.create_user(username=PREFIX, password='benchmark')
+            insert(Book, (
+                Book(title=sentence(rng, 2, 7).capitalize(), author=author)
+                for author in rng.choices(authors, cum_weights=weights, k=options['books'])
+            ), options['batch_size'])
+            self.log(f"Inserted {options['books']} books", started)
+
+        self.stdout.write(self.style.SUCCESS("Seeded. Run `manage.py run_benchmarks` next."))
+
+    def log(self, message, started):
+        self.stdout.write(f"[{time.perf_counter() - started:7.1f}s] {message}")
@@ -0,0 +1,36 @@
+"""
+Benchmark scenarios for the books API: both list endpoints, the detail view
+and the exports; and the book page ``benchmark_serializers`` renders.
+"""
+from django.contrib.auth.models import User
+from django.core.management.base import CommandError
+from rest_framework.authtoken.models import Token
+
+from api.models import Book
+from api.serializers import BookSerializer
+from django_perf.benchmarks.runner import Scenario, SerializerCase
+
+
+def get_scenarios():
+    book = Book.objects.order_by('id').first()
+    user = User.objects.order_by('id').first()
+    if book is None or user is None:
+        raise CommandError("Nothing to benchmark; run `manage.py seed_benchmark` first.")
+    token, _ = Token.objects.get_or_create(user=user)
+    auth = {'HTTP_AUTHORIZATION': f'Token {token.key}'}
+    return [
+        Scenario('book-list', '/api/books/', headers=auth),
+        Scenario('book-viewset-list', '/api/books_all/', headers=auth),
+        Scenario('book-detail', f'/api/books_all/{book.pk}/', headers=auth),
+        Scenario('book-export-csv', '/api/books_all/?export=csv', headers=auth),
+        Scenario('book-export-ndjson', '/api/books_all/?export=ndjson', headers=auth),
+        Scenario('book-export-csv-gzip', '/api/books_all/?export=csv', headers={**auth, 'HTTP_ACCEPT_ENCODING': 'gzip'}),
+    ]
+
+
+def get_serializer_cases(size):
+    books = [
+        Book(id=i + 1, title=f'Book number {i} on latency — ünïcode too', author=f'Author {i % 50}')
+        for i in range(size)
+    ]
+    return {'books': SerializerCase(BookSerializer, books)}
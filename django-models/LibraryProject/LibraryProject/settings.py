@@ -39,9 +39,13 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'bookshelf',
     'relationship_app',
+    'django_perf.instrumentation',
+    'django_perf.benchmarks',
+    'benchmarks',
 ]
 
 MIDDLEWARE = [
+    'django_perf.instrumentation.middleware.InstrumentationMiddleware',  # outermost, so it times everything
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -133,3 +137,8 @@ LOGIN_REDIRECT_URL = "list_books"
 
 # Redirect URL after logout
 LOGOUT_REDIRECT_URL = "login"
+
+# Query and latency instrumentation (django_perf/instrumentation/middleware.py)
+INSTRUMENTATION_SAMPLE_RATE = 1.0 if DEBUG else 0.1  # share of requests whose queries are recorded
+INSTRUMENTATION_SERVER_TIMING = True  # Server-Timing header on sampled responses to INTERNAL_IPS (any in DEBUG)
+INSTRUMENTATION_METRICS_TOKEN = None  # bearer token for /metrics/; unset: INTERNAL_IPS only (any in DEBUG)
@@ -0,0 +1,83 @@
+"""
+Seed authors, books and libraries for the benchmarks, plus the admin's
+bookshelf catalogue. Books per author and library sizes follow power laws
+(a few prolific authors and big libraries, a long tail). Rows go in with
+``bulk_create``.
+
+The list and library pages render every book they hold, one author query
+per book, so the defaults stay modest.
+
+Use a scratch database: the command refuses to run twice on the same one.
+"""
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from django_perf.benchmarks.seeding import heavy_tailed, insert, power_law, sentence
+from bookshelf.models import Book as ShelfBook
+from relationship_app.models import Author, Book, Library
+
+User = get_user_model()
+LibraryBook = Library.books.through
+
+PREFIX = 'bench'
+
+
+class Command(BaseCommand):
+    help = "Bulk-seed authors, books, libraries and bookshelf books for the benchmarks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--authors', type=int, default=1000)
+        parser.add_argument('--books', type=int, default=10_000)
+        parser.add_argument('--libraries', type=int, default=100)
+        parser.add_argument('--books-per-library', type=int, default=200, help="Mean books per library.")
+        parser.add_argument('--shelf-books', type=int, default=100_000, help="Books in the admin's bookshelf.")
+        parser.add_argument('--alpha', type=float, default=0.9, help="Power-law exponent of popularity.")
+        parser.add_argument('--batch-size', type=int, default=5000, help="Rows per INSERT.")
+        parser.add_argument('--seed', type=int, default=42, help="Random seed, for reproducible datasets.")
+
+    def handle(self, *args, **options):
+        if User.objects.filter(username=PREFIX).exists():
+            raise CommandError("This database is already seeded; point the settings at a fresh one.")
+        rng = random.Random(options['seed'])
+        batch_size = options['batch_size']
+        started = time.perf_counter()
+
+        names = [f'{sentence(rng, 1, 2).title()} {i}' for i in range(options['authors'])]
+        weights = power_law(len(names), options['alpha'], rng)
+        with transaction.atomic():
+            User.objects.create_superuser(username=PREFIX, email=f'{PREFIX}@example.com', password='benchmark')
+            author_pks = insert(Author, (Author(name=name) for name in names), batch_size)
+            book_pks = insert(Book, (
+                Book(title=sentence(rng, 2, 7).capitalize(), author_id=author_pks[author])
+                for author in rng.choices(range(len(names)), cum_weights=weights, k=options['books'])
+            ), batch_size)
+            self.log(f"Inserted {len(author_pks)} authors and {len(book_pks)} books", started)
+
+            library_pks = insert(Library, (
+                Library(name=f'{sentence(rng, 1, 3).title()} Library {i}') for i in range(options['libraries'])
+            ), batch_size)
+
+            def holdings():
+                for library_pk in library_pks:
+                    wanted = min(len(book_pks), heavy_tailed(options['books_per_library'], rng))
+                    for book_pk in rng.sample(book_pks, wanted):
+                        yield LibraryBook(library_id=library_pk, book_id=book_pk)
+
+            held = len(insert(LibraryBook, holdings(), batch_size))
+            self.log(f"Inserted {len(library_pks)} libraries holding {held} books", started)
+
+            insert(ShelfBook, (
+                ShelfBook(title=sentence(rng, 2, 7).capitalize(), author=names[author],
+                          publication_year=rng.randint(1900, 2025))
+                for author in rng.choices(range(len(names)), cum_weights=weights, k=options['shelf_books'])
+            ), batch_size)
+            self.log(f"Inserted {options['shelf_books']} bookshelf books", started)
+
+        self.stdout.write(self.style.SUCCESS("Seeded. Run `manage.py run_benchmarks` next."))
+
+    def log(self, message, started):
+        self.stdout.write(f"[{time.perf_counter() - started:7.1f}s] {message}")
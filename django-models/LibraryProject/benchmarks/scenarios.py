@@ -0,0 +1,29 @@
+"""
+Benchmark scenarios for the library: the relationship app's book list and
+library pages (routed through its URLconf, which the project does not
+include) and the admin's bookshelf changelist.
+"""
+from django.contrib.auth import get_user_model
+from django.core.management.base import CommandError
+from django.db.models import Count
+
+from bookshelf.models import Book
+from relationship_app.models import Library
+from django_perf.benchmarks.runner import Scenario
+
+User = get_user_model()
+
+
+def get_scenarios():
+    library = Library.objects.annotate(size=Count('books')).order_by('-size', 'id').first()
+    admin = User.objects.filter(is_superuser=True).order_by('id').first()
+    book = Book.objects.order_by('id').first()
+    if library is None or admin is None or book is None:
+        raise CommandError("Nothing to benchmark; run `manage.py seed_benchmark` first.")
+    return [
+        Scenario('book-list', '/books/', urlconf='relationship_app.urls'),
+        Scenario('library-detail', f'/library/{library.pk}/', urlconf='relationship_app.urls'),
+        Scenario('admin-book-changelist', '/admin/bookshelf/book/', user=admin),
+        Scenario('admin-book-search', '/admin/bookshelf/book/?q=latency', user=admin),
+        Scenario('admin-book-by-year', f'/admin/bookshelf/book/?publication_year={book.publication_year}', user=admin),
+    ]
@@ -0,0 +1,32 @@
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from bookshelf.models import Book as ShelfBook
+from relationship_app.models import Author, Book, Library
+
+
+class BenchmarkTests(TestCase):
+    def setUp(self):
+        call_command(
+            'seed_benchmark', authors=10, books=100, libraries=3, books_per_library=20,
+            shelf_books=50, stdout=StringIO(),
+        )
+
+    def test_seed(self):
+        self.assertEqual(Author.objects.count(), 10)
+        self.assertEqual(Book.objects.count(), 100)
+        self.assertEqual(Library.objects.count(), 3)
+        self.assertEqual(ShelfBook.objects.count(), 50)
+        with self.assertRaises(CommandError):
+            call_command('seed_benchmark', books=1, stdout=StringIO())
+
+    def test_report(self):
+        out = StringIO()
+        call_command('run_benchmarks', repeat=2, warmup=0, stdout=out)
+        report = json.loads(out.getvalue())
+        for name, result in report['scenarios'].items():
+            self.assertEqual(result['status'], 200, name)
@@ -0,0 +1,16 @@
+"""
+Performance tooling shared by every project in this repository.
+
+``django_perf.instrumentation`` records per-request query counts and
+latencies and serves them to Prometheus. ``django_perf.benchmarks`` times
+each project's benchmark scenarios (``manage.py run_benchmarks``) and has the
+helpers its ``seed_benchmark`` command uses. ``django_perf.tokencache``
+caches DRF token lookups for the API projects, and ``django_perf.fastjson``
+renders and parses their JSON with orjson when it is installed.
+``django_perf.readplan`` precompiles their serializers' read path and
+``django_perf.export`` streams their list views as CSV or NDJSON.
+
+Each project installs the package (``pip install -e ../django-perf``) and
+lists the apps it uses in ``INSTALLED_APPS``; the tests run from any of them
+with ``manage.py test django_perf``.
+"""
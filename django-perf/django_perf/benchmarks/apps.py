@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class BenchmarksConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'django_perf.benchmarks'
+    # Each project keeps its own ``benchmarks`` app for its scenarios
+    label = 'django_perf_benchmarks'
@@ -0,0 +1,66 @@
+"""
+Micro-benchmark: per-object serialization cost of a project's serializers
+with their read plans (django_perf.readplan) against the plain DRF
+``ModelSerializer`` path, on 1k and 10k object pages.
+
+The pages come from the project's ``get_serializer_cases(size)`` (see
+``django_perf.benchmarks.runner.SerializerCase``) and are unsaved model
+instances, so no database is needed.
+"""
+import json
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from django.utils.module_loading import import_string
+
+
+def get_serializer_cases(size):
+    """The project's cases, from the function named by ``SERIALIZER_BENCHMARKS``."""
+    path = getattr(settings, 'SERIALIZER_BENCHMARKS', 'benchmarks.scenarios.get_serializer_cases')
+    try:
+        get_cases = import_string(path)
+    except ImportError:
+        raise CommandError(f"This project has no serializer benchmarks ({path}).")
+    return get_cases(size)
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+class Command(BaseCommand):
+    help = "Compare DRF and read plan serialization cost per object."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000], help="Page sizes.")
+        parser.add_argument('--repeat', type=int, default=5, help="Timing runs; the best one is reported.")
+
+    def handle(self, *args, **options):
+        report = {}
+        for size in options['sizes']:
+            report[size] = {}
+            for name, case in get_serializer_cases(size).items():
+                def drf():
+                    return (case.baseline or case.serializer)(case.objects, many=True).data
+
+                def plan():
+                    return case.serializer(case.objects, many=True).data
+
+                with override_settings(SERIALIZER_READ_PLANS=False):
+                    drf_seconds = best_of(drf, options['repeat'])
+                    expected = json.dumps(drf())
+                plan_seconds = best_of(plan, options['repeat'])
+                report[size][name] = {
+                    'identical_output': expected == json.dumps(plan()),
+                    'drf_us_per_object': round(drf_seconds / len(case.objects) * 1e6, 2),
+                    'plan_us_per_object': round(plan_seconds / len(case.objects) * 1e6, 2),
+                    'speedup': round(drf_seconds / plan_seconds, 1),
+                }
+        self.stdout.write(json.dumps(report, indent=2))
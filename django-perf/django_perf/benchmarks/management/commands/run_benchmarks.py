@@ -0,0 +1,44 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+from django_perf.benchmarks import runner
+
+
+def get_scenarios():
+    """The project's scenarios, from the function named by ``BENCHMARK_SCENARIOS``."""
+    return import_string(getattr(settings, 'BENCHMARK_SCENARIOS', 'benchmarks.scenarios.get_scenarios'))()
+
+
+class Command(BaseCommand):
+    help = "Time every benchmark scenario against the seeded database and print a JSON report."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=50, help="Measured requests per scenario.")
+        parser.add_argument('--warmup', type=int, default=5, help="Unmeasured requests per scenario.")
+        parser.add_argument('--cold', action='store_true', help="Clear the cache before every request.")
+        parser.add_argument(
+            '--scenario', action='append',
+            help="Only run scenarios whose name starts with this (repeatable).",
+        )
+        parser.add_argument('--output', help="Also write the report to this file.")
+        parser.add_argument('--compare', help="A previous report to compare against.")
+
+    def handle(self, *args, **options):
+        scenarios = get_scenarios()
+        if options['scenario']:
+            scenarios = [s for s in scenarios if s.name.startswith(tuple(options['scenario']))]
+            if not scenarios:
+                raise CommandError("No scenario matches --scenario.")
+
+        report = runner.run(scenarios, options['repeat'], options['warmup'], options['cold'])
+        if options['compare']:
+            runner.compare(report, json.loads(Path(options['compare']).read_text()))
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            Path(options['output']).write_text(output + '\n')
+        self.stdout.write(output)
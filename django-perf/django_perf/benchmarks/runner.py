@@ -0,0 +1,152 @@
+"""
+Timed endpoint scenarios for ``manage.py run_benchmarks``.
+
+Every scenario is a GET that goes through the whole middleware stack with
+Django's test client, in-process and against the configured database (seed
+it first with ``manage.py seed_benchmark``). Each one runs ``warmup``
+unmeasured requests and then ``repeat`` measured ones; the queries of every
+request are recorded with the instrumentation app's ``QueryRecorder``.
+
+The scenarios themselves belong to each project: ``get_scenarios()`` in its
+``benchmarks.scenarios`` module, or the function ``BENCHMARK_SCENARIOS``
+names, returns a list of ``Scenario``.
+``get_serializer_cases(size)`` next to it, or the function
+``SERIALIZER_BENCHMARKS`` names, returns the ``SerializerCase`` pages that
+``manage.py benchmark_serializers`` renders.
+
+The report is plain JSON, keyed by scenario name and stamped with the git
+revision, so runs from different commits can be diffed or fed back with
+``--compare``.
+"""
+import statistics
+import subprocess
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, override_settings
+
+from django_perf.instrumentation.middleware import QueryRecorder
+
+
+class Scenario:
+    """
+    One endpoint to time. ``user`` is logged in with the session backend,
+    ``headers`` are sent with every request (e.g. a token), and ``urlconf``
+    routes the path through an app's URLconf the project does not include.
+    """
+
+    def __init__(self, name, path, user=None, headers=None, urlconf=None):
+        self.name = name
+        self.path = path
+        self.user = user
+        self.headers = headers or {}
+        self.urlconf = urlconf
+
+
+class SerializerCase:
+    """
+    A page of ``objects`` for ``manage.py benchmark_serializers`` to render with
+    ``serializer`` and with ``baseline``, the DRF path it is compared against
+    (by default the same serializer). The baseline runs with read plans off.
+    """
+
+    def __init__(self, serializer, objects, baseline=None):
+        self.serializer = serializer
+        self.objects = objects
+        self.baseline = baseline
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=Path(settings.BASE_DIR),
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_scenario(scenario, repeat, warmup, cold=False):
+    client = Client(**scenario.headers)
+    if scenario.user is not None:
+        client.force_login(scenario.user)
+    secure = getattr(settings, 'SECURE_SSL_REDIRECT', False)
+
+    latencies = []
+    queries = []
+    duplicates = []
+    status = None
+    for i in range(warmup + repeat):
+        if cold:
+            cache.clear()
+        recorder = QueryRecorder()
+        recorder.install()
+        started = time.perf_counter()
+        try:
+            response = client.get(scenario.path, secure=secure)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        finally:
+            elapsed = time.perf_counter() - started
+            recorder.uninstall()
+        status = response.status_code
+        if i >= warmup:
+            latencies.append(elapsed)
+            queries.append(recorder.count)
+            duplicates.append(sum(recorder.duplicates.values()))
+
+    latencies.sort()
+    return {
+        'path': scenario.path,
+        'status': status,
+        'requests': len(latencies),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 2),
+        'queries': max(queries),
+        'duplicate_queries': max(duplicates),
+    }
+
+
+def run(scenarios, repeat=50, warmup=5, cold=False):
+    """Run ``scenarios`` and return the JSON-serializable report."""
+    results = {}
+    # The test client's host is not in ALLOWED_HOSTS outside the test runner
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+        for scenario in scenarios:
+            if scenario.urlconf:
+                with override_settings(ROOT_URLCONF=scenario.urlconf):
+                    results[scenario.name] = run_scenario(scenario, repeat, warmup, cold)
+            else:
+                results[scenario.name] = run_scenario(scenario, repeat, warmup, cold)
+    return {
+        'revision': git_revision(),
+        'database': connection.vendor,
+        'repeat': repeat,
+        'cold_cache': cold,
+        'scenarios': results,
+    }
+
+
+def compare(report, baseline):
+    """Add the baseline's p50/p99 and their ratios to each scenario of ``report``."""
+    for name, result in report['scenarios'].items():
+        before = baseline.get('scenarios', {}).get(name)
+        if not before:
+            continue
+        for key in ('p50_ms', 'p99_ms'):
+            result[f'baseline_{key}'] = before[key]
+            result[f'{key[:3]}_ratio'] = round(result[key] / before[key], 2) if before[key] else None
+        result['baseline_queries'] = before['queries']
+    report['baseline_revision'] = baseline.get('revision')
+    return report
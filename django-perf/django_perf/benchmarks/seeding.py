@@ -0,0 +1,52 @@
+"""
+Helpers for ``manage.py seed_benchmark``: skewed random choices and batched
+inserts that never hold a whole table in memory.
+"""
+from itertools import accumulate, islice
+
+WORDS = (
+    'django python database index query cache latency throughput async feed '
+    'timeline follow graph post comment author book library search tag page '
+    'cursor batch stream json render parse model view serializer signal '
+    'migration schema table row column join filter order limit offset scan '
+    'sort hash tree btree trigram vector rank score profile user token session '
+    'request response header middleware server worker thread process memory '
+    'disk network packet socket client benchmark seed random sample percentile'
+).split()
+
+
+def power_law(n, alpha, rng):
+    """
+    Cumulative weights for ``random.choices`` over ``range(n)`` where the
+    item of popularity rank ``r`` has weight ``1 / (r + 1) ** alpha``. Ranks
+    are shuffled so popularity does not follow insertion order.
+    """
+    ranks = list(range(n))
+    rng.shuffle(ranks)
+    weights = [0.0] * n
+    for rank, index in enumerate(ranks):
+        weights[index] = 1.0 / (rank + 1) ** alpha
+    return list(accumulate(weights))
+
+
+def heavy_tailed(mean, rng, shape=1.5):
+    """A Pareto-distributed non-negative integer with the given mean."""
+    return int(rng.paretovariate(shape) * mean * (shape - 1) / shape)
+
+
+def sentence(rng, low, high):
+    return ' '.join(rng.choices(WORDS, k=rng.randint(low, high)))
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def insert(model, objects, batch_size):
+    """``bulk_create`` a generator of unsaved objects; returns their pks in order."""
+    pks = []
+    for batch in batched(objects, batch_size):
+        pks.extend(obj.pk for obj in model.objects.bulk_create(batch))
+    return pks
@@ -0,0 +1,77 @@
+"""
+JSON renderer and parser backed by orjson when it is installed.
+
+Drop-in replacements for DRF's ``JSONRenderer`` and ``JSONParser`` (select
+them with ``DEFAULT_RENDERER_CLASSES`` / ``DEFAULT_PARSER_CLASSES``). With
+orjson available, compact and ``indent=2`` output is encoded in one C call:
+datetimes, dates and UUIDs are handled natively, and anything else orjson
+does not know (Decimal, lazy strings, querysets...) goes through DRF's own
+encoder. Without orjson, or for output options orjson cannot reproduce
+(indents other than 2, ASCII-only output, integers wider than 64 bits), the
+stdlib based DRF implementation is used.
+
+The output decodes to the same JSON as DRF's, and is usually the same bytes,
+but not always:
+
+* floats in exponent notation have no ``+`` or leading zero in the exponent
+  (``1e16`` and ``1e-7`` where DRF writes ``1e+16`` and ``1e-07``);
+* NaN and infinities are written as ``null`` where DRF's strict mode raises.
+"""
+from rest_framework.utils import encoders
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+if orjson is not None:
+    OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+_encoder = encoders.JSONEncoder()
+
+
+def _default(obj):
+    return _encoder.default(obj)
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is None:
+            options = OPTIONS
+        elif indent == 2:
+            options = OPTIONS | orjson.OPT_INDENT_2
+        else:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=_default, option=options)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same JavaScript-safe escaping of U+2028 / U+2029 as DRF
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', 'utf-8')
+        if orjson is None or encoding.lower().replace('-', '') != 'utf8':
+            return super().parse(stream, media_type, parser_context)
+        try:
+            # orjson rejects NaN and Infinity, like the strict stdlib parser
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -0,0 +1,136 @@
+"""
+In-process metrics registry with Prometheus text exposition.
+
+Every request updates a handful of counters and histograms under one lock.
+The registry lives in the process, so each worker exposes its own numbers;
+scrape every worker (or sum them in Prometheus), as with any multi-process
+deployment of a pull-based client.
+"""
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.conf import settings
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+def max_fingerprints():
+    """Distinct (view, duplicate fingerprint) series kept before new ones are dropped."""
+    return getattr(settings, 'INSTRUMENTATION_MAX_FINGERPRINTS', 1000)
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._clear()
+
+    def reset(self):
+        with self.lock:
+            self._clear()
+
+    def _clear(self):
+        self.requests = defaultdict(int)  # (view, method, status) -> count
+        self.durations = defaultdict(lambda: Histogram(DURATION_BUCKETS))  # view
+        self.sampled = defaultdict(int)  # view -> sampled requests
+        self.queries = defaultdict(lambda: Histogram(QUERY_BUCKETS))  # view, sampled only
+        self.db_seconds = defaultdict(float)  # view
+        self.duplicates = defaultdict(int)  # view -> repeated executions
+        self.fingerprints = defaultdict(int)  # (view, fingerprint) -> repeated executions
+
+    def record(self, view, method, status, duration, queries=None):
+        """
+        Record one request. ``queries`` is the ``QueryRecorder`` of a sampled
+        request, or None.
+        """
+        with self.lock:
+            self.requests[view, method, status] += 1
+            self.durations[view].observe(duration)
+            if queries is None:
+                return
+            self.sampled[view] += 1
+            self.queries[view].observe(queries.count)
+            self.db_seconds[view] += queries.duration
+            if queries.duplicates:
+                self.duplicates[view] += sum(queries.duplicates.values())
+                for fingerprint, repeats in queries.duplicates.items():
+                    key = (view, fingerprint)
+                    if key in self.fingerprints or len(self.fingerprints) < max_fingerprints():
+                        self.fingerprints[key] += repeats
+
+    def render(self):
+        """The registry in the Prometheus text exposition format (0.0.4)."""
+        with self.lock:
+            lines = []
+            self._counter(lines, 'django_http_requests_total', "Requests by view, method and status.",
+                          ('view', 'method', 'status'), self.requests)
+            self._histogram(lines, 'django_http_request_duration_seconds', "Response time.",
+                            self.durations)
+            self._counter(lines, 'django_http_requests_sampled_total',
+                          "Requests whose database queries were recorded.", ('view',), self.sampled)
+            self._histogram(lines, 'django_db_queries_per_request', "Queries per sampled request.",
+                            self.queries)
+            self._counter(lines, 'django_db_query_duration_seconds_total',
+                          "Time spent in the database by sampled requests.", ('view',), self.db_seconds)
+            self._counter(lines, 'django_db_duplicate_queries_total',
+                          "Repeated executions of an already seen query in sampled requests (N+1s).",
+                          ('view',), self.duplicates)
+            self._counter(lines, 'django_db_duplicate_query_fingerprint_total',
+                          "Repeated executions per normalized query fingerprint.",
+                          ('view', 'fingerprint'), self.fingerprints)
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _labels(names, values):
+        if isinstance(values, str):
+            values = (values,)
+        pairs = ('%s="%s"' % (name, _escape(value)) for name, value in zip(names, values))
+        return '{%s}' % ','.join(pairs)
+
+    def _counter(self, lines, name, help_text, label_names, values):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} counter')
+        for labels, value in sorted(values.items()):
+            lines.append(f'{name}{self._labels(label_names, labels)} {_number(value)}')
+
+    def _histogram(self, lines, name, help_text, histograms):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} histogram')
+        for view, histogram in sorted(histograms.items()):
+            cumulative = 0
+            for bound, count in zip((*histogram.buckets, '+Inf'), histogram.counts):
+                cumulative += count
+                labels = self._labels(('view', 'le'), (view, _number(bound)))
+                lines.append(f'{name}_bucket{labels} {cumulative}')
+            labels = self._labels(('view',), view)
+            lines.append(f'{name}_sum{labels} {_number(histogram.sum)}')
+            lines.append(f'{name}_count{labels} {histogram.count}')
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _number(value):
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return str(value)
+
+
+registry = Registry()
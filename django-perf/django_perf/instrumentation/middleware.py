@@ -0,0 +1,164 @@
+"""
+Per-request SQL and latency instrumentation.
+
+``InstrumentationMiddleware`` times every request and, for a sampled share of
+them (``INSTRUMENTATION_SAMPLE_RATE``), wraps every database connection with
+a ``QueryRecorder`` that counts queries, sums their time and fingerprints
+them: the same fingerprint running more than once in one request is the
+signature of an N+1. Results go to the metrics registry (served by
+``django_perf.instrumentation.views.metrics``) and, when
+``INSTRUMENTATION_SERVER_TIMING`` is on, to a ``Server-Timing`` header. Like
+the metrics endpoint, the header is only sent to ``INTERNAL_IPS`` (or to
+anyone in DEBUG), since it exposes query counts and timings.
+
+Unsampled requests only cost two clock reads and one registry update.
+Queries run while a streaming response is being consumed, after the
+middleware has returned, are not recorded.
+"""
+import hashlib
+import logging
+import random
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+from functools import lru_cache
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+from .metrics import registry
+
+logger = logging.getLogger('instrumentation')
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDERS = re.compile(r'(?:%s|\?)(?:\s*,\s*(?:%s|\?))+')
+
+
+def sample_rate():
+    """Share of requests (0-1) whose queries are recorded."""
+    return getattr(settings, 'INSTRUMENTATION_SAMPLE_RATE', 0.1)
+
+
+def server_timing_enabled(request):
+    if not getattr(settings, 'INSTRUMENTATION_SERVER_TIMING', True):
+        return False
+    return settings.DEBUG or request.META.get('REMOTE_ADDR') in settings.INTERNAL_IPS
+
+
+def duplicate_warning():
+    """Repeats of one query in a single request that get logged, with its SQL."""
+    return getattr(settings, 'INSTRUMENTATION_DUPLICATE_WARNING', 10)
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(sql):
+    """
+    A short, stable id for a query shape: literals and ``IN (...)`` lists
+    are collapsed, so the same query for different rows gets the same id.
+    """
+    normalized = _PLACEHOLDERS.sub('?, ...', _NUMBER.sub('?', _STRING.sub('?', sql)))
+    return hashlib.blake2b(normalized.encode(), digest_size=6).hexdigest()
+
+
+class QueryRecorder:
+    """An ``execute_wrapper`` that records the queries of one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.sql = {}  # fingerprint -> first SQL seen, for logging
+        self.seen = Counter()
+        self._stack = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            key = fingerprint(sql)
+            self.seen[key] += 1
+            self.sql.setdefault(key, sql)
+
+    @property
+    def duplicates(self):
+        """fingerprint -> executions beyond the first."""
+        return {key: seen - 1 for key, seen in self.seen.items() if seen > 1}
+
+    def install(self):
+        self._stack = ExitStack()
+        for alias in connections:
+            self._stack.enter_context(connections[alias].execute_wrapper(self))
+
+    def uninstall(self):
+        self._stack.close()
+
+
+class InstrumentationMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        started = time.perf_counter()
+        recorder = QueryRecorder() if random.random() < sample_rate() else None
+        if recorder is None:
+            response = self.get_response(request)
+        else:
+            recorder.install()
+            try:
+                response = self.get_response(request)
+            finally:
+                recorder.uninstall()
+        return self.finish(request, response, started, recorder)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        recorder = QueryRecorder() if random.random() < sample_rate() else None
+        if recorder is None:
+            response = await self.get_response(request)
+        else:
+            # Database connections are per thread, and the async ORM runs its
+            # queries in the request's thread-sensitive worker thread
+            await sync_to_async(recorder.install)()
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(recorder.uninstall)()
+        return self.finish(request, response, started, recorder)
+
+    def finish(self, request, response, started, recorder):
+        duration = time.perf_counter() - started
+        match = getattr(request, 'resolver_match', None)
+        view = (match.view_name or match._func_path) if match else '<unresolved>'
+        registry.record(view, request.method, response.status_code, duration, recorder)
+        if recorder is None:
+            return response
+
+        duplicates = recorder.duplicates
+        for key, repeats in duplicates.items():
+            if repeats + 1 >= duplicate_warning():
+                logger.warning(
+                    "%s ran the same query %d times (fingerprint %s): %s",
+                    view, repeats + 1, key, recorder.sql[key],
+                )
+        if server_timing_enabled(request):
+            timings = (
+                f'db;dur={recorder.duration * 1000:.1f};'
+                f'desc="{recorder.count} queries, {sum(duplicates.values())} duplicates"',
+                f'total;dur={duration * 1000:.1f}',
+            )
+            existing = response.get('Server-Timing')
+            response['Server-Timing'] = ', '.join((existing, *timings) if existing else timings)
+        return response
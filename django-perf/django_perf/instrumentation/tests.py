@@ -0,0 +1,79 @@
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from .metrics import registry
+from .middleware import InstrumentationMiddleware, fingerprint
+
+User = get_user_model()
+
+
+def n_plus_one_view(request):
+    for user in User.objects.all():
+        User.objects.filter(pk=user.pk).exists()
+    return HttpResponse('ok')
+
+
+async def async_view(request):
+    async for user in User.objects.all():
+        await User.objects.filter(pk=user.pk).aexists()
+    return HttpResponse('ok')
+
+
+@override_settings(
+    INSTRUMENTATION_SAMPLE_RATE=1.0, INSTRUMENTATION_SERVER_TIMING=True, INTERNAL_IPS=['127.0.0.1'],
+)
+class InstrumentationTests(TestCase):
+    def setUp(self):
+        registry.reset()
+        for i in range(3):
+            User.objects.create_user(f"user{i}", f"user{i}@example.com", password="password123")
+
+    def test_records_queries_and_duplicates(self):
+        middleware = InstrumentationMiddleware(n_plus_one_view)
+        with self.assertLogs('instrumentation', 'WARNING'):
+            with override_settings(INSTRUMENTATION_DUPLICATE_WARNING=3):
+                response = middleware(RequestFactory().get('/'))
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn('desc="4 queries, 2 duplicates"', response['Server-Timing'])
+
+        text = registry.render()
+        self.assertIn('django_http_requests_total{view="<unresolved>",method="GET",status="200"} 1', text)
+        self.assertIn('django_db_queries_per_request_sum{view="<unresolved>"} 4', text)
+        self.assertIn('django_db_duplicate_queries_total{view="<unresolved>"} 2', text)
+
+    async def test_async_requests(self):
+        middleware = InstrumentationMiddleware(async_view)
+        response = await middleware(RequestFactory().get('/'))
+        self.assertIn('desc="4 queries, 2 duplicates"', response['Server-Timing'])
+
+    def test_unsampled_requests_skip_query_recording(self):
+        middleware = InstrumentationMiddleware(n_plus_one_view)
+        with override_settings(INSTRUMENTATION_SAMPLE_RATE=0):
+            response = middleware(RequestFactory().get('/'))
+        self.assertNotIn('Server-Timing', response)
+        text = registry.render()
+        self.assertIn('django_http_request_duration_seconds_count{view="<unresolved>"} 1', text)
+        self.assertNotIn('django_db_queries_per_request_count', text)
+
+    def test_server_timing_is_internal_only(self):
+        middleware = InstrumentationMiddleware(n_plus_one_view)
+        response = middleware(RequestFactory().get('/', REMOTE_ADDR='203.0.113.7'))
+        self.assertNotIn('Server-Timing', response)
+        self.assertIn('django_db_queries_per_request_sum{view="<unresolved>"} 4', registry.render())
+
+    def test_fingerprint_ignores_literals(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id IN (%s, %s) AND name = 'a'"),
+            fingerprint("SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = 'b'"),
+        )
+        self.assertNotEqual(fingerprint("SELECT a FROM t"), fingerprint("SELECT b FROM t"))
+
+    @override_settings(INSTRUMENTATION_METRICS_TOKEN="secret")
+    def test_metrics_endpoint(self):
+        self.assertEqual(self.client.get(reverse('metrics'), secure=True).status_code, 404)
+        response = self.client.get(reverse('metrics'), secure=True, HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        self.assertIn('# TYPE django_http_requests_total counter', response.content.decode())
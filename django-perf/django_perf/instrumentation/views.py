@@ -0,0 +1,25 @@
+import hmac
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+
+from .metrics import registry
+
+
+def allowed(request):
+    """
+    A bearer token (``INSTRUMENTATION_METRICS_TOKEN``) when one is set,
+    otherwise requests from ``INTERNAL_IPS`` or any request in DEBUG.
+    """
+    token = getattr(settings, 'INSTRUMENTATION_METRICS_TOKEN', None)
+    if token:
+        supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+        return hmac.compare_digest(supplied.encode(), token.encode())
+    return settings.DEBUG or request.META.get('REMOTE_ADDR') in settings.INTERNAL_IPS
+
+
+def metrics(request):
+    """Prometheus scrape endpoint."""
+    if not allowed(request):
+        raise Http404
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,128 @@
+"""
+Precompiled read path for model serializers.
+
+``Serializer.to_representation`` re-resolves every field for every object:
+it walks ``source_attrs``, wraps related keys in ``PKOnlyObject`` and
+dispatches through each field's ``get_attribute`` / ``to_representation``.
+A ``ReadPlan`` does that resolution once per serializer instance and keeps
+one small getter per field, so rendering a page of objects is a loop of
+attribute reads.
+
+Output is identical to DRF's: fields without a specialised getter (nested
+serializers, ``source='*'``, custom fields...) go through DRF's own code,
+and any object for which a field raises ``SkipField`` is serialized by DRF.
+Set ``SERIALIZER_READ_PLANS = False`` to turn the plans off.
+"""
+import datetime
+from operator import attrgetter
+
+from django.conf import settings
+from django.utils.functional import cached_property
+from rest_framework import ISO_8601, serializers
+from rest_framework.fields import SkipField
+from rest_framework.relations import PKOnlyObject
+from rest_framework.settings import api_settings
+
+# Fields whose representation of a non-None value is a single builtin call
+_CONVERTERS = {
+    serializers.CharField: str,
+    serializers.IntegerField: int,
+    serializers.StringRelatedField: str,
+}
+
+
+def _model_attname(serializer, source):
+    model = getattr(getattr(serializer, 'Meta', None), 'model', None)
+    if model is None:
+        return None
+    try:
+        return model._meta.get_field(source).attname
+    except Exception:
+        return None
+
+
+def _datetime_converter(field):
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    if output_format is None or output_format.lower() != ISO_8601:
+        return None
+    # The current timezone is fixed for the request the plan is built in
+    tz = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+    if tz is None:
+        return None
+
+    def convert(value):
+        if not isinstance(value, datetime.datetime) or value.utcoffset() is None:
+            return field.to_representation(value)
+        try:
+            value = value.astimezone(tz).isoformat()
+        except OverflowError:
+            return field.to_representation(value)
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+
+    return convert
+
+
+def _drf_getter(field):
+    def get(instance):
+        attribute = field.get_attribute(instance)
+        check_for_none = attribute.pk if isinstance(attribute, PKOnlyObject) else attribute
+        return None if check_for_none is None else field.to_representation(attribute)
+
+    return get
+
+
+def _compile(serializer, field):
+    """Return a ``getter(instance)`` producing the field's representation."""
+    if isinstance(field, serializers.SerializerMethodField):
+        return getattr(serializer, field.method_name)
+    if len(field.source_attrs) != 1:
+        return _drf_getter(field)
+    source = field.source_attrs[0]
+
+    if type(field) is serializers.PrimaryKeyRelatedField and field.pk_field is None:
+        attname = _model_attname(serializer, source)
+        return attrgetter(attname) if attname else _drf_getter(field)
+
+    if type(field) is serializers.DateTimeField:
+        convert = _datetime_converter(field)
+    else:
+        convert = _CONVERTERS.get(type(field))
+    if convert is None:
+        return _drf_getter(field)
+
+    read = attrgetter(source)
+
+    def get(instance):
+        value = read(instance)
+        return None if value is None else convert(value)
+
+    return get
+
+
+class ReadPlan:
+    def __init__(self, serializer):
+        self.serializer = serializer
+        self.steps = [(field.field_name, _compile(serializer, field)) for field in serializer._readable_fields]
+
+    def to_representation(self, instance):
+        try:
+            return {name: get(instance) for name, get in self.steps}
+        except (SkipField, AttributeError):
+            # Let DRF decide what to omit or how to fail
+            return serializers.Serializer.to_representation(self.serializer, instance)
+
+
+class ReadPlanMixin:
+    """Serialize through a ``ReadPlan`` compiled on first use."""
+
+    @cached_property
+    def _read_plan(self):
+        if not getattr(settings, 'SERIALIZER_READ_PLANS', True):
+            return None
+        return ReadPlan(self)
+
+    def to_representation(self, instance):
+        plan = self._read_plan
+        if plan is None:
+            return super().to_representation(instance)
+        return plan.to_representation(instance)
@@ -0,0 +1,56 @@
+import datetime
+import decimal
+import json
+import uuid
+from io import BytesIO
+from unittest import SkipTest, mock
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+
+try:
+    from rest_framework.exceptions import ParseError
+    from rest_framework.renderers import JSONRenderer
+except ImportError:  # pragma: no cover - optional dependency
+    raise SkipTest("djangorestframework is not installed")
+
+from . import fastjson
+
+
+class FastJSONTests(SimpleTestCase):
+    data = {
+        "aware": datetime.datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+        "offset": datetime.datetime(2024, 5, 1, 12, 30, tzinfo=datetime.timezone(datetime.timedelta(hours=2))),
+        "naive": datetime.datetime(2024, 5, 1, 12, 30),
+        "date": datetime.date(2024, 5, 1),
+        "price": decimal.Decimal("12.50"),
+        "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        "label": gettext_lazy("Invalid cursor"),
+        1: ["ünïcode", "line separator", None, True, 1.5, {}],
+    }
+
+    def test_matches_drf_output(self):
+        expected = JSONRenderer().render(self.data)
+        self.assertEqual(fastjson.FastJSONRenderer().render(self.data), expected)
+        indented = "application/json; indent=2"
+        self.assertEqual(
+            fastjson.FastJSONRenderer().render(self.data, indented),
+            JSONRenderer().render(self.data, indented),
+        )
+        with mock.patch.object(fastjson, "orjson", None):
+            self.assertEqual(fastjson.FastJSONRenderer().render(self.data), expected)
+
+    def test_exponents_differ_in_bytes_only(self):
+        data = {"big": 1e16, "small": 1e-7}
+        fast, drf = fastjson.FastJSONRenderer().render(data), JSONRenderer().render(data)
+        if fastjson.orjson is not None:
+            self.assertNotEqual(fast, drf)
+        self.assertEqual(json.loads(fast), json.loads(drf))
+
+    def test_parser(self):
+        parser = fastjson.FastJSONParser()
+        self.assertEqual(parser.parse(BytesIO(b'{"a": [1, "\xc3\xa9"]}')), {"a": [1, "é"]})
+        with self.assertRaises(ParseError):
+            parser.parse(BytesIO(b'{"a": NaN}'))
+        with mock.patch.object(fastjson, "orjson", None):
+            self.assertEqual(parser.parse(BytesIO(b'{"a": 1}')), {"a": 1})
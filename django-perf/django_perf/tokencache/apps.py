@@ -0,0 +1,19 @@
+from django.apps import AppConfig
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+
+
+class TokenCacheConfig(AppConfig):
+    name = 'django_perf.tokencache'
+
+    def ready(self):
+        from . import authentication
+
+        post_delete.connect(
+            authentication.forget_deleted_token, sender='authtoken.Token',
+            dispatch_uid='tokencache_forget_deleted_token',
+        )
+        post_save.connect(
+            authentication.forget_user_tokens, sender=settings.AUTH_USER_MODEL,
+            dispatch_uid='tokencache_forget_user_tokens',
+        )
@@ -0,0 +1,152 @@
+"""
+Token authentication with a two-tier lookup cache.
+
+DRF's ``TokenAuthentication`` joins the token and user tables on every
+request. ``CachedTokenAuthentication`` keeps ``key -> (user, token)`` in a
+bounded, per-process LRU (first tier) backed by the shared Django cache
+(second tier), and only falls back to the database on a miss.
+
+Entries are dropped when a token is deleted (which is how tokens are
+rotated) and whenever its user is saved, e.g. deactivated (the receivers
+are connected in ``TokenCacheConfig.ready``). Those signals clear the shared
+tier and this process's LRU; other processes can keep a stale first-tier
+entry for at most ``TOKEN_CACHE_LOCAL_TTL`` seconds, so keep that short.
+
+That bound only holds if the second tier really is shared. With a local
+memory cache each process would keep its own copy for
+``TOKEN_CACHE_SHARED_TTL`` and never see another process's evictions, so the
+second tier is skipped and only the short-lived LRU is used.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework.authentication import TokenAuthentication
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def shared_cache():
+    """The default cache, or None when it is private to this process."""
+    cache = caches['default']
+    return None if isinstance(cache, LocMemCache) else cache
+
+
+class LRUCache:
+    """A thread-safe, size-bounded mapping whose entries expire after ``ttl`` seconds."""
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class TokenCache:
+    """Two-tier ``token key -> (user, token)`` cache."""
+
+    def __init__(self):
+        self.local = LRUCache(
+            max_size=_setting('TOKEN_CACHE_MAX_SIZE', 10000),
+            ttl=_setting('TOKEN_CACHE_LOCAL_TTL', 10),
+        )
+
+    @staticmethod
+    def shared_key(key):
+        return f'auth:token:{key}'
+
+    def get(self, key):
+        entry = self.local.get(key)
+        if entry is None:
+            cache = shared_cache()
+            entry = cache.get(self.shared_key(key)) if cache is not None else None
+            if entry is None:
+                return None
+            self.local.set(key, entry)
+        # Hand out copies so per-request changes to request.user never leak
+        # into the cached instance.
+        user, token = entry
+        return copy.copy(user), token
+
+    def set(self, token):
+        entry = (token.user, token)
+        self.local.set(token.key, entry)
+        cache = shared_cache()
+        if cache is not None:
+            cache.set(self.shared_key(token.key), entry, _setting('TOKEN_CACHE_SHARED_TTL', 300))
+
+    def delete(self, *keys):
+        for key in keys:
+            self.local.delete(key)
+        cache = shared_cache()
+        if cache is not None:
+            cache.delete_many([self.shared_key(key) for key in keys])
+
+
+token_cache = TokenCache()
+
+
+def prime_token(token):
+    """Cache a freshly issued or looked-up token, e.g. right after login."""
+    token_cache.set(token)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is not None:
+            return cached
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(token)
+        return user, token
+
+
+# ---------- Invalidation (connected in TokenCacheConfig.ready) ----------
+def forget_deleted_token(sender, instance, **kwargs):
+    # Deleting a token is also how it is rotated; cascades from a deleted
+    # user land here too.
+    token_cache.delete(instance.key)
+
+
+def forget_user_tokens(sender, instance, created, **kwargs):
+    # The cache holds a copy of the user, so any change (deactivation,
+    # password, permissions) must evict it.
+    if created:
+        return
+    from rest_framework.authtoken.models import Token
+    keys = list(Token.objects.filter(user_id=instance.pk).values_list('key', flat=True))
+    if keys:
+        token_cache.delete(*keys)
@@ -0,0 +1,56 @@
+import tempfile
+from unittest import skipUnless
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from .authentication import LRUCache, token_cache
+
+User = get_user_model()
+
+
+@skipUnless(apps.is_installed('django_perf.tokencache'), "django_perf.tokencache is not installed")
+class TokenCacheTests(TestCase):
+    def setUp(self):
+        from rest_framework.authtoken.models import Token
+
+        cache.clear()
+        token_cache.local.clear()
+        user = User.objects.create_user("alice", "alice@example.com", password="password123")
+        self.token = Token.objects.create(user=user)
+
+    def test_local_memory_is_never_the_shared_tier(self):
+        token_cache.set(self.token)
+        self.assertIsNone(cache.get(token_cache.shared_key(self.token.key)))
+        token_cache.local.clear()
+        self.assertIsNone(token_cache.get(self.token.key))
+
+    def test_shared_tier_and_eviction(self):
+        with tempfile.TemporaryDirectory() as location, override_settings(CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": location},
+        }):
+            token_cache.set(self.token)
+            token_cache.local.clear()
+            user, token = token_cache.get(self.token.key)
+            self.assertEqual((user.pk, token.key), (self.token.user_id, self.token.key))
+
+            # Saving the user evicts both tiers
+            token_cache.local.clear()
+            user.save()
+            self.assertIsNone(cache.get(token_cache.shared_key(self.token.key)))
+            self.assertIsNone(token_cache.get(self.token.key))
+
+    def test_lru_evicts_oldest_and_expires(self):
+        lru = LRUCache(max_size=2, ttl=60)
+        lru.set("a", 1)
+        lru.set("b", 2)
+        lru.get("a")
+        lru.set("c", 3)
+        self.assertIsNone(lru.get("b"))
+        self.assertEqual((lru.get("a"), lru.get("c")), (1, 3))
+
+        expired = LRUCache(max_size=2, ttl=-1)
+        expired.set("a", 1)
+        self.assertIsNone(expired.get("a"))
@@ -0,0 +1,95 @@
+"""
+Seed a large blog for the benchmarks: users, tagged posts and comments.
+
+Tag usage, post authorship and comment targets follow power laws, so a few
+tags and posts are much hotter than the rest. Rows go in with
+``bulk_create`` (no signals), then the search index is built in batches.
+
+Use a scratch database: the command refuses to run twice on the same one.
+"""
+import random
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils.text import slugify
+
+from django_perf.benchmarks.seeding import WORDS, batched, heavy_tailed, insert, power_law, sentence
+from blog.models import Comment, Post, Tag
+from blog.search import index_posts
+
+PREFIX = 'bench'
+PostTag = Post.tags.through
+
+
+class Command(BaseCommand):
+    help = "Bulk-seed users, tagged blog posts and comments for the benchmarks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=5000)
+        parser.add_argument('--posts', type=int, default=500_000)
+        parser.add_argument('--tags', type=int, default=1000)
+        parser.add_argument('--tags-per-post', type=int, default=3, help="Mean tags per post.")
+        parser.add_argument('--comments', type=int, default=1_000_000)
+        parser.add_argument('--alpha', type=float, default=0.9, help="Power-law exponent of popularity.")
+        parser.add_argument('--batch-size', type=int, default=5000, help="Rows per INSERT.")
+        parser.add_argument('--seed', type=int, default=42, help="Random seed, for reproducible datasets.")
+
+    def handle(self, *args, **options):
+        if User.objects.filter(username__startswith=PREFIX).exists():
+            raise CommandError("This database is already seeded; point the settings at a fresh one.")
+        rng = random.Random(options['seed'])
+        n_users, n_posts, batch_size = options['users'], options['posts'], options['batch_size']
+        started = time.perf_counter()
+
+        names = [f'{a} {b}' for a in WORDS for b in WORDS if a != b]
+        rng.shuffle(names)
+        names = names[:options['tags']]
+
+        with transaction.atomic():
+            password = make_password('benchmark')
+            user_pks = insert(User, (
+                User(username=f'{PREFIX}{i}', email=f'{PREFIX}{i}@example.com', password=password)
+                for i in range(n_users)
+            ), batch_size)
+            tag_pks = insert(Tag, (Tag(name=name, slug=slugify(name)) for name in names), batch_size)
+            self.log(f"Inserted {n_users} users and {len(tag_pks)} tags", started)
+
+            activity = power_law(n_users, options['alpha'], rng)
+            post_pks = insert(Post, (
+                Post(author_id=user_pks[author], title=sentence(rng, 3, 8).capitalize(),
+                     content=sentence(rng, 50, 300))
+                for author in rng.choices(range(n_users), cum_weights=activity, k=n_posts)
+            ), batch_size)
+            self.log(f"Inserted {n_posts} posts", started)
+
+            tag_weights = power_law(len(tag_pks), options['alpha'], rng)
+
+            def post_tags():
+                for post_pk in post_pks:
+                    wanted = min(10, heavy_tailed(options['tags_per_post'], rng))
+                    for tag in set(rng.choices(range(len(tag_pks)), cum_weights=tag_weights, k=wanted)):
+                        yield PostTag(post_id=post_pk, tag_id=tag_pks[tag])
+
+            tagged = len(insert(PostTag, post_tags(), batch_size)) if tag_pks else 0
+            self.log(f"Inserted {tagged} post tags", started)
+
+            post_weights = power_law(n_posts, options['alpha'], rng) if n_posts else []
+            insert(Comment, (
+                Comment(post_id=post_pks[post], author_id=user_pks[rng.randrange(n_users)],
+                        content=sentence(rng, 5, 40))
+                for post in (rng.choices(range(n_posts), cum_weights=post_weights, k=options['comments'])
+                             if n_posts else [])
+            ), batch_size)
+            self.log(f"Inserted {options['comments']} comments", started)
+
+            for batch in batched(post_pks, batch_size):
+                index_posts(batch)
+            self.log("Indexed posts for search", started)
+
+        self.stdout.write(self.style.SUCCESS("Seeded. Run `manage.py run_benchmarks` next."))
+
+    def log(self, message, started):
+        self.stdout.write(f"[{time.perf_counter() - started:7.1f}s] {message}")
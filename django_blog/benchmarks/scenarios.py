@@ -0,0 +1,35 @@
+"""
+Benchmark scenarios for the blog: list, detail, tag and search pages, for
+anonymous visitors (page cache) and a logged-in user (no page cache).
+"""
+from django.contrib.auth.models import User
+from django.core.management.base import CommandError
+from django.db.models import Count
+
+from blog.models import Post, Tag
+from django_perf.benchmarks.runner import Scenario
+
+
+def get_scenarios():
+    post = Post.objects.only('id').annotate(n=Count('comments')).order_by('-n', 'id').first()
+    if post is None:
+        raise CommandError("No posts to benchmark; run `manage.py seed_benchmark` first.")
+    tag = Tag.objects.annotate(n=Count('posts')).order_by('-n', 'id').first()
+    user = User.objects.order_by('id').first()
+    last_page = -(-Post.objects.count() // 10)
+
+    scenarios = []
+    for suffix, reader in (('', None), ('-logged-in', user)):
+        scenarios += [
+            Scenario(f'post-list{suffix}', '/', user=reader),
+            Scenario(f'post-list-last-page{suffix}', f'/?page={last_page}', user=reader),
+            Scenario(f'post-detail{suffix}', f'/post/{post.pk}/', user=reader),
+        ]
+        if tag is not None:
+            scenarios.append(Scenario(f'tag-list{suffix}', f'/tags/{tag.slug}/', user=reader))
+    scenarios += [
+        Scenario('search', '/search/?q=latency'),
+        Scenario('search-two-terms', '/search/?q=database+ind'),
+        Scenario('list-filtered-by-search', '/?q=cache'),
+    ]
+    return scenarios
@@ -0,0 +1,35 @@
+import json
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from blog.models import Comment, Post
+from blog.search import search_posts
+
+
+class BenchmarkTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        call_command('seed_benchmark', users=20, posts=100, tags=15, comments=200, stdout=StringIO())
+
+    def test_seed(self):
+        self.assertEqual(User.objects.count(), 20)
+        self.assertEqual(Post.objects.count(), 100)
+        self.assertEqual(Comment.objects.count(), 200)
+        self.assertTrue(Post.tags.through.objects.exists())
+        # Seeded posts are searchable
+        self.assertTrue(search_posts('latency').exists())
+        with self.assertRaises(CommandError):
+            call_command('seed_benchmark', users=1, posts=0, comments=0, stdout=StringIO())
+
+    def test_report(self):
+        out = StringIO()
+        call_command('run_benchmarks', repeat=2, warmup=0, stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertIn('post-list-logged-in', report['scenarios'])
+        for name, result in report['scenarios'].items():
+            self.assertEqual(result['status'], 200, name)
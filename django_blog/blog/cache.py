@@ -0,0 +1,201 @@
+"""
+Rendered-output caching for the blog.
+
+Cached fragments (post cards, comment blocks) and anonymous pages are keyed
+on version stamps instead of being deleted one by one:
+
+* every post has a version, bumped when the post, its tags or its comments
+  change;
+* every tag has a version, bumped when the tag or any of its posts change;
+* the post list has one version, bumped when any post or tag changes.
+
+Bumping a version makes every key built from the old one unreachable, and
+the stale entries simply age out. Versions are time based rather than
+counters, so a version evicted from the cache is never reissued. They expire
+too, after ``BLOG_CACHE_VERSION_TIMEOUT``, and are only created for posts and
+tags that exist, so probing ``/post/<n>/`` cannot fill the cache with them.
+
+Works with any Django cache backend: local memory in tests, Redis in
+production (see ``CACHES`` in settings). Hits and misses are counted per
+kind of entry, summed in the process and added to the cache once per
+request (see ``stats``).
+"""
+import hashlib
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+
+KINDS = ('card', 'comments', 'page')
+
+
+def timeout():
+    return getattr(settings, 'BLOG_CACHE_TIMEOUT', 600)
+
+
+def version_timeout():
+    """Lifetime of a version stamp; longer than the entries built from it."""
+    return getattr(settings, 'BLOG_CACHE_VERSION_TIMEOUT', 86400)
+
+
+# ---------- Versions ----------
+def _post_key(post_id):
+    return f'blog:v:post:{post_id}'
+
+
+def _tag_key(tag_id):
+    return f'blog:v:tag:{tag_id}'
+
+
+LIST_KEY = 'blog:v:list'
+
+
+def _get_versions(keys, create=True):
+    """
+    Return the current version of each key, creating missing ones (or
+    returning None for them if ``create`` is false).
+    """
+    versions = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    if missing and create:
+        cache.set_many(missing, version_timeout())
+        versions.update(missing)
+    return [versions.get(key) for key in keys]
+
+
+def post_versions(post_ids):
+    return dict(zip(post_ids, _get_versions([_post_key(pk) for pk in post_ids])))
+
+
+def post_version(post_id, create=True):
+    """The post's version; pass ``create=False`` when the post may not exist."""
+    return _get_versions([_post_key(post_id)], create)[0]
+
+
+def tag_version(tag_id):
+    return _get_versions([_tag_key(tag_id)])[0]
+
+
+def list_version():
+    return _get_versions([LIST_KEY])[0]
+
+
+def bump(post_ids=(), tag_ids=(), list_pages=True):
+    """Invalidate everything rendered from the given posts and tags."""
+    keys = [_post_key(pk) for pk in post_ids] + [_tag_key(pk) for pk in tag_ids]
+    if list_pages:
+        keys.append(LIST_KEY)
+
+    def set_versions():
+        version = time.time_ns()
+        cache.set_many({key: version for key in keys}, version_timeout())
+
+    # Once now, and again after the commit: a request that read the old rows
+    # before the commit may have cached them under the first new version
+    set_versions()
+    transaction.on_commit(set_versions)
+
+
+def attach_versions(posts):
+    """Set ``cache_version`` on a page of posts with a single cache lookup."""
+    posts = list(posts)
+    versions = post_versions([post.pk for post in posts])
+    for post in posts:
+        post.cache_version = versions[post.pk]
+    return posts
+
+
+# ---------- Hit/miss counters ----------
+def _stat_key(kind, outcome):
+    return f'blog:stats:{kind}:{outcome}'
+
+
+_pending = Counter()
+_pending_lock = threading.Lock()
+
+
+def record(kind, hit):
+    """Count a hit or miss; it reaches the cache with the next ``flush_stats``."""
+    with _pending_lock:
+        _pending[_stat_key(kind, 'hits' if hit else 'misses')] += 1
+
+
+def flush_stats():
+    """
+    Add the counts recorded since the last flush to the cache: one ``incr``
+    per counter that moved. Runs when a request finishes (see the receiver
+    in ``blog.models``).
+    """
+    with _pending_lock:
+        pending = _pending.copy()
+        _pending.clear()
+    for key, count in pending.items():
+        try:
+            cache.incr(key, count)
+        except ValueError:  # first count, or evicted
+            if not cache.add(key, count, timeout=None):
+                cache.incr(key, count)
+
+
+def stats():
+    """Return ``{kind: {'hits': n, 'misses': n}}`` for every kind of entry."""
+    flush_stats()
+    keys = [_stat_key(kind, outcome) for kind in KINDS for outcome in ('hits', 'misses')]
+    values = cache.get_many(keys)
+    return {
+        kind: {outcome: values.get(_stat_key(kind, outcome), 0) for outcome in ('hits', 'misses')}
+        for kind in KINDS
+    }
+
+
+def reset_stats():
+    with _pending_lock:
+        _pending.clear()
+    cache.delete_many([_stat_key(kind, outcome) for kind in KINDS for outcome in ('hits', 'misses')])
+
+
+# ---------- Fragments ----------
+def fragment_key(kind, post_id, version, vary_on=()):
+    parts = [str(part) for part in vary_on]
+    return ':'.join([f'blog:fragment:{kind}:{post_id}:{version}', *parts])
+
+
+# ---------- Anonymous pages ----------
+class AnonymousPageCacheMixin:
+    """
+    Serve whole rendered pages from the cache to anonymous GET requests.
+
+    Views list the versions their output depends on in
+    ``get_page_cache_versions``, or return None to bypass the cache.
+    """
+
+    def get_page_cache_versions(self):
+        return [list_version()]
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != 'GET' or request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+
+        self.kwargs = kwargs
+        versions = self.get_page_cache_versions()
+        if versions is None:
+            return super().dispatch(request, *args, **kwargs)
+        versions = ':'.join(str(version) for version in versions)
+        path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+        key = f'blog:page:{versions}:{path}'
+        cached = cache.get(key)
+        record('page', cached is not None)
+        if cached is not None:
+            content, content_type = cached
+            return HttpResponse(content, content_type=content_type)
+
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200:
+            if hasattr(response, 'render'):
+                response.render()
+            cache.set(key, (response.content, response['Content-Type']), timeout())
+        return response
@@ -1,17 +1,30 @@
 from django import forms
 from .models import Post, Comment, Tag
+from .tags import resolve_tags
 from taggit.forms import TagWidget  # ✅ Added import for TagWidget
 
 class PostForm(forms.ModelForm):
+    # Comma separated tag names, resolved to tags by clean_tags and saved by
+    # blog.tags.set_post_tags in the views
+    tags = forms.CharField(required=False, widget=TagWidget())  # ✅ Added TagWidget for tag input
+
     class Meta:
         model = Post
-        fields = ['title', 'content', 'tags']  # ✅ include tags field directly
+        fields = ['title', 'content']
         widgets = {
             'title': forms.TextInput(attrs={'placeholder': 'Post title'}),
             'content': forms.Textarea(attrs={'placeholder': 'Write your post here...', 'rows': 10}),
-            'tags': TagWidget(),  # ✅ Added TagWidget for tag input
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.fields['tags'].initial = ', '.join(tag.name for tag in self.instance.tags.all())
+
+    def clean_tags(self):
+        # Creates the tags that are missing, so a clash is reported on the form
+        return resolve_tags(self.cleaned_data['tags'])
+
 class CommentForm(forms.ModelForm):
     class Meta:
         model = Comment
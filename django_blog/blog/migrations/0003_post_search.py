@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:25
+
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import Value
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX blog_post_search_vector_gin ON blog_post USING gin (search_vector)'
+        )
+    elif connection.vendor == 'sqlite':
+        schema_editor.execute(
+            'CREATE VIRTUAL TABLE blog_post_fts USING fts5(title, content, tags)'
+        )
+
+    # Backfill existing posts
+    Post = apps.get_model('blog', 'Post')
+    for post in Post.objects.prefetch_related('tags').iterator(chunk_size=1000):
+        tags = ' '.join(tag.name for tag in post.tags.all())
+        if connection.vendor == 'postgresql':
+            Post.objects.filter(pk=post.pk).update(search_vector=(
+                SearchVector('title', weight='A')
+                + SearchVector(Value(tags), weight='A')
+                + SearchVector('content', weight='B')
+            ))
+        elif connection.vendor == 'sqlite':
+            schema_editor.execute(
+                'INSERT INTO blog_post_fts (rowid, title, content, tags) VALUES (%s, %s, %s, %s)',
+                [post.pk, post.title, post.content, tags],
+            )
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS blog_post_search_vector_gin')
+    elif connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS blog_post_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0002_tag_comment_post_tags'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
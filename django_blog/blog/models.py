@@ -1,17 +1,37 @@
+import hashlib
+
+from django.core.signals import request_finished
 from django.db import models
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
 from django.contrib.auth.models import User
+from django.contrib.postgres.search import SearchVectorField
+from django.urls import reverse
 from django.utils.text import slugify
 
+class PostQuerySet(models.QuerySet):
+    def for_list(self):
+        """Load authors and tags up front so list templates run no per-post queries."""
+        return self.defer('search_vector').select_related('author').prefetch_related('tags')
+
+
 class Post(models.Model):
     title = models.CharField(max_length=200)
     content = models.TextField()
     published_date = models.DateTimeField(auto_now_add=True)
     author = models.ForeignKey(User, on_delete=models.CASCADE)
     tags = models.ManyToManyField('Tag', blank=True, related_name='posts')  # ← new
+    # Weighted title/tags/content vector, GIN-indexed on PostgreSQL (blog/search.py)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = PostQuerySet.as_manager()
 
     def __str__(self):
         return self.title
 
+    def get_absolute_url(self):
+        return reverse('post-detail', kwargs={'pk': self.pk})
+
 class Comment(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='comments')
     author = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -26,17 +46,120 @@ class Comment(models.Model):
         return f'Comment by {self.author.username} on {self.post.title}'
 
 # ---------- New: Tag model ----------
+def tag_slug(name):
+    """The slug of a tag name; names with no letters or digits get a hash."""
+    return slugify(name, allow_unicode=True) or 'tag-' + hashlib.md5(name.casefold().encode()).hexdigest()[:12]
+
+
 class Tag(models.Model):
     name = models.CharField(max_length=50, unique=True)
-    slug = models.SlugField(max_length=60, unique=True, blank=True)
+    slug = models.SlugField(max_length=60, unique=True, blank=True, allow_unicode=True)
 
     class Meta:
         ordering = ['name']
 
     def save(self, *args, **kwargs):
         if not self.slug:
-            self.slug = slugify(self.name)
+            self.slug = tag_slug(self.name)
         super().save(*args, **kwargs)
 
     def __str__(self):
         return self.name
+
+
+# ---------- Search index maintenance ----------
+@receiver(post_save, sender=Post)
+def index_post_on_save(sender, instance, **kwargs):
+    from .search import index_post
+
+    index_post(instance)
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def index_post_on_tags_change(sender, instance, action, reverse, pk_set, **kwargs):
+    from .search import index_post
+
+    if reverse and action == 'pre_clear':
+        # tag.posts.clear() does not say which posts lost the tag afterwards
+        instance._cleared_post_ids = list(instance.posts.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        index_post(instance)
+        return
+    if action == 'post_clear':
+        pk_set = getattr(instance, '_cleared_post_ids', [])
+    for post in Post.objects.filter(pk__in=pk_set):
+        index_post(post)
+
+
+@receiver(post_save, sender=Tag)
+def index_posts_on_tag_rename(sender, instance, created, **kwargs):
+    from .search import index_post
+
+    if not created:
+        for post in instance.posts.all():
+            index_post(post)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post_on_delete(sender, instance, **kwargs):
+    from .search import unindex_post
+
+    unindex_post(instance.pk)
+
+
+# ---------- Rendered-output cache invalidation (blog/cache.py) ----------
+@receiver(post_save, sender=Post)
+def bump_cache_on_post_save(sender, instance, **kwargs):
+    from . import cache
+
+    cache.bump(post_ids=[instance.pk], tag_ids=list(instance.tags.values_list('pk', flat=True)))
+
+
+@receiver(pre_delete, sender=Post)
+def bump_cache_on_post_delete(sender, instance, **kwargs):
+    from . import cache
+
+    # The tag rows are gone by post_delete, so collect them now
+    cache.bump(post_ids=[instance.pk], tag_ids=list(instance.tags.values_list('pk', flat=True)))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def bump_cache_on_comment_change(sender, instance, **kwargs):
+    from . import cache
+
+    cache.bump(post_ids=[instance.post_id], list_pages=False)
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def bump_cache_on_tags_change(sender, instance, action, reverse, pk_set, **kwargs):
+    from . import cache
+
+    if action == 'pre_clear':
+        related = instance.posts if reverse else instance.tags
+        pk_set = set(related.values_list('pk', flat=True))
+    elif action not in ('post_add', 'post_remove'):
+        return
+    if reverse:
+        cache.bump(post_ids=pk_set, tag_ids=[instance.pk])
+    else:
+        cache.bump(post_ids=[instance.pk], tag_ids=pk_set)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(pre_delete, sender=Tag)
+def bump_cache_on_tag_change(sender, instance, **kwargs):
+    from . import cache
+
+    cache.bump(post_ids=list(instance.posts.values_list('pk', flat=True)), tag_ids=[instance.pk])
+
+
+@receiver(request_finished)
+def flush_cache_stats(sender, **kwargs):
+    from . import cache
+
+    # Hit/miss counts are summed during the request and written once here
+    cache.flush_stats()
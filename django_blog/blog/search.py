@@ -0,0 +1,122 @@
+"""
+Full-text search over blog posts.
+
+On PostgreSQL every post keeps a weighted ``search_vector`` (title and tags
+rank above content) backed by a GIN index. On SQLite, used for local and test
+runs, the same text is mirrored into the ``blog_post_fts`` FTS5 table.
+
+Either way ``search_posts`` returns a plain ``Post`` queryset annotated with
+``rank`` and ordered best match first, so it can be paginated like any other
+queryset without a DISTINCT over the tags join.
+"""
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import F, OuterRef, Subquery, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce
+
+from .models import Post
+
+FTS_TABLE = 'blog_post_fts'
+
+
+def _tags_text(post):
+    return ' '.join(post.tags.values_list('name', flat=True))
+
+
+def index_post(post):
+    """Refresh the search index entry of a post."""
+    tags = _tags_text(post)
+    if connection.vendor == 'postgresql':
+        Post.objects.filter(pk=post.pk).update(search_vector=(
+            SearchVector('title', weight='A')
+            + SearchVector(Value(tags), weight='A')
+            + SearchVector('content', weight='B')
+        ))
+    elif connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post.pk])
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, content, tags) VALUES (%s, %s, %s, %s)',
+                [post.pk, post.title, post.content, tags],
+            )
+
+
+def index_posts(post_ids):
+    """
+    Index many posts at once, e.g. after ``bulk_create``, which sends no
+    signals: one UPDATE on PostgreSQL, two ``executemany`` calls on SQLite.
+    """
+    post_ids = list(post_ids)
+    if connection.vendor == 'postgresql':
+        tags = (
+            Post.tags.through.objects.filter(post_id=OuterRef('pk')).order_by()
+            .values('post_id').annotate(names=StringAgg('tag__name', ' ')).values('names')
+        )
+        Post.objects.filter(pk__in=post_ids).update(search_vector=(
+            SearchVector('title', weight='A')
+            + SearchVector(Coalesce(Subquery(tags), Value('')), weight='A')
+            + SearchVector('content', weight='B')
+        ))
+    elif connection.vendor == 'sqlite':
+        tags = {}
+        for post_id, name in Post.tags.through.objects.filter(post_id__in=post_ids).values_list(
+            'post_id', 'tag__name'
+        ):
+            tags.setdefault(post_id, []).append(name)
+        rows = [
+            (pk, title, content, ' '.join(tags.get(pk, ())))
+            for pk, title, content in Post.objects.filter(pk__in=post_ids).values_list('pk', 'title', 'content')
+        ]
+        with connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [(row[0],) for row in rows])
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, content, tags) VALUES (%s, %s, %s, %s)', rows,
+            )
+
+
+def unindex_post(post_id):
+    """Drop a deleted post from the FTS5 table (PostgreSQL needs nothing)."""
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post_id])
+
+
+def _fts_query(q):
+    # Quote every term so user input is never parsed as FTS5 syntax; the
+    # trailing * makes the last term a prefix match.
+    terms = ['"{}"'.format(term.replace('"', '""')) for term in q.split()]
+    if terms:
+        terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def search_posts(q, queryset=None):
+    """Return posts matching ``q``, best match first."""
+    if queryset is None:
+        queryset = Post.objects.all()
+
+    if connection.vendor == 'postgresql':
+        query = SearchQuery(q, search_type='websearch')
+        return (
+            queryset.filter(search_vector=query)
+            .annotate(rank=SearchRank(F('search_vector'), query))
+            .order_by('-rank', '-published_date')
+        )
+
+    match = _fts_query(q)
+    if not match:
+        return queryset.none()
+    # bm25() is lower for better matches; weight title and tags over content.
+    rank = RawSQL(
+        f'SELECT -bm25({FTS_TABLE}, 10.0, 1.0, 5.0) FROM {FTS_TABLE} '
+        f'WHERE {FTS_TABLE} MATCH %s AND rowid = blog_post.id',
+        (match,),
+    )
+    matches = RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', (match,))
+    return (
+        queryset.filter(pk__in=matches)
+        .annotate(rank=rank)
+        .order_by('-rank', '-published_date')
+    )
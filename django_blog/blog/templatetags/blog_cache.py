@@ -0,0 +1,53 @@
+from django import template
+from django.core.cache import cache
+
+from blog import cache as blog_cache
+
+register = template.Library()
+
+
+class PostCacheNode(template.Node):
+    def __init__(self, nodelist, kind, post, vary_on):
+        self.nodelist = nodelist
+        self.kind = kind
+        self.post = post
+        self.vary_on = vary_on
+
+    def render(self, context):
+        kind = self.kind.resolve(context)
+        post = self.post.resolve(context)
+        version = getattr(post, 'cache_version', None)
+        if version is None:
+            version = blog_cache.post_version(post.pk)
+        vary_on = [var.resolve(context) for var in self.vary_on]
+        key = blog_cache.fragment_key(kind, post.pk, version, vary_on)
+
+        content = cache.get(key)
+        blog_cache.record(kind, content is not None)
+        if content is None:
+            content = self.nodelist.render(context)
+            cache.set(key, content, blog_cache.timeout())
+        return content
+
+
+@register.tag('postcache')
+def do_postcache(parser, token):
+    """
+    Cache the enclosed fragment until the post's version changes::
+
+        {% postcache "card" post %} ... {% endpostcache %}
+        {% postcache "comments" post user.pk %} ... {% endpostcache %}
+
+    Extra arguments are added to the key, for fragments that differ per user.
+    """
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' tag requires a kind and a post.")
+    nodelist = parser.parse(('endpostcache',))
+    parser.delete_first_token()
+    return PostCacheNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        parser.compile_filter(bits[2]),
+        [parser.compile_filter(bit) for bit in bits[3:]],
+    )
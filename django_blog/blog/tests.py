@@ -1,3 +1,261 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from . import cache as blog_cache
+from .forms import PostForm
+from .models import Comment, Post, Tag
+from .search import search_posts
+from .tags import resolve_tags, set_post_tags
+
+
+class PostSearchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="writer", password="password123")
+        self.django_post = Post.objects.create(
+            title="Getting started with Django", content="Models, views and templates.", author=self.user
+        )
+        self.python_post = Post.objects.create(
+            title="Python tips", content="A few words about Django querysets.", author=self.user
+        )
+        self.other_post = Post.objects.create(
+            title="Gardening", content="Tomatoes and basil.", author=self.user
+        )
+
+    def test_ranks_title_matches_first(self):
+        results = list(search_posts("django"))
+        self.assertEqual(results, [self.django_post, self.python_post])
+
+    def test_prefix_match_on_last_term(self):
+        self.assertEqual(list(search_posts("tomat")), [self.other_post])
+
+    def test_tags_are_searchable_without_duplicates(self):
+        self.other_post.tags.add(Tag.objects.create(name="outdoors"), Tag.objects.create(name="outdoor-life"))
+        self.assertEqual(list(search_posts("outdoor")), [self.other_post])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.other_post.title = "Composting"
+        self.other_post.save()
+        self.assertEqual(list(search_posts("composting")), [self.other_post])
+        self.other_post.delete()
+        self.assertEqual(list(search_posts("composting")), [])
+
+    def test_user_input_is_not_parsed_as_query_syntax(self):
+        self.assertEqual(list(search_posts('django" OR NOT (')), [])
+
+    def test_search_view(self):
+        response = self.client.get(reverse("search-results"), {"q": "django"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context["posts"]), [self.django_post, self.python_post])
+
+
+class TagServiceTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="writer", password="password123")
+        self.post = Post.objects.create(title="Post", content="...", author=self.user)
+
+    def tag_names(self, count, prefix="tag"):
+        return ", ".join(f"{prefix} {i}" for i in range(count))
+
+    def queries_to_set(self, value):
+        with CaptureQueriesContext(connection) as ctx:
+            set_post_tags(self.post, value)
+        return len(ctx.captured_queries)
+
+    def test_resolves_case_insensitively_and_dedupes(self):
+        Tag.objects.create(name="Django")
+        tags = resolve_tags("django, DJANGO , python,, python")
+        self.assertEqual([tag.name for tag in tags], ["Django", "python"])
+        self.assertEqual(Tag.objects.count(), 2)
+
+    def test_names_without_ascii_letters_keep_their_tags(self):
+        tags = resolve_tags("日本語, C++!!, ???, !!!")
+        self.assertEqual([tag.name for tag in tags], ["日本語", "C++!!", "???", "!!!"])
+        self.assertEqual(tags[0].slug, "日本語")
+        self.assertEqual(tags[1].slug, "c")
+        self.assertTrue(tags[2].slug.startswith("tag-"))
+        self.assertNotEqual(tags[2].slug, tags[3].slug)
+        self.assertEqual(resolve_tags("???"), [tags[2]])
+        set_post_tags(self.post, tags)
+        response = self.client.get(reverse("posts-by-tag", args=[tags[0].slug]))
+        self.assertContains(response, self.post.title)
+
+    def test_name_taken_under_another_slug_resolves_to_that_tag(self):
+        cpp = Tag.objects.create(name="C++", slug="cpp")
+        self.assertEqual(resolve_tags("C++"), [cpp])
+        self.assertEqual(Tag.objects.count(), 1)
+
+    def test_unresolvable_names_are_form_errors(self):
+        form = PostForm(data={"title": "Tagged", "content": "...", "tags": "x" * 51})
+        self.assertIn("tags", form.errors)
+        # A clash the insert ignores (e.g. a concurrent rename) is reported too
+        with mock.patch.object(Tag.objects, "bulk_create"):
+            form = PostForm(data={"title": "Tagged", "content": "...", "tags": "news, fresh"})
+            self.assertEqual(form.errors["tags"], ["These tags clash with existing tags: news, fresh."])
+
+    def test_set_post_tags_diffs_rows(self):
+        set_post_tags(self.post, "a, b, c")
+        set_post_tags(self.post, "b, c, d")
+        self.assertEqual(sorted(self.post.tags.values_list("name", flat=True)), ["b", "c", "d"])
+        self.assertEqual(list(search_posts("d")), [self.post])
+
+    def test_query_count_is_constant_in_number_of_tags(self):
+        # Benchmark: creating, then replacing 5 vs 50 tags costs the same number of queries.
+        small_create = self.queries_to_set(self.tag_names(5, "small"))
+        small_replace = self.queries_to_set(self.tag_names(5, "small-new"))
+        self.post.tags.clear()
+        large_create = self.queries_to_set(self.tag_names(50, "large"))
+        large_replace = self.queries_to_set(self.tag_names(50, "large-new"))
+        self.assertEqual(small_create, large_create)
+        self.assertEqual(small_replace, large_replace)
+
+    def test_create_view_saves_tags(self):
+        self.client.force_login(self.user)
+        response = self.client.post(reverse("post-create"), {
+            "title": "Tagged", "content": "...", "tags": "news, Django",
+        })
+        post = Post.objects.get(title="Tagged")
+        self.assertRedirects(response, post.get_absolute_url(), fetch_redirect_response=False)
+        self.assertEqual(sorted(post.tags.values_list("slug", flat=True)), ["django", "news"])
+
+
+class RenderingQueryCountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.users = [User.objects.create_user(username=f"user{i}", password="password123") for i in range(3)]
+        self.tags = [Tag.objects.create(name=f"tag{i}") for i in range(4)]
+
+    def seed(self, num_posts, comments_per_post=0):
+        posts = []
+        for i in range(num_posts):
+            post = Post.objects.create(title=f"Post {i}", content="...", author=self.users[i % 3])
+            post.tags.add(*self.tags[: i % 4 + 1])
+            for j in range(comments_per_post):
+                Comment.objects.create(post=post, author=self.users[j % 3], content=f"Comment {j}")
+            posts.append(post)
+        return posts
+
+    def count_queries(self, url, params=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_list_views_query_count_does_not_grow_with_page_size(self):
+        self.seed(2)
+        small = {
+            "list": self.count_queries(reverse("post-list")),
+            "tag": self.count_queries(reverse("posts-by-tag", args=["tag0"])),
+            "search": self.count_queries(reverse("search-results"), {"q": "post"}),
+        }
+        self.seed(8)
+        large = {
+            "list": self.count_queries(reverse("post-list")),
+            "tag": self.count_queries(reverse("posts-by-tag", args=["tag0"])),
+            "search": self.count_queries(reverse("search-results"), {"q": "post"}),
+        }
+        self.assertEqual(small, large)
+        # COUNT(*), posts with authors, tags
+        self.assertEqual(large["list"], 3)
+
+    def test_detail_view_query_count_does_not_grow_with_comments(self):
+        few, many = self.seed(1, comments_per_post=2) + self.seed(1, comments_per_post=20)
+        self.assertEqual(self.count_queries(reverse("post-detail", args=[few.pk])), 2)
+        self.assertEqual(self.count_queries(reverse("post-detail", args=[many.pk])), 2)
+
+    def test_detail_view_renders_comment_links_for_author(self):
+        post = self.seed(1, comments_per_post=1)[0]
+        self.client.force_login(self.users[0])
+        response = self.client.get(reverse("post-detail", args=[post.pk]))
+        self.assertContains(response, reverse("comment-update", args=[post.comments.get().pk]))
+
+
+class RenderCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="writer", password="password123")
+        self.tag = Tag.objects.create(name="news")
+        self.post = Post.objects.create(title="Cached post", content="...", author=self.user)
+        self.post.tags.add(self.tag)
+
+    def test_anonymous_pages_are_served_from_cache(self):
+        self.client.get(reverse("post-list"))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("post-list"))
+        self.assertContains(response, "Cached post")
+        self.assertEqual(blog_cache.stats()["page"], {"hits": 1, "misses": 1})
+
+    def test_post_save_invalidates_list_and_detail(self):
+        detail_url = reverse("post-detail", args=[self.post.pk])
+        self.client.get(reverse("post-list"))
+        self.client.get(detail_url)
+        self.post.title = "Edited post"
+        self.post.save()
+        self.assertContains(self.client.get(reverse("post-list")), "Edited post")
+        self.assertContains(self.client.get(detail_url), "Edited post")
+
+    def test_comment_invalidates_comment_block(self):
+        detail_url = reverse("post-detail", args=[self.post.pk])
+        self.client.force_login(self.user)
+        self.client.get(detail_url)
+        Comment.objects.create(post=self.post, author=self.user, content="First!")
+        self.assertContains(self.client.get(detail_url), "First!")
+
+    def test_tag_changes_invalidate_tag_pages_and_cards(self):
+        tag_url = reverse("posts-by-tag", args=["news"])
+        self.assertContains(self.client.get(tag_url), "Cached post")
+        self.post.tags.remove(self.tag)
+        self.assertNotContains(self.client.get(tag_url), "Cached post")
+
+        self.post.tags.add(self.tag)
+        self.client.get(reverse("post-list"))
+        self.tag.name = "breaking"
+        self.tag.save()
+        self.assertContains(self.client.get(reverse("post-list")), "breaking")
+
+    def test_set_post_tags_refreshes_tag_pages(self):
+        fresh_url = reverse("posts-by-tag", args=["fresh"])
+        news_url = reverse("posts-by-tag", args=["news"])
+        other = Post.objects.create(title="Other post", content="...", author=self.user)
+        self.assertNotContains(self.client.get(fresh_url), "Other post")
+        self.assertNotContains(self.client.get(news_url), "Other post")
+        with self.captureOnCommitCallbacks(execute=True):
+            set_post_tags(other, "news, fresh")
+        self.assertContains(self.client.get(fresh_url), "Other post")
+        self.assertContains(self.client.get(news_url), "Other post")
+
+    def test_versions_are_only_created_for_existing_posts(self):
+        missing_url = reverse("post-detail", args=[self.post.pk + 100])
+        self.assertEqual(self.client.get(missing_url).status_code, 404)
+        self.assertIsNone(blog_cache.post_version(self.post.pk + 100, create=False))
+
+        detail_url = reverse("post-detail", args=[self.post.pk])
+        cache.clear()
+        self.client.get(detail_url)  # uncached, but now versioned
+        self.assertIsNotNone(blog_cache.post_version(self.post.pk, create=False))
+        self.client.get(detail_url)
+        with self.assertNumQueries(0):
+            self.assertContains(self.client.get(detail_url), "Cached post")
+
+    def test_post_cards_are_cached_for_logged_in_users(self):
+        self.client.force_login(self.user)
+        blog_cache.reset_stats()
+        self.client.get(reverse("post-list"))
+        self.client.get(reverse("post-list"))
+        self.assertEqual(blog_cache.stats()["card"], {"hits": 1, "misses": 1})
 
-# Create your tests here.
+    def test_counters_are_written_once_per_request(self):
+        for i in range(4):
+            Post.objects.create(title=f"Post {i}", content="...", author=self.user)
+        self.client.force_login(self.user)
+        blog_cache.reset_stats()
+        self.client.get(reverse("post-list"))
+        with mock.patch.object(cache, "incr", wraps=cache.incr) as incr:
+            self.client.get(reverse("post-list"))
+        incr.assert_called_once_with("blog:stats:card:hits", 5)
+        self.assertEqual(blog_cache.stats()["card"], {"hits": 5, "misses": 5})
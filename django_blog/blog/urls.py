@@ -22,6 +22,6 @@ urlpatterns = [
     path('comment/<int:pk>/delete/', views.CommentDeleteView.as_view(), name='comment-delete'),
 
     # ✅ Tags & Search (updated for check)
-    path('tags/<slug:tag_slug>/', views.PostByTagListView.as_view(), name='posts-by-tag'),
+    path('tags/<str:tag_name>/', views.TagListView.as_view(), name='posts-by-tag'),
     path('search/', views.SearchResultsView.as_view(), name='search-results'),
 ]
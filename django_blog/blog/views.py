@@ -7,10 +7,12 @@ from django.views.generic import ListView, DetailView, CreateView, UpdateView, D
 from django.contrib.auth.forms import UserCreationForm
 from django import forms
 from django.contrib.auth.models import User
-from django.db.models import Q
 
 from .models import Post, Comment, Tag
 from .forms import PostForm, CommentForm
+from .search import search_posts
+from .tags import set_post_tags
+from .cache import AnonymousPageCacheMixin, attach_versions, post_version, tag_version
 
 
 # --------- Authentication Views ---------
@@ -32,7 +34,7 @@ def profile(request):
 
 
 # --------- Post Views (CRUD) ---------
-class PostListView(ListView):
+class PostListView(AnonymousPageCacheMixin, ListView):
     model = Post
     template_name = "blog/posts_list.html"
     context_object_name = "posts"
@@ -40,26 +42,38 @@ class PostListView(ListView):
     paginate_by = 10
 
     def get_queryset(self):
-        qs = super().get_queryset()
-        q = self.request.GET.get("q", "")
+        qs = super().get_queryset().for_list()
+        q = self.request.GET.get("q", "").strip()
         if q:
-            qs = qs.filter(
-                Q(title__icontains=q)
-                | Q(content__icontains=q)
-                | Q(tags__name__icontains=q)
-            ).distinct()
+            qs = search_posts(q, qs)
         return qs
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["posts"] = attach_versions(context["posts"])
+        return context
+
 
-class PostDetailView(DetailView):
+class PostDetailView(AnonymousPageCacheMixin, DetailView):
     model = Post
     template_name = "blog/post_detail.html"
     context_object_name = "post"
 
+    def get_page_cache_versions(self):
+        # Only posts that were rendered before have a version; the others are
+        # rendered uncached once, which also weeds out requests for bad pks
+        version = post_version(self.kwargs["pk"], create=False)
+        return None if version is None else [version]
+
+    def get_queryset(self):
+        return Post.objects.defer("search_vector").select_related("author")
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        post = self.get_object()
-        context["comments"] = post.comments.all()
+        self.object.cache_version = post_version(self.object.pk)
+        # Lazy: the template's length and loop share one query, and a cached
+        # comments fragment skips it entirely
+        context["comments"] = self.object.comments.select_related("author")
         context["comment_form"] = CommentForm()
         return context
 
@@ -72,20 +86,9 @@ class PostCreateView(LoginRequiredMixin, CreateView):
     def form_valid(self, form):
         form.instance.author = self.request.user
         response = super().form_valid(form)
-        self._handle_tags(form.cleaned_data.get("tags", ""), self.object)
+        set_post_tags(self.object, form.cleaned_data["tags"])
         return response
 
-    def _handle_tags(self, tags_field, post_obj):
-        tag_names = [t.strip() for t in tags_field.split(",") if t.strip()]
-        tags_objs = []
-        for name in tag_names:
-            try:
-                tag_obj = Tag.objects.get(name__iexact=name)
-            except Tag.DoesNotExist:
-                tag_obj = Tag.objects.create(name=name)
-            tags_objs.append(tag_obj)
-        post_obj.tags.set(tags_objs)
-
 
 class PostUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
     model = Post
@@ -94,20 +97,9 @@ class PostUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
 
     def form_valid(self, form):
         response = super().form_valid(form)
-        self._handle_tags(form.cleaned_data.get("tags", ""), self.object)
+        set_post_tags(self.object, form.cleaned_data["tags"])
         return response
 
-    def _handle_tags(self, tags_field, post_obj):
-        tag_names = [t.strip() for t in tags_field.split(",") if t.strip()]
-        tags_objs = []
-        for name in tag_names:
-            try:
-                tag_obj = Tag.objects.get(name__iexact=name)
-            except Tag.DoesNotExist:
-                tag_obj = Tag.objects.create(name=name)
-            tags_objs.append(tag_obj)
-        post_obj.tags.set(tags_objs)
-
     def test_func(self):
         post = self.get_object()
         return self.request.user == post.author
@@ -124,25 +116,31 @@ class PostDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
 
 
 # --------- Tag & Search Views ---------
-class TagListView(ListView):
+class TagListView(AnonymousPageCacheMixin, ListView):
     model = Post
     template_name = "blog/posts_list.html"
     context_object_name = "posts"
     paginate_by = 10
 
+    def get_page_cache_versions(self):
+        tag_ids = Tag.objects.filter(slug=self.kwargs.get("tag_name")).values_list("pk", flat=True)
+        return [tag_version(tag_id) for tag_id in tag_ids]
+
     def get_queryset(self):
         tag_name = self.kwargs.get("tag_name")
-        return Post.objects.filter(tags__slug=tag_name).order_by("-published_date").distinct()
+        # Tag slugs are unique, so the join cannot duplicate posts
+        return Post.objects.for_list().filter(tags__slug=tag_name).order_by("-published_date")
 
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
         ctx["tag_name"] = self.kwargs.get("tag_name")
+        ctx["posts"] = attach_versions(ctx["posts"])
         return ctx
 
 
 class SearchResultsView(ListView):
     model = Post
-    template_name = "blog/search_results.html"
+    template_name = "blog/posts_list.html"
     context_object_name = "posts"
     paginate_by = 10
 
@@ -150,12 +148,13 @@ class SearchResultsView(ListView):
         q = self.request.GET.get("q", "").strip()
         if not q:
             return Post.objects.none()
-        queryset = Post.objects.filter(
-            Q(title__icontains=q)
-            | Q(content__icontains=q)
-            | Q(tags__name__icontains=q)
-        ).distinct().order_by("-published_date")
-        return queryset
+        # Ranked full-text search, best match first (see blog/search.py)
+        return search_posts(q, Post.objects.for_list())
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["posts"] = attach_versions(context["posts"])
+        return context
 
 
 # --------- Comment CRUD ---------
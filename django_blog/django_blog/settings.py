@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -39,9 +41,13 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'blog',
     'taggit',
+    'django_perf.instrumentation',
+    'django_perf.benchmarks',
+    'benchmarks',
 ]
 
 MIDDLEWARE = [
+    'django_perf.instrumentation.middleware.InstrumentationMiddleware',  # outermost, so it times everything
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -85,6 +91,31 @@ DATABASES = {
     }
 }
 
+# Local and test runs can use SQLite instead; post search then falls back
+# to an FTS5 index (see blog/search.py).
+if os.environ.get('BLOG_USE_SQLITE') or 'test' in sys.argv:
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.sqlite3',
+    }
+
+
+
+# Cache for rendered blog fragments and anonymous pages (blog/cache.py).
+# Local memory by default; set REDIS_URL to share it between workers.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+if os.environ.get('REDIS_URL'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['REDIS_URL'],
+    }
+
+BLOG_CACHE_TIMEOUT = 600  # seconds
+BLOG_CACHE_VERSION_TIMEOUT = 86400  # seconds; must outlive BLOG_CACHE_TIMEOUT
 
 
 # Password validation
@@ -148,3 +179,8 @@ TEMPLATES = [
         },
     },
 ]
+
+# Query and latency instrumentation (django_perf/instrumentation/middleware.py)
+INSTRUMENTATION_SAMPLE_RATE = 1.0 if DEBUG else 0.1  # share of requests whose queries are recorded
+INSTRUMENTATION_SERVER_TIMING = True  # Server-Timing header on sampled responses to INTERNAL_IPS (any in DEBUG)
+INSTRUMENTATION_METRICS_TOKEN = None  # bearer token for /metrics/; unset: INTERNAL_IPS only (any in DEBUG)
@@ -0,0 +1,23 @@
+"""Async (ASGI-native) variants of the account read endpoints; see posts.async_views."""
+from rest_framework import permissions
+from rest_framework.response import Response
+
+from posts.async_views import AsyncAPIView
+from .models import CustomUser
+
+
+class AsyncProfileView(AsyncAPIView):
+    """Async ``GET /profile/`` (``ProfileView``)."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    async def get(self, request):
+        user = await CustomUser.objects.values(
+            'username', 'email', 'followers_count', 'following_count', 'posts_count'
+        ).aget(pk=request.user.pk)
+        return self.render(Response({
+            'username': user['username'],
+            'email': user['email'],
+            'followers': user['followers_count'],
+            'following': user['following_count'],
+            'posts': user['posts_count'],
+        }))
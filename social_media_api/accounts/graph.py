@@ -0,0 +1,93 @@
+"""
+Cached adjacency lists for the follow graph.
+
+For each user the cache holds two sorted arrays of user ids: who they follow
+and who follows them. Arrays of 64-bit ints pickle to a few bytes per edge,
+so even large follower lists stay cheap to store and fetch.
+
+Lists are built from the database on first use and dropped by the
+``m2m_changed`` / ``pre_delete`` receivers in ``accounts.models``, which call
+``apply_edges`` once the surrounding transaction commits. They are never
+patched in place: a read-modify-write of a cached list would lose edges
+written concurrently by another request.
+
+The lists are for reads only. Writes go to the database unconditionally, so
+a stale list can never veto a follow or unfollow.
+"""
+from array import array
+from bisect import bisect_left
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+def timeout():
+    return getattr(settings, 'FOLLOW_GRAPH_TIMEOUT', 3600)
+
+
+def _key(kind, user_id):
+    return f'graph:{kind}:{user_id}'
+
+
+def _load(kind, user_ids):
+    """Return ``{user_id: array}`` for ``kind`` ('following' or 'followers')."""
+    from .models import Follow
+
+    keys = {_key(kind, user_id): user_id for user_id in user_ids}
+    cached = cache.get_many(list(keys))
+    lists = {keys[key]: ids for key, ids in cached.items()}
+
+    missing = [user_id for user_id in user_ids if user_id not in lists]
+    if missing:
+        own, other = (
+            ('from_customuser_id', 'to_customuser_id') if kind == 'following'
+            else ('to_customuser_id', 'from_customuser_id')
+        )
+        built = {user_id: array('q') for user_id in missing}
+        rows = (
+            Follow.objects.filter(**{f'{own}__in': missing})
+            .order_by(own, other)
+            .values_list(own, other)
+        )
+        for user_id, other_id in rows:
+            built[user_id].append(other_id)
+        cache.set_many({_key(kind, user_id): ids for user_id, ids in built.items()}, timeout())
+        lists.update(built)
+    return lists
+
+
+def following_ids(user_id):
+    """Sorted ids of the users ``user_id`` follows."""
+    return _load('following', [user_id])[user_id]
+
+
+def following_lists(user_ids):
+    """``{user_id: sorted following ids}`` for many users in one cache round trip."""
+    return _load('following', list(user_ids))
+
+
+def follower_ids(user_id):
+    """Sorted ids of the users following ``user_id``."""
+    return _load('followers', [user_id])[user_id]
+
+
+def contains(ids, user_id):
+    """Membership test on a sorted id array."""
+    index = bisect_left(ids, user_id)
+    return index < len(ids) and ids[index] == user_id
+
+
+def apply_edges(edges):
+    """
+    Drop the cached lists touched by added or removed ``(follower,
+    followed)`` edges; they are rebuilt from the database on next use.
+    """
+    if not edges:
+        return
+    keys = {_key('following', follower_id) for follower_id, _ in edges}
+    keys.update(_key('followers', followed_id) for _, followed_id in edges)
+    cache.delete_many(keys)
+
+
+def forget(user_id):
+    cache.delete_many([_key('following', user_id), _key('followers', user_id)])
@@ -0,0 +1,31 @@
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts import suggestions
+
+
+class Command(BaseCommand):
+    help = "Precompute \"who to follow\" suggestions for every user and cache them."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'user_ids', nargs='*', type=int,
+            help="Only compute suggestions for these users (default: every active user).",
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help="Number of users written to the cache at a time.",
+        )
+
+    def handle(self, *args, **options):
+        if isinstance(caches['default'], LocMemCache):
+            raise CommandError(
+                "The default cache is local memory, so the suggestions would vanish with this "
+                "process; configure a shared cache (REDIS_URL) first."
+            )
+        computed = suggestions.compute_all(
+            user_ids=options['user_ids'] or None,
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Computed suggestions for {computed} users."))
@@ -0,0 +1,20 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Index the follow table by (followed, follower). The unique constraint
+    already covers (follower, followed), which serves following lists; this
+    one lets followers lists be range-scanned in follower id order.
+    """
+
+    dependencies = [
+        ('accounts', '0002_counters'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX follow_to_from_idx ON accounts_customuser_following (to_customuser_id, from_customuser_id)',
+            'DROP INDEX follow_to_from_idx',
+        ),
+    ]
@@ -1,5 +1,11 @@
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.signals import m2m_changed, pre_delete
+from django.dispatch import receiver
+
+from . import graph
+
 
 class CustomUser(AbstractUser):
     following = models.ManyToManyField(
@@ -8,6 +14,70 @@ class CustomUser(AbstractUser):
         related_name='followers',
         blank=True
     )
+    # Denormalized counters, kept in sync by the signal handlers below and
+    # in posts.models; `manage.py recount` repairs any drift.
+    followers_count = models.IntegerField(default=0)
+    following_count = models.IntegerField(default=0)
+    posts_count = models.IntegerField(default=0)
 
     def __str__(self):
         return self.username
+
+
+Follow = CustomUser.following.through
+
+
+@receiver(m2m_changed, sender=Follow)
+def update_follow_counts(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'post_add':
+        edges = [(other, instance.pk) if reverse else (instance.pk, other) for other in pk_set]
+        delta = 1
+    elif action in ('pre_remove', 'pre_clear'):
+        # pk_set may name users that are not actually linked; only count the
+        # edges that exist before they are removed.
+        own, other = ('to_customuser', 'from_customuser') if reverse else ('from_customuser', 'to_customuser')
+        rows = Follow.objects.filter(**{own: instance.pk})
+        if action == 'pre_remove':
+            rows = rows.filter(**{f'{other}__in': pk_set})
+        edges = list(rows.values_list('from_customuser_id', 'to_customuser_id'))
+        delta = -1
+    else:
+        return
+    _apply_follow_edges(edges, delta)
+    # The cached adjacency lists only change once the new edges are visible
+    transaction.on_commit(lambda: graph.apply_edges(edges))
+
+
+@receiver(pre_delete, sender=CustomUser)
+def release_follow_counts(sender, instance, **kwargs):
+    # Follow rows are removed by the cascade without m2m_changed signals.
+    edges = list(
+        Follow.objects.filter(models.Q(from_customuser=instance) | models.Q(to_customuser=instance))
+        .values_list('from_customuser_id', 'to_customuser_id')
+    )
+    _apply_follow_edges(edges, -1)
+    user_id = instance.pk
+
+    def forget():
+        graph.apply_edges(edges)
+        graph.forget(user_id)
+
+    transaction.on_commit(forget)
+
+
+def _apply_follow_edges(edges, delta):
+    """Increment (or decrement) counters for a list of (follower, followed) ids."""
+    if not edges:
+        return
+    following = {}
+    followers = {}
+    for follower_id, followed_id in edges:
+        following[follower_id] = following.get(follower_id, 0) + 1
+        followers[followed_id] = followers.get(followed_id, 0) + 1
+    # One UPDATE per distinct amount instead of one per user
+    for field, counts in (('following_count', following), ('followers_count', followers)):
+        by_amount = {}
+        for user_id, amount in counts.items():
+            by_amount.setdefault(amount, []).append(user_id)
+        for amount, user_ids in by_amount.items():
+            CustomUser.objects.filter(pk__in=user_ids).update(**{field: F(field) + delta * amount})
@@ -1,6 +1,9 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model, authenticate
 from rest_framework import serializers
 from rest_framework.authtoken.models import Token
+from django_perf.tokencache.authentication import prime_token
+
 
 User = get_user_model()
 
@@ -18,7 +21,7 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
             email=validated_data.get('email'),
             password=validated_data['password']
         )
-        Token.objects.create(user=user)
+        prime_token(Token.objects.create(user=user))
         return user
 
 
@@ -31,3 +34,20 @@ class UserLoginSerializer(serializers.Serializer):
         if user and user.is_active:
             return user
         raise serializers.ValidationError("Invalid credentials")
+
+
+class BulkFollowSerializer(serializers.Serializer):
+    action = serializers.ChoiceField(choices=['follow', 'unfollow'])
+    user_ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False)
+
+    def validate_user_ids(self, value):
+        limit = getattr(settings, 'FOLLOW_BULK_MAX_USERS', 100)
+        if len(value) > limit:
+            raise serializers.ValidationError(f"At most {limit} user ids per request.")
+        return list(dict.fromkeys(value))
+
+
+class UserSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = ['id', 'username']
@@ -0,0 +1,116 @@
+"""
+"Who to follow" suggestions from the follow graph.
+
+Candidates for a user are the accounts followed by the people they follow
+(friends of friends), ranked by how many of those people follow them.
+Counting runs over whole id arrays at a time: the followees' sorted arrays
+are chained into a single ``Counter`` update, so there is no per-edge Python
+or ORM work.
+
+``compute_all`` (run by ``manage.py compute_suggestions``) loads the graph
+once and precomputes every user's list; ``get_suggestions`` then serves it
+from the cache, only dropping accounts the user has followed since.
+"""
+import heapq
+from array import array
+from collections import Counter
+from itertools import chain
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import graph
+from .models import CustomUser, Follow
+
+
+def limit():
+    """Number of suggestions stored per user."""
+    return getattr(settings, 'SUGGESTIONS_LIMIT', 20)
+
+
+def timeout():
+    return getattr(settings, 'SUGGESTIONS_TIMEOUT', 2 * 24 * 3600)
+
+
+def suggestions_key(user_id):
+    return f'suggestions:{user_id}'
+
+
+def load_following_index():
+    """Return ``{user_id: array of followed ids}`` for the whole graph in one query."""
+    index = {}
+    rows = Follow.objects.order_by('from_customuser_id', 'to_customuser_id').values_list(
+        'from_customuser_id', 'to_customuser_id'
+    )
+    for follower_id, followed_id in rows.iterator(chunk_size=10000):
+        ids = index.get(follower_id)
+        if ids is None:
+            ids = index[follower_id] = array('q')
+        ids.append(followed_id)
+    return index
+
+
+def rank(user_id, following, following_of, size=None):
+    """
+    Return ``[(candidate_id, mutual_count)]`` best first.
+
+    ``following`` are the ids ``user_id`` follows; ``following_of`` maps each
+    of them to the ids they follow.
+    """
+    counts = Counter(chain.from_iterable(following_of.get(other, ()) for other in following))
+    counts.pop(user_id, None)
+    for other in following:
+        counts.pop(other, None)
+    return heapq.nsmallest(size or limit(), counts.items(), key=lambda item: (-item[1], item[0]))
+
+
+def _entries(ranked, usernames):
+    return [
+        {'id': user_id, 'username': usernames[user_id], 'mutual_count': mutual}
+        for user_id, mutual in ranked if user_id in usernames
+    ]
+
+
+def compute_all(user_ids=None, batch_size=1000):
+    """Precompute and cache suggestions for ``user_ids`` (default: everyone)."""
+    index = load_following_index()
+    usernames = dict(CustomUser.objects.filter(is_active=True).values_list('id', 'username'))
+    if user_ids is None:
+        user_ids = list(usernames)
+
+    computed = 0
+    batch = {}
+    for user_id in user_ids:
+        ranked = rank(user_id, index.get(user_id, ()), index)
+        batch[suggestions_key(user_id)] = _entries(ranked, usernames)
+        if len(batch) == batch_size:
+            cache.set_many(batch, timeout())
+            computed += len(batch)
+            batch = {}
+    if batch:
+        cache.set_many(batch, timeout())
+        computed += len(batch)
+    return computed
+
+
+def compute_for(user_id):
+    """Compute one user's suggestions from the cached graph (a cache miss)."""
+    following = graph.following_ids(user_id)
+    ranked = rank(user_id, following, graph.following_lists(following)) if following else []
+    usernames = dict(
+        CustomUser.objects.filter(id__in=[candidate_id for candidate_id, _ in ranked], is_active=True)
+        .values_list('id', 'username')
+    )
+    entries = _entries(ranked, usernames)
+    cache.set(suggestions_key(user_id), entries, timeout())
+    return entries
+
+
+def get_suggestions(user, size=None):
+    """Return up to ``size`` suggestions for ``user``, best first."""
+    entries = cache.get(suggestions_key(user.id))
+    if entries is None:
+        entries = compute_for(user.id)
+    following = graph.following_ids(user.id)
+    entries = [entry for entry in entries if not graph.contains(following, entry['id'])]
+    return entries[:size or limit()]
@@ -1,3 +1,349 @@
-from django.test import TestCase
+import json
+import tempfile
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from django_perf.tokencache.authentication import token_cache
+
+from accounts import graph, suggestions
+from accounts.models import Follow
+
+from posts.models import Post, Comment
+
+User = get_user_model()
+
+
+class CounterTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user(username="alice", password="password123")
+        self.bob = User.objects.create_user(username="bob", password="password123")
+        self.carol = User.objects.create_user(username="carol", password="password123")
+
+    def assertCounts(self, user, followers, following, posts=0):
+        user.refresh_from_db()
+        self.assertEqual(
+            (user.followers_count, user.following_count, user.posts_count),
+            (followers, following, posts),
+        )
+
+    def test_follow_and_unfollow_endpoints(self):
+        self.client.force_authenticate(self.alice)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("follow-user", args=[self.bob.id]))
+        self.client.post(reverse("follow-user", args=[self.bob.id]))  # already following
+        self.assertCounts(self.alice, followers=0, following=1)
+        self.assertCounts(self.bob, followers=1, following=0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("unfollow-user", args=[self.bob.id]))
+        self.client.post(reverse("unfollow-user", args=[self.bob.id]))  # not following
+        self.assertCounts(self.alice, followers=0, following=0)
+        self.assertCounts(self.bob, followers=0, following=0)
+
+    def test_reverse_add_and_clear(self):
+        self.bob.followers.add(self.alice, self.carol)
+        self.assertCounts(self.bob, followers=2, following=0)
+        self.assertCounts(self.carol, followers=0, following=1)
+        self.bob.followers.clear()
+        self.assertCounts(self.bob, followers=0, following=0)
+        self.assertCounts(self.alice, followers=0, following=0)
+
+    def test_deleting_a_user_releases_follow_counts(self):
+        self.alice.following.add(self.bob)
+        self.bob.following.add(self.carol)
+        self.bob.delete()
+        self.assertCounts(self.alice, followers=0, following=0)
+        self.assertCounts(self.carol, followers=0, following=0)
+
+    def test_post_and_comment_counts(self):
+        post = Post.objects.create(author=self.alice, title="hello", content="...")
+        comment = Comment.objects.create(post=post, author=self.bob, content="hi")
+        Comment.objects.create(post=post, author=self.carol, content="hey")
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 2)
+        self.assertCounts(self.alice, followers=0, following=0, posts=1)
+
+        comment.delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        post.delete()
+        self.assertCounts(self.alice, followers=0, following=0, posts=0)
+
+    def test_cascades_update_counters_in_grouped_queries(self):
+        post = Post.objects.create(author=self.alice, title="hello", content="...")
+        Comment.objects.bulk_create([Comment(post=post, author=self.bob, content="hi") for _ in range(50)])
+        with self.assertNumQueries(4):  # not one UPDATE per cascaded comment
+            post.delete()
+        self.assertCounts(self.alice, followers=0, following=0, posts=0)
+
+        post = Post.objects.create(author=self.alice, title="again", content="...")
+        own = Post.objects.create(author=self.bob, title="bob's", content="...")
+        for target in (post, post, own):
+            Comment.objects.create(post=target, author=self.bob, content="hi")
+        Comment.objects.create(post=post, author=self.carol, content="hey")
+        self.bob.delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        self.assertCounts(self.alice, followers=0, following=0, posts=1)
+
+    def test_profile_reads_counters(self):
+        self.client.force_authenticate(self.alice)
+        self.alice.following.add(self.bob, self.carol)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("profile"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["following"], 2)
+
+    def test_recount_repairs_drift(self):
+        self.alice.following.add(self.bob)
+        post = Post.objects.create(author=self.bob, title="hello", content="...")
+        Comment.objects.create(post=post, author=self.alice, content="hi")
+        User.objects.update(followers_count=7, following_count=7, posts_count=7)
+        Post.objects.update(comments_count=7)
+
+        call_command("recount", batch_size=2, stdout=StringIO())
+
+        self.assertCounts(self.alice, followers=0, following=1)
+        self.assertCounts(self.bob, followers=1, following=0, posts=1)
+        self.assertCounts(self.carol, followers=0, following=0)
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+
+
+class FollowGraphTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user(username="alice", password="password123")
+        self.others = [User.objects.create_user(username=f"user{i}", password="password123") for i in range(4)]
+        self.client.force_authenticate(self.alice)
+
+    def ids(self, users):
+        return sorted(user.id for user in users)
+
+    def test_lists_follow_m2m_changes(self):
+        self.assertEqual(list(graph.following_ids(self.alice.id)), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.alice.following.add(*self.others[:3])
+        self.assertEqual(list(graph.following_ids(self.alice.id)), self.ids(self.others[:3]))
+        self.assertEqual(list(graph.follower_ids(self.others[0].id)), [self.alice.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.others[0].followers.clear()
+        self.assertEqual(list(graph.following_ids(self.alice.id)), self.ids(self.others[1:3]))
+        self.assertEqual(list(graph.follower_ids(self.others[0].id)), [])
+
+    def test_bulk_follow(self):
+        self.alice.following.add(self.others[0])
+        ids = [self.others[0].id, self.others[1].id, self.others[2].id, 9999]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("bulk-follow"), {"action": "follow", "user_ids": ids}, format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["changed"], [self.others[1].id, self.others[2].id])
+        self.assertEqual(response.data["unchanged"], [self.others[0].id])
+        self.assertEqual(response.data["not_found"], [9999])
+        self.assertEqual(list(graph.following_ids(self.alice.id)), self.ids(self.others[:3]))
+        self.alice.refresh_from_db()
+        self.assertEqual(self.alice.following_count, 3)
+
+    def test_bulk_unfollow(self):
+        self.alice.following.add(*self.others[:2])
+        ids = [self.others[0].id, self.others[3].id]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("bulk-follow"), {"action": "unfollow", "user_ids": ids}, format="json"
+            )
+        self.assertEqual(response.data["changed"], [self.others[0].id])
+        self.assertEqual(response.data["unchanged"], [self.others[3].id])
+        self.assertEqual(list(self.alice.following.values_list("id", flat=True)), [self.others[1].id])
+
+    def test_stale_graph_never_vetoes_a_write(self):
+        target = self.others[0]
+        graph.following_ids(self.alice.id)  # cache "follows nobody"
+        Follow.objects.create(from_customuser=self.alice, to_customuser=target)  # no signal
+        response = self.client.post(reverse("unfollow-user", args=[target.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(self.alice.following.filter(pk=target.pk).exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("follow-user", args=[target.id]))
+        graph.following_ids(self.alice.id)
+        Follow.objects.filter(from_customuser=self.alice).delete()  # cache now says "following"
+        self.client.post(reverse("follow-user", args=[target.id]))
+        self.assertTrue(self.alice.following.filter(pk=target.pk).exists())
+
+        Follow.objects.filter(from_customuser=self.alice).delete()
+        response = self.client.post(
+            reverse("bulk-follow"), {"action": "follow", "user_ids": [target.id]}, format="json"
+        )
+        self.assertEqual(response.data["changed"], [target.id])
+        self.assertTrue(self.alice.following.filter(pk=target.pk).exists())
+
+    @override_settings(FOLLOW_BULK_MAX_USERS=2)
+    def test_bulk_rejects_too_many_ids_and_self(self):
+        response = self.client.post(
+            reverse("bulk-follow"), {"action": "follow", "user_ids": self.ids(self.others[:3])}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(
+            reverse("bulk-follow"), {"action": "follow", "user_ids": [self.alice.id]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class SuggestionTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.alice, self.bob, self.carol, self.dave, self.erin = [
+            User.objects.create_user(username=name, password="password123")
+            for name in ("alice", "bob", "carol", "dave", "erin")
+        ]
+        # alice follows bob and carol; both follow dave, only carol follows erin
+        self.alice.following.add(self.bob, self.carol)
+        self.bob.following.add(self.dave, self.alice)
+        self.carol.following.add(self.dave, self.erin)
+        self.client.force_authenticate(self.alice)
+
+    def test_ranked_by_mutual_follows(self):
+        suggestions.compute_all()
+        graph.following_ids(self.alice.id)  # warm the follow graph
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("suggestions"))
+        self.assertEqual(response.data, [
+            {"id": self.dave.id, "username": "dave", "mutual_count": 2},
+            {"id": self.erin.id, "username": "erin", "mutual_count": 1},
+        ])
+
+    def test_followed_since_are_dropped(self):
+        suggestions.compute_all()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.alice.following.add(self.dave)
+        response = self.client.get(reverse("suggestions"))
+        self.assertEqual([entry["username"] for entry in response.data], ["erin"])
+
+    def test_command_needs_a_shared_cache(self):
+        with self.assertRaises(CommandError):
+            call_command("compute_suggestions", stdout=StringIO())
+        with tempfile.TemporaryDirectory() as location, override_settings(CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": location},
+        }):
+            call_command("compute_suggestions", stdout=StringIO())
+            self.assertEqual(cache.get(suggestions.suggestions_key(self.alice.id))[0]["username"], "dave")
+
+    def test_cache_miss_computes_one_user(self):
+        self.assertEqual(
+            [(entry["username"], entry["mutual_count"]) for entry in suggestions.get_suggestions(self.bob)],
+            [("carol", 1)],
+        )
+
+
+class FollowListTests(APITestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user(username="alice", password="password123")
+        self.fans = [User.objects.create_user(username=f"fan{i}", password="password123") for i in range(5)]
+        self.alice.followers.add(*self.fans)
+        self.alice.following.add(*self.fans[:2])
+        self.client.force_authenticate(self.alice)
+
+    def test_followers_are_cursor_paginated(self):
+        url = reverse("followers-list")
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {"page_size": 2})
+        self.assertEqual(response.data["results"], [
+            {"id": self.fans[0].id, "username": "fan0"},
+            {"id": self.fans[1].id, "username": "fan1"},
+        ])
+        ids = [user["id"] for user in response.data["results"]]
+        while response.data["next"]:
+            response = self.client.get(response.data["next"])
+            ids += [user["id"] for user in response.data["results"]]
+        self.assertEqual(ids, [fan.id for fan in self.fans])
+
+    def test_following_list(self):
+        response = self.client.get(reverse("following-list"))
+        self.assertEqual([user["username"] for user in response.data["results"]], ["fan0", "fan1"])
+        self.assertIsNone(response.data["next"])
+
+    def test_ndjson_export(self):
+        response = self.client.get(reverse("followers-list"), {"export": "ndjson"})
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(
+            [json.loads(line) for line in lines],
+            [{"id": fan.id, "username": fan.username} for fan in self.fans],
+        )
+
+
+class TokenCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        token_cache.local.clear()
+        self.response = self.client.post(
+            reverse("register"), {"username": "alice", "password": "password123"}
+        )
+        self.key = Token.objects.get(user__username="alice").key
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.key}")
+
+    def test_registration_primes_cache(self):
+        # Only the profile lookup itself; authentication is served from cache
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("profile"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["username"], "alice")
+
+    def test_shared_tier_refills_local_tier(self):
+        with tempfile.TemporaryDirectory() as location, override_settings(CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": location},
+        }):
+            token_cache.local.clear()
+            self.client.get(reverse("profile"))
+            token_cache.local.clear()
+            with self.assertNumQueries(1):
+                self.client.get(reverse("profile"))
+            self.assertIsNotNone(token_cache.local.get(self.key))
+
+    def test_local_memory_is_not_a_shared_tier(self):
+        # Another process could never see this process's evictions
+        token_cache.local.clear()
+        with self.assertNumQueries(2):
+            self.client.get(reverse("profile"))
+        self.assertIsNone(cache.get(token_cache.shared_key(self.key)))
+
+    def test_miss_falls_back_to_database(self):
+        cache.clear()
+        token_cache.local.clear()
+        with self.assertNumQueries(2):
+            self.client.get(reverse("profile"))
+        with self.assertNumQueries(1):
+            self.client.get(reverse("profile"))
+
+    def test_login_primes_cache(self):
+        cache.clear()
+        token_cache.local.clear()
+        response = self.client.post(reverse("login"), {"username": "alice", "password": "password123"})
+        self.assertEqual(response.data["token"], self.key)
+        self.assertIsNotNone(token_cache.local.get(self.key))
+
+    def test_deleted_token_is_rejected(self):
+        self.client.get(reverse("profile"))
+        Token.objects.filter(key=self.key).delete()
+        response = self.client.get(reverse("profile"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_is_rejected(self):
+        self.client.get(reverse("profile"))
+        user = User.objects.get(username="alice")
+        user.is_active = False
+        user.save()
+        response = self.client.get(reverse("profile"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -6,13 +6,21 @@ from .views import (
     FollowUserView,
     UnfollowUserView,
     FollowingListView,
+    FollowersListView,
+    BulkFollowView,
+    SuggestionsView,
 )
+from .async_views import AsyncProfileView
 
 urlpatterns = [
     path('register/', RegisterView.as_view(), name='register'),
     path('login/', LoginView.as_view(), name='login'),
     path('profile/', ProfileView.as_view(), name='profile'),
+    path('async/profile/', AsyncProfileView.as_view(), name='async-profile'),
     path('follow/<int:user_id>/', FollowUserView.as_view(), name='follow-user'),
     path('unfollow/<int:user_id>/', UnfollowUserView.as_view(), name='unfollow-user'),
+    path('follow/bulk/', BulkFollowView.as_view(), name='bulk-follow'),
     path('following/', FollowingListView.as_view(), name='following-list'),
+    path('followers/', FollowersListView.as_view(), name='followers-list'),
+    path('suggestions/', SuggestionsView.as_view(), name='suggestions'),
 ]
@@ -1,10 +1,19 @@
+import json
+
+from django.http import StreamingHttpResponse
 from rest_framework import generics, status, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.authtoken.models import Token
 from django.contrib.auth import get_user_model
-from .serializers import UserRegistrationSerializer, UserLoginSerializer
-from .models import CustomUser
+from django.db import transaction
+from django_perf.tokencache.authentication import prime_token
+from posts.pagination import KeysetPagination
+from . import suggestions
+from .serializers import (
+    UserRegistrationSerializer, UserLoginSerializer, BulkFollowSerializer, UserSummarySerializer,
+)
+from .models import CustomUser, Follow
 
 User = get_user_model()
 
@@ -12,16 +21,20 @@ User = get_user_model()
 # ---------- User Registration ----------
 class RegisterView(generics.CreateAPIView):
     serializer_class = UserRegistrationSerializer
+    permission_classes = [permissions.AllowAny]
     queryset = CustomUser.objects.all()  # <-- Added for test visibility
 
 
 # ---------- User Login ----------
 class LoginView(APIView):
+    permission_classes = [permissions.AllowAny]
+
     def post(self, request):
         serializer = UserLoginSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         user = serializer.validated_data
         token, created = Token.objects.get_or_create(user=user)
+        prime_token(token)
         return Response({'token': token.key}, status=status.HTTP_200_OK)
 
 
@@ -30,12 +43,17 @@ class ProfileView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        user = request.user
+        # request.user may come from the token cache, whose copy does not
+        # see counter updates; read the counters themselves fresh.
+        user = CustomUser.objects.values(
+            'username', 'email', 'followers_count', 'following_count', 'posts_count'
+        ).get(pk=request.user.pk)
         return Response({
-            'username': user.username,
-            'email': user.email,
-            'followers': user.followers.count(),
-            'following': user.following.count(),
+            'username': user['username'],
+            'email': user['email'],
+            'followers': user['followers_count'],
+            'following': user['following_count'],
+            'posts': user['posts_count'],
         })
 
 
@@ -49,7 +67,7 @@ class FollowUserView(generics.GenericAPIView):
             target_user = CustomUser.objects.get(id=user_id)
             if target_user == request.user:
                 return Response({'detail': "You can't follow yourself."}, status=status.HTTP_400_BAD_REQUEST)
-            request.user.following.add(target_user)
+            request.user.following.add(target_user)  # a no-op if already following
             return Response({'detail': f'You are now following {target_user.username}.'}, status=status.HTTP_200_OK)
         except CustomUser.DoesNotExist:
             return Response({'detail': 'User not found.'}, status=status.HTTP_404_NOT_FOUND)
@@ -65,18 +83,116 @@ class UnfollowUserView(generics.GenericAPIView):
             target_user = CustomUser.objects.get(id=user_id)
             if target_user == request.user:
                 return Response({'detail': "You can't unfollow yourself."}, status=status.HTTP_400_BAD_REQUEST)
-            request.user.following.remove(target_user)
+            request.user.following.remove(target_user)  # a no-op if not following
             return Response({'detail': f'You have unfollowed {target_user.username}.'}, status=status.HTTP_200_OK)
         except CustomUser.DoesNotExist:
             return Response({'detail': 'User not found.'}, status=status.HTTP_404_NOT_FOUND)
 
 
-# ---------- List of Users the Current User Follows ----------
-class FollowingListView(generics.ListAPIView):
+# ---------- Followers / Following Lists ----------
+class FollowPagination(KeysetPagination):
+    page_size = 100
+    max_page_size = 1000
+
+
+class FollowListView(generics.ListAPIView):
+    """
+    Cursor-paginated list of the users on one side of the current user's
+    follow edges, ordered by user id and limited to ``id`` and ``username``.
+
+    ``?export=ndjson`` streams the whole list instead, one JSON object per
+    line, reading the follow table through a server-side cursor so memory
+    stays flat however many rows there are.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = UserSummarySerializer
+    pagination_class = FollowPagination
+    cursor_ordering = ('id',)
+    export_query_param = 'export'
+    export_chunk_size = 2000
+    # Reverse lookup from the listed users back to request.user
+    lookup = None
+
+    def get_queryset(self):
+        return CustomUser.objects.filter(**{self.lookup: self.request.user}).only('id', 'username')
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get(self.export_query_param) == 'ndjson':
+            return self.export()
+        return super().list(request, *args, **kwargs)
+
+    def export(self):
+        rows = self.get_queryset().order_by('id').values_list('id', 'username')
+
+        def lines():
+            for user_id, username in rows.iterator(chunk_size=self.export_chunk_size):
+                yield json.dumps({'id': user_id, 'username': username}) + '\n'
+
+        return StreamingHttpResponse(lines(), content_type='application/x-ndjson')
+
+
+class FollowingListView(FollowListView):
+    lookup = 'followers'
+
+
+class FollowersListView(FollowListView):
+    lookup = 'following'
+
+
+# ---------- Follow or Unfollow Many Users at Once ----------
+class BulkFollowView(generics.GenericAPIView):
+    """
+    Follow or unfollow up to ``FOLLOW_BULK_MAX_USERS`` users in one request.
+
+    Body: ``{"action": "follow" | "unfollow", "user_ids": [...]}``. The
+    change is one transaction with a single bulk INSERT (or DELETE) of the
+    follow rows. The response lists which ids changed, which were already in
+    the requested state and which do not exist.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = BulkFollowSerializer
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        action = serializer.validated_data['action']
+        user_ids = serializer.validated_data['user_ids']
+
+        if request.user.id in user_ids:
+            return Response({'detail': f"You can't {action} yourself."}, status=status.HTTP_400_BAD_REQUEST)
+
+        existing = set(CustomUser.objects.filter(id__in=user_ids).values_list('id', flat=True))
+        with transaction.atomic():
+            # Current state from the database, never the cached graph
+            followed = set(
+                Follow.objects.filter(from_customuser=request.user, to_customuser_id__in=existing)
+                .values_list('to_customuser_id', flat=True)
+            )
+            if action == 'follow':
+                changed = [user_id for user_id in user_ids if user_id in existing and user_id not in followed]
+            else:
+                changed = [user_id for user_id in user_ids if user_id in followed]
+            if changed:
+                if action == 'follow':
+                    request.user.following.add(*changed)
+                else:
+                    request.user.following.remove(*changed)
+
+        return Response({
+            'action': action,
+            'changed': changed,
+            'unchanged': [user_id for user_id in user_ids if user_id in existing and user_id not in set(changed)],
+            'not_found': [user_id for user_id in user_ids if user_id not in existing],
+        }, status=status.HTTP_200_OK)
+
+
+# ---------- Who to Follow ----------
+class SuggestionsView(APIView):
+    """
+    Friends-of-friends suggestions, ranked by mutual follows. Served from the
+    cache filled by ``manage.py compute_suggestions``.
+    """
     permission_classes = [permissions.IsAuthenticated]
-    queryset = CustomUser.objects.all()  # <-- Added for test visibility
 
     def get(self, request):
-        following_users = request.user.following.all()
-        data = [{'id': user.id, 'username': user.username} for user in following_users]
-        return Response(data)
+        return Response(suggestions.get_suggestions(request.user))
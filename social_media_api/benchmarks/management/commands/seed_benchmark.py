@@ -0,0 +1,113 @@
+"""
+Seed a large, realistically skewed dataset for the benchmarks.
+
+Users follow a power-law graph: most users follow a few dozen accounts, a
+few follow thousands, and a few accounts are followed by a large share of
+everyone (the "celebrities" the timeline merges at read time). Post
+authorship and comment targets are skewed the same way. Rows go in with
+``bulk_create`` and the denormalized counters are computed while generating,
+so no signal handler runs and no recount is needed afterwards.
+
+Use a scratch database: the command refuses to run twice on the same one.
+"""
+import random
+import time
+from array import array
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from django_perf.benchmarks.seeding import heavy_tailed, insert, power_law, sentence
+from posts.models import Comment, Post
+
+User = get_user_model()
+Follow = User.following.through
+
+PREFIX = 'bench'
+
+
+class Command(BaseCommand):
+    help = "Bulk-seed users, a power-law follow graph, posts and comments for the benchmarks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100_000)
+        parser.add_argument('--avg-following', type=int, default=20, help="Mean accounts followed per user.")
+        parser.add_argument('--posts', type=int, default=1_000_000)
+        parser.add_argument('--comments', type=int, default=2_000_000)
+        parser.add_argument('--alpha', type=float, default=0.9, help="Power-law exponent of popularity.")
+        parser.add_argument('--batch-size', type=int, default=5000, help="Rows per INSERT.")
+        parser.add_argument('--seed', type=int, default=42, help="Random seed, for reproducible datasets.")
+
+    def handle(self, *args, **options):
+        if User.objects.filter(username__startswith=PREFIX).exists():
+            raise CommandError("This database is already seeded; point the settings at a fresh one.")
+        rng = random.Random(options['seed'])
+        n_users, n_posts, batch_size = options['users'], options['posts'], options['batch_size']
+        started = time.perf_counter()
+
+        # Plan everything by index first, so the counters are known up front
+        popularity = power_law(n_users, options['alpha'], rng)
+        followers_from, followers_to = array('q'), array('q')
+        for follower in range(n_users):
+            wanted = min(n_users - 1, heavy_tailed(options['avg_following'], rng))
+            targets = set(rng.choices(range(n_users), cum_weights=popularity, k=wanted))
+            targets.discard(follower)
+            followers_from.extend([follower] * len(targets))
+            followers_to.extend(targets)
+        following_count = Counter(followers_from)
+        followers_count = Counter(followers_to)
+
+        activity = power_law(n_users, options['alpha'], rng)
+        post_authors = rng.choices(range(n_users), cum_weights=activity, k=n_posts)
+        posts_count = Counter(post_authors)
+        comment_posts = (
+            rng.choices(range(n_posts), cum_weights=power_law(n_posts, options['alpha'], rng),
+                        k=options['comments'])
+            if n_posts else []
+        )
+        comments_count = Counter(comment_posts)
+        self.log(f"Planned {len(followers_from)} follows", started)
+
+        password = make_password('benchmark')
+        with transaction.atomic():
+            user_pks = insert(User, (
+                User(
+                    username=f'{PREFIX}{i}', email=f'{PREFIX}{i}@example.com', password=password,
+                    followers_count=followers_count[i], following_count=following_count[i],
+                    posts_count=posts_count[i],
+                )
+                for i in range(n_users)
+            ), batch_size)
+            self.log(f"Inserted {n_users} users", started)
+
+            insert(Follow, (
+                Follow(from_customuser_id=user_pks[a], to_customuser_id=user_pks[b])
+                for a, b in zip(followers_from, followers_to)
+            ), batch_size)
+            self.log(f"Inserted {len(followers_from)} follows", started)
+
+            post_pks = insert(Post, (
+                Post(
+                    author_id=user_pks[author], title=sentence(rng, 3, 8).capitalize(),
+                    content=sentence(rng, 20, 80), comments_count=comments_count[i],
+                )
+                for i, author in enumerate(post_authors)
+            ), batch_size)
+            self.log(f"Inserted {n_posts} posts", started)
+
+            insert(Comment, (
+                Comment(
+                    post_id=post_pks[post], author_id=user_pks[rng.randrange(n_users)],
+                    content=sentence(rng, 5, 30),
+                )
+                for post in comment_posts
+            ), batch_size)
+            self.log(f"Inserted {len(comment_posts)} comments", started)
+
+        self.stdout.write(self.style.SUCCESS("Seeded. Run `manage.py run_benchmarks` next."))
+
+    def log(self, message, started):
+        self.stdout.write(f"[{time.perf_counter() - started:7.1f}s] {message}")
@@ -0,0 +1,77 @@
+"""
+Benchmark scenarios for the social media API: every list, detail, search
+and feed endpoint, sync and async, for a heavy and a typical user; and the
+post and comment pages ``benchmark_serializers`` renders.
+"""
+from django.contrib.auth import get_user_model
+from django.core.management.base import CommandError
+from rest_framework import serializers
+from rest_framework.authtoken.models import Token
+
+from posts.management.commands.benchmark_json import build_posts
+from posts.models import Post
+from posts.pagination import CursorOptInPagination
+from posts.serializers import CommentSerializer, PostSerializer
+from django_perf.benchmarks.runner import Scenario, SerializerCase
+
+User = get_user_model()
+
+
+def token_headers(user):
+    token, _ = Token.objects.get_or_create(user=user)
+    return {'HTTP_AUTHORIZATION': f'Token {token.key}'}
+
+
+def get_scenarios():
+    users = User.objects.only('id')
+    heavy = users.order_by('-following_count', 'id').first()
+    celebrity = users.order_by('-followers_count', 'id').first()
+    author = users.order_by('-posts_count', 'id').first()
+    post = Post.objects.only('id').order_by('-comments_count', 'id').first()
+    if post is None:
+        raise CommandError("No posts to benchmark; run `manage.py seed_benchmark` first.")
+    typical = users.order_by('following_count', 'id')[users.count() // 2]
+    last_page = -(-Post.objects.count() // CursorOptInPagination.page_size)
+
+    heavy_auth, typical_auth = token_headers(heavy), token_headers(typical)
+    return [
+        Scenario('post-list', '/api/posts/'),
+        Scenario('post-list-last-page', f'/api/posts/?page={last_page}'),
+        Scenario('post-list-cursor', '/api/posts/?pagination=cursor'),
+        Scenario('post-search', '/api/posts/?search=latency'),
+        Scenario('post-detail', f'/api/posts/{post.pk}/'),
+        Scenario('comment-list', '/api/comments/'),
+        Scenario('user-posts', f'/api/users/{author.pk}/posts/'),
+        Scenario('feed-heavy', '/api/feed/', headers=heavy_auth),
+        Scenario('feed-typical', '/api/feed/', headers=typical_auth),
+        Scenario('profile', '/api/accounts/profile/', headers=typical_auth),
+        Scenario('followers-celebrity', '/api/accounts/followers/', headers=token_headers(celebrity)),
+        Scenario('following-heavy', '/api/accounts/following/', headers=heavy_auth),
+        Scenario('suggestions', '/api/accounts/suggestions/', headers=typical_auth),
+        Scenario('async-post-list', '/api/async/posts/'),
+        Scenario('async-post-detail', f'/api/async/posts/{post.pk}/'),
+        Scenario('async-feed-heavy', '/api/async/feed/', headers=heavy_auth),
+    ]
+
+
+class DRFCommentSerializer(CommentSerializer):
+    to_representation = serializers.Serializer.to_representation
+
+
+class DRFPostSerializer(PostSerializer):
+    to_representation = serializers.Serializer.to_representation
+
+    def get_comments(self, obj):
+        # The implementation before read plans: a new nested serializer per post
+        latest = getattr(obj, 'latest_comments', None)
+        comments = latest[::-1] if latest is not None else obj.comments.all()
+        return DRFCommentSerializer(comments, many=True, context=self.context).data
+
+
+def get_serializer_cases(size):
+    posts = build_posts(size, 3)
+    comments = [comment for post in posts for comment in post.latest_comments][:size]
+    return {
+        'posts': SerializerCase(PostSerializer, posts, baseline=DRFPostSerializer),
+        'comments': SerializerCase(CommentSerializer, comments, baseline=DRFCommentSerializer),
+    }
@@ -0,0 +1,44 @@
+import json
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from posts.models import Comment, Post
+
+User = get_user_model()
+
+
+class BenchmarkTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        call_command('seed_benchmark', users=40, posts=200, comments=400, stdout=StringIO())
+
+    def test_seed_keeps_counters_consistent(self):
+        self.assertEqual(User.objects.count(), 40)
+        self.assertEqual(Comment.objects.count(), 400)
+        follows = User.following.through.objects.count()
+        self.assertGreater(follows, 0)
+        self.assertEqual(sum(User.objects.values_list('followers_count', flat=True)), follows)
+        self.assertEqual(sum(User.objects.values_list('posts_count', flat=True)), 200)
+        self.assertEqual(sum(Post.objects.values_list('comments_count', flat=True)), 400)
+        with self.assertRaises(CommandError):
+            call_command('seed_benchmark', users=1, posts=0, comments=0, stdout=StringIO())
+
+    def test_report(self):
+        out = StringIO()
+        call_command('run_benchmarks', repeat=2, warmup=0, stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertIn('feed-heavy', report['scenarios'])
+        for name, result in report['scenarios'].items():
+            self.assertEqual(result['status'], 200, name)
+            self.assertGreaterEqual(result['p99_ms'], result['p50_ms'])
+
+    def test_serializer_benchmark(self):
+        out = StringIO()
+        call_command('benchmark_serializers', sizes=[50], repeat=1, stdout=out)
+        for name, result in json.loads(out.getvalue())['50'].items():
+            self.assertTrue(result['identical_output'], name)
@@ -0,0 +1,175 @@
+"""
+Async (ASGI-native) variants of the read endpoints.
+
+DRF views are synchronous, so under ASGI every request to them holds a
+thread from the sync pool for its whole lifetime, including while it waits
+on the database. The views here are plain async Django views that talk to
+the database through the async ORM (``aiterator``, ``acount``, ``aget``,
+``aaggregate``), so one event loop can keep many requests in flight.
+
+They return the same JSON as their DRF counterparts and reuse the same
+serializers, pagination, conditional GET validators and authentication
+classes. Serialization itself never touches the database here: every query
+a serializer needs is prefetched before it runs.
+"""
+from asgiref.sync import sync_to_async
+from django.db.models import aprefetch_related_objects
+from django.http import Http404, HttpResponse
+from django.shortcuts import aget_object_or_404
+from django.contrib.auth import get_user_model
+from django.views import View
+from rest_framework import exceptions, permissions
+from rest_framework.filters import SearchFilter
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.views import exception_handler
+
+from django_perf.fastjson import FastJSONRenderer
+
+from .conditional import acompute_validators, aconditional_get, page_extra
+from .models import Post
+from .pagination import CursorOptInPagination
+from .serializers import PostSerializer
+from .views import FeedPagination
+from . import timeline
+
+User = get_user_model()
+
+
+class AsyncAPIView(View):
+    """
+    Minimal async counterpart of DRF's ``APIView`` for read-only JSON
+    endpoints. Authentication and permission checks use the project's DRF
+    classes; they run in a worker thread because they may hit the database
+    (the token cache usually spares them that).
+    """
+    http_method_names = ['get', 'head', 'options']
+    authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    permission_classes = api_settings.DEFAULT_PERMISSION_CLASSES
+    renderer = FastJSONRenderer()
+
+    async def dispatch(self, request, *args, **kwargs):
+        # View.options() and http_method_not_allowed() return coroutines on async views
+        if request.method == 'OPTIONS':
+            return await self.options(request, *args, **kwargs)
+        method = 'get' if request.method == 'HEAD' else request.method.lower()
+        handler = getattr(self, method, None) if method in self.http_method_names else None
+        if handler is None:
+            return await self.http_method_not_allowed(request, *args, **kwargs)
+
+        self.request = Request(request, authenticators=[auth() for auth in self.authentication_classes])
+        try:
+            await sync_to_async(self.check_permissions)(self.request)
+            return await handler(self.request, *args, **kwargs)
+        except (exceptions.APIException, Http404) as exc:
+            return self.handle_exception(exc)
+
+    def check_permissions(self, request):
+        for permission in [permission() for permission in self.permission_classes]:
+            if not permission.has_permission(request, self):
+                if request.authenticators and not request.successful_authenticator:
+                    raise exceptions.NotAuthenticated()
+                raise exceptions.PermissionDenied()
+
+    def handle_exception(self, exc):
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            authenticators = self.request.authenticators
+            auth_header = authenticators[0].authenticate_header(self.request) if authenticators else None
+            if auth_header:
+                exc.auth_header = auth_header
+            else:
+                exc.status_code = 403
+        return self.render(exception_handler(exc, {'view': self, 'request': self.request}))
+
+    def render(self, response):
+        """Turn a DRF ``Response`` into a plain, rendered ``HttpResponse``."""
+        rendered = HttpResponse(
+            self.renderer.render(response.data),
+            status=response.status_code,
+            content_type='application/json',
+        )
+        for header, value in response.items():
+            if header != 'Content-Type':
+                rendered[header] = value
+        return rendered
+
+
+# -----------------------
+# Posts
+# -----------------------
+class AsyncPostListView(AsyncAPIView):
+    """Async ``GET /posts/`` (``PostViewSet.list``)."""
+    pagination_class = CursorOptInPagination
+    cursor_ordering = ('-created_at', '-id')
+    search_fields = ['title', 'content']
+
+    async def get(self, request):
+        queryset = Post.objects.with_latest_comments().order_by('-created_at', '-id')
+        queryset = SearchFilter().filter_queryset(request, queryset, self)
+        # Paginate without the prefetches, then validate only the page's rows
+        paginator = self.pagination_class()
+        page = await paginator.apaginate_queryset(queryset.prefetch_related(None), request, view=self)
+        pks = [post.pk for post in page]
+        validators = await acompute_validators(
+            Post.objects.filter(pk__in=pks), with_comments=True, extra=[*page_extra(paginator), *pks],
+            dated=False,
+        )
+
+        async def render():
+            await aprefetch_related_objects(page, *queryset._prefetch_related_lookups)
+            serializer = PostSerializer(page, many=True, context={'request': request})
+            return self.render(paginator.get_paginated_response(serializer.data))
+
+        return await aconditional_get(request, validators, render)
+
+
+class AsyncPostDetailView(AsyncAPIView):
+    """Async ``GET /posts/<pk>/`` (``PostViewSet.retrieve``)."""
+
+    async def get(self, request, pk):
+        validators = await acompute_validators(Post.objects.filter(pk=pk), with_comments=True)
+
+        async def render():
+            post = await aget_object_or_404(Post.objects.with_comments(), pk=pk)
+            serializer = PostSerializer(post, context={'request': request})
+            return HttpResponse(self.renderer.render(serializer.data), content_type='application/json')
+
+        return await aconditional_get(request, validators, render)
+
+
+class AsyncFeedView(AsyncAPIView):
+    """Async ``GET /feed/`` (``FeedView``)."""
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = FeedPagination
+
+    async def get(self, request):
+        # The timeline lives in the cache; reading it stays synchronous
+        post_ids = await sync_to_async(timeline.get_timeline)(request.user)
+
+        paginator = self.pagination_class()
+        page_ids = await paginator.apaginate_queryset(post_ids, request, view=self)
+        validators = await acompute_validators(
+            Post.objects.filter(pk__in=page_ids), with_comments=True,
+            extra=[len(post_ids), *page_ids], dated=False,
+        )
+
+        async def render():
+            page = await timeline.ahydrate(page_ids, Post.objects.with_latest_comments())
+            serializer = PostSerializer(page, many=True, context={'request': request})
+            return self.render(paginator.get_paginated_response(serializer.data))
+
+        return await aconditional_get(request, validators, render)
+
+
+class AsyncUserPostsView(AsyncAPIView):
+    """Async ``GET /users/<user_id>/posts/`` (``UserPostsView``)."""
+    permission_classes = [permissions.AllowAny]
+    pagination_class = FeedPagination
+
+    async def get(self, request, user_id):
+        user = await aget_object_or_404(User.objects.only('id'), id=user_id)
+        queryset = Post.objects.with_latest_comments().filter(author=user).order_by('-created_at', '-id')
+        paginator = self.pagination_class()
+        page = await paginator.apaginate_queryset(queryset, request, view=self)
+        serializer = PostSerializer(page, many=True, context={'request': request})
+        return self.render(paginator.get_paginated_response(serializer.data))
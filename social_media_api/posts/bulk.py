@@ -0,0 +1,92 @@
+"""
+Bulk creation for the posts API.
+
+``POST /posts/bulk/`` and ``POST /comments/bulk/`` take a JSON list of
+objects. The whole list is validated first; if any item is invalid nothing
+is written and the response maps the index of each invalid item to its
+errors. Otherwise the rows are inserted with ``bulk_create`` in chunks
+inside one transaction.
+
+``bulk_create`` sends no ``post_save`` signals, so viewsets apply the side
+effects of a single create (counters, timelines) once per batch in
+``perform_bulk_create``.
+"""
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+
+def max_items():
+    """Largest list accepted by a bulk endpoint."""
+    return getattr(settings, 'BULK_CREATE_MAX_ITEMS', 1000)
+
+
+def batch_size():
+    """Rows per INSERT statement."""
+    return getattr(settings, 'BULK_CREATE_BATCH_SIZE', 500)
+
+
+class BatchedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    A primary key field that, inside a bulk list, resolves its values from
+    one ``in_bulk`` query per batch instead of one query per item.
+    """
+
+    def to_internal_value(self, data):
+        objects = getattr(self.root, 'batched_objects', {}).get(self.field_name)
+        if objects is None:
+            return super().to_internal_value(data)
+        try:
+            pk = self.get_queryset().model._meta.pk.to_python(data)
+        except (TypeError, ValueError, ValidationError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if pk not in objects:
+            self.fail('does_not_exist', pk_value=data)
+        return objects[pk]
+
+
+class BulkCreateListSerializer(serializers.ListSerializer):
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self.batched_objects = self._load_related(data)
+        return super().to_internal_value(data)
+
+    def _load_related(self, data):
+        objects = {}
+        for name, field in self.child.fields.items():
+            if not isinstance(field, BatchedPrimaryKeyRelatedField) or field.read_only:
+                continue
+            to_python = field.get_queryset().model._meta.pk.to_python
+            pks = set()
+            for item in data:
+                if isinstance(item, dict) and item.get(name) is not None:
+                    try:
+                        pks.add(to_python(item[name]))
+                    except (TypeError, ValueError, ValidationError):
+                        pass  # reported per item during validation
+            objects[name] = field.get_queryset().in_bulk(pks)
+        return objects
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        return model.objects.bulk_create(
+            [model(**attrs) for attrs in validated_data], batch_size=batch_size()
+        )
+
+
+class BulkCreateMixin:
+    """Adds a ``bulk`` list route to a model viewset."""
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        serializer = self.get_serializer(data=request.data, many=True, max_length=max_items())
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            self.perform_bulk_create(serializer)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def perform_bulk_create(self, serializer):
+        serializer.save()
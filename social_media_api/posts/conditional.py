@@ -0,0 +1,143 @@
+"""
+Conditional GET (ETag / Last-Modified) for the posts API.
+
+Validators are computed from one aggregate query over the rows a response is
+built from: their count and their latest ``updated_at``, plus the same for
+their comments when posts embed them. Lists are paginated first and only the
+page's rows are aggregated, so the query is bounded by the page size rather
+than the table. Nothing is serialized to compute them, so a client polling
+with ``If-None-Match`` or ``If-Modified-Since`` gets a 304 for the price of
+that query and the page's own.
+
+List responses carry only the ETag. The latest ``updated_at`` of a page says
+nothing about rows that were deleted or shifted onto or off it, so a
+``Last-Modified`` there would answer 304 to a stale page; the ETag covers the
+page's ids and shape as well.
+"""
+import hashlib
+
+from django.db.models import Count, Max, prefetch_related_objects
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+
+def compute_validators(queryset, with_comments=False, extra=(), dated=True):
+    """
+    Return ``(etag, last_modified)`` for ``queryset``.
+
+    ``extra`` values (e.g. the ids on a page) are mixed into the ETag.
+    ``last_modified`` is a Unix timestamp, or None for an empty queryset or
+    when ``dated`` is false (list pages).
+    """
+    values = queryset.order_by().aggregate(**_aggregates(with_comments))
+    return _validators(values, extra, dated)
+
+
+async def acompute_validators(queryset, with_comments=False, extra=(), dated=True):
+    """``compute_validators`` for async views."""
+    values = await queryset.order_by().aaggregate(**_aggregates(with_comments))
+    return _validators(values, extra, dated)
+
+
+def _aggregates(with_comments):
+    aggregates = {'rows': Count('id', distinct=with_comments), 'updated': Max('updated_at')}
+    if with_comments:
+        # MAX and COUNT of the joined column are not inflated by the join
+        aggregates['comment_rows'] = Count('comments')
+        aggregates['comment_updated'] = Max('comments__updated_at')
+    return aggregates
+
+
+def _validators(values, extra, dated):
+    timestamps = [value for key, value in values.items() if key.endswith('updated') and value]
+    last_modified = int(max(timestamps).timestamp()) if timestamps and dated else None
+
+    parts = [str(values[key]) for key in sorted(values)] + [str(value) for value in extra]
+    digest = hashlib.md5('|'.join(parts).encode()).hexdigest()
+    return f'W/"{digest}"', last_modified
+
+
+def page_extra(paginator):
+    """
+    What shapes a paginated response besides its rows, for the ETag of list
+    pages: the total and page number with page numbers, or whether there are
+    next and previous pages with cursors (their links derive from the rows).
+    """
+    paginator = getattr(paginator, 'keyset', None) or paginator
+    page = getattr(paginator, 'page', None)
+    if hasattr(page, 'paginator'):
+        return [page.paginator.count, page.number]
+    return [paginator.has_next, paginator.has_previous]
+
+
+def conditional_get(request, validators, render):
+    """
+    Answer 304 when the client's copy is current, otherwise call ``render``
+    and stamp the response with the validators.
+    """
+    etag, last_modified = validators
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return not_modified
+    return stamp(render(), validators)
+
+
+async def aconditional_get(request, validators, render):
+    """``conditional_get`` for async views; ``render`` is a coroutine function."""
+    etag, last_modified = validators
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return not_modified
+    return stamp(await render(), validators)
+
+
+def stamp(response, validators):
+    etag, last_modified = validators
+    if response.status_code == 200:
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    ETag / Last-Modified support for the ``list`` and ``retrieve`` actions
+    of a model viewset. Set ``conditional_with_comments`` on post viewsets so
+    comment changes are reflected too.
+    """
+    conditional_with_comments = False
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        # Paginate without the prefetches; they only run if the page is rendered
+        lookups = queryset._prefetch_related_lookups
+        page = self.paginate_queryset(queryset.prefetch_related(None))
+        rows = page if page is not None else list(queryset.prefetch_related(None))
+        pks = [row.pk for row in rows]
+        validators = compute_validators(
+            queryset.model._default_manager.filter(pk__in=pks), self.conditional_with_comments,
+            extra=[*(page_extra(self.paginator) if page is not None else ()), *pks], dated=False,
+        )
+
+        def render():
+            prefetch_related_objects(rows, *lookups)
+            serializer = self.get_serializer(rows, many=True)
+            if page is not None:
+                return self.get_paginated_response(serializer.data)
+            return Response(serializer.data)
+
+        return conditional_get(request, validators, render)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: kwargs[lookup_url_kwarg]}
+        )
+        validators = compute_validators(queryset, self.conditional_with_comments)
+
+        def render():
+            return super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs)
+
+        return conditional_get(request, validators, render)
@@ -0,0 +1,98 @@
+"""
+Micro-benchmark: DRF's stdlib JSON renderer/parser against django_perf.fastjson.
+
+Payloads are real ``PostSerializer`` output (a page of posts with their
+latest comments, and one post with a long comment thread) built from unsaved
+model instances, so no database is needed.
+"""
+import json
+import timeit
+from datetime import timedelta
+from io import BytesIO
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from django_perf import fastjson
+from posts.models import Comment, Post
+from posts.serializers import PostSerializer
+
+User = get_user_model()
+
+
+def build_posts(count, comments_per_post):
+    now = timezone.now()
+    users = [User(id=i, username=f'user{i}') for i in range(1, 21)]
+    posts = []
+    comment_id = 0
+    for i in range(count):
+        created = now - timedelta(minutes=i)
+        post = Post(
+            id=i + 1, author=users[i % len(users)], title=f'Post number {i} about Django performance',
+            content='Lorem ipsum dolor sit amet, consectetur adipiscing elit. ' * 8,
+            created_at=created, updated_at=created, comments_count=comments_per_post,
+        )
+        post.latest_comments = []
+        for j in range(comments_per_post):
+            comment_id += 1
+            post.latest_comments.append(Comment(
+                id=comment_id, post=post, author=users[(i + j) % len(users)],
+                content=f'Comment {j}: great point, thanks for sharing — ünïcode too.',
+                created_at=created, updated_at=created,
+            ))
+        posts.append(post)
+    return posts
+
+
+def page_payload(posts):
+    return {
+        'count': len(posts) * 10,
+        'next': 'http://testserver/api/posts/?page=2',
+        'previous': None,
+        'results': PostSerializer(posts, many=True).data,
+    }
+
+
+class Command(BaseCommand):
+    help = "Compare the stdlib and orjson-backed JSON renderer and parser on post payloads."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=100, help="Posts per list page.")
+        parser.add_argument('--comments', type=int, default=3, help="Comments embedded per listed post.")
+        parser.add_argument('--thread', type=int, default=500, help="Comments on the detail post.")
+        parser.add_argument('--number', type=int, default=50, help="Calls per timing run.")
+        parser.add_argument('--repeat', type=int, default=5, help="Timing runs; the best one is reported.")
+
+    def handle(self, *args, **options):
+        payloads = {
+            'post_list_page': page_payload(build_posts(options['page_size'], options['comments'])),
+            'post_detail_thread': PostSerializer(build_posts(1, options['thread'])[0]).data,
+        }
+        stdlib_renderer, fast_renderer = JSONRenderer(), fastjson.FastJSONRenderer()
+        stdlib_parser, fast_parser = JSONParser(), fastjson.FastJSONParser()
+
+        report = {'orjson': fastjson.orjson is not None}
+        for name, data in payloads.items():
+            body = stdlib_renderer.render(data)
+            report[name] = {
+                'bytes': len(body),
+                'identical_output': fast_renderer.render(data) == body,
+                'render': self.compare(
+                    lambda: stdlib_renderer.render(data), lambda: fast_renderer.render(data), options
+                ),
+                'parse': self.compare(
+                    lambda: stdlib_parser.parse(BytesIO(body)), lambda: fast_parser.parse(BytesIO(body)), options
+                ),
+            }
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def compare(self, stdlib, fast, options):
+        timings = {}
+        for label, func in (('stdlib_ms', stdlib), ('fast_ms', fast)):
+            best = min(timeit.repeat(func, number=options['number'], repeat=options['repeat']))
+            timings[label] = round(best / options['number'] * 1000, 3)
+        timings['speedup'] = round(timings['stdlib_ms'] / timings['fast_ms'], 1) if timings['fast_ms'] else None
+        return timings
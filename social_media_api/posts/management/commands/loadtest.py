@@ -0,0 +1,161 @@
+"""
+Concurrent load test for the sync and async read endpoints.
+
+Run the project under an ASGI server, then point the command at it:
+
+    uvicorn social_media_api.asgi:application --workers 1
+    python manage.py loadtest --username alice --password secret
+
+Every endpoint is hit by ``--concurrency`` keep-alive connections until
+``--requests`` responses are in, sync and async variants back to back, and a
+JSON report with throughput and latency percentiles is printed. The client
+is plain asyncio, so nothing beyond the standard library is needed.
+"""
+import asyncio
+import json
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+# (name, sync path, async path)
+ENDPOINTS = [
+    ('posts', '/api/posts/', '/api/async/posts/'),
+    ('feed', '/api/feed/', '/api/async/feed/'),
+    ('profile', '/api/accounts/profile/', '/api/accounts/async/profile/'),
+]
+
+
+async def _read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('connection closed')
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get('transfer-encoding') == 'chunked':
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length']))
+    return status, headers.get('connection', '').lower() != 'close'
+
+
+async def _worker(host, port, request, counter, latencies, errors):
+    reader = writer = None
+    while counter[0] > 0:
+        counter[0] -= 1
+        if writer is None:
+            reader, writer = await asyncio.open_connection(host, port)
+        started = time.perf_counter()
+        try:
+            writer.write(request)
+            await writer.drain()
+            status, keep_alive = await _read_response(reader)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            errors.append('connection')
+            writer.close()
+            writer = None
+            continue
+        latencies.append(time.perf_counter() - started)
+        if status >= 400:
+            errors.append(status)
+        if not keep_alive:
+            writer.close()
+            writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def run(url, total, concurrency, headers):
+    parts = urlsplit(url)
+    path = parts.path + (f'?{parts.query}' if parts.query else '')
+    lines = [f'GET {path} HTTP/1.1', f'Host: {parts.netloc}', 'Connection: keep-alive']
+    lines += [f'{name}: {value}' for name, value in headers.items()]
+    request = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+    counter = [total]
+    latencies = []
+    errors = []
+    started = time.perf_counter()
+    await asyncio.gather(*[
+        _worker(parts.hostname, parts.port or 80, request, counter, latencies, errors)
+        for _ in range(concurrency)
+    ])
+    elapsed = time.perf_counter() - started
+    return summarize(latencies, errors, elapsed)
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(latencies, errors, elapsed):
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'seconds': round(elapsed, 3),
+        'requests_per_second': round(len(latencies) / elapsed, 1) if elapsed else None,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2) if latencies else None,
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2) if latencies else None,
+    }
+
+
+def login(base_url, username, password):
+    from urllib.request import Request, urlopen
+
+    request = Request(
+        base_url + '/api/accounts/login/',
+        data=json.dumps({'username': username, 'password': password}).encode(),
+        headers={'Content-Type': 'application/json'},
+    )
+    with urlopen(request) as response:
+        return json.loads(response.read())['token']
+
+
+class Command(BaseCommand):
+    help = "Load test the sync and async read endpoints of a running server."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--token', help="Auth token to send (or use --username/--password).")
+        parser.add_argument('--username')
+        parser.add_argument('--password')
+        parser.add_argument('--requests', type=int, default=2000, help="Requests per endpoint.")
+        parser.add_argument('--concurrency', type=int, default=50, help="Open connections per endpoint.")
+        parser.add_argument(
+            '--endpoint', action='append', choices=[name for name, _, _ in ENDPOINTS],
+            help="Only test these endpoints (repeatable; default: all).",
+        )
+
+    def handle(self, *args, **options):
+        base_url = options['base_url'].rstrip('/')
+        token = options['token']
+        if token is None and options['username']:
+            token = login(base_url, options['username'], options['password'])
+        if token is None:
+            raise CommandError("The feed and profile need a user: pass --token or --username/--password.")
+        headers = {'Authorization': f'Token {token}'}
+
+        report = {}
+        for name, sync_path, async_path in ENDPOINTS:
+            if options['endpoint'] and name not in options['endpoint']:
+                continue
+            report[name] = {
+                variant: asyncio.run(run(base_url + path, options['requests'], options['concurrency'], headers))
+                for variant, path in (('sync', sync_path), ('async', async_path))
+            }
+        self.stdout.write(json.dumps(report, indent=2))
@@ -0,0 +1,39 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import timeline
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Rebuild materialized home timelines from the posts table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'user_ids', nargs='*', type=int,
+            help="Only rebuild the timelines of these users (default: every user).",
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help="Number of users loaded per query.",
+        )
+
+    def handle(self, *args, **options):
+        if isinstance(caches['default'], LocMemCache):
+            raise CommandError(
+                "The default cache is local memory, so the rebuilt timelines would vanish with this "
+                "process; configure a shared cache (REDIS_URL) first."
+            )
+        users = User.objects.only('id').order_by('id')
+        if options['user_ids']:
+            users = users.filter(id__in=options['user_ids'])
+
+        rebuilt = 0
+        for user in users.iterator(chunk_size=options['batch_size']):
+            timeline.build(user)
+            rebuilt += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rebuilt} timelines."))
@@ -0,0 +1,58 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from posts.models import Post, Comment
+
+User = get_user_model()
+Follow = User.following.through
+
+
+def count_of(model, field):
+    """Correlated ``COUNT(*)`` of ``model`` rows pointing at the outer row."""
+    rows = (
+        model.objects.filter(**{field: OuterRef('pk')})
+        .order_by().values(field)
+        .annotate(n=Count('*')).values('n')
+    )
+    return Coalesce(Subquery(rows, output_field=IntegerField()), 0)
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized follower, following, post and comment counters."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help="Number of rows updated per UPDATE statement.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        users = self.recount(User, batch_size, {
+            'followers_count': count_of(Follow, 'to_customuser'),
+            'following_count': count_of(Follow, 'from_customuser'),
+            'posts_count': count_of(Post, 'author'),
+        })
+        posts = self.recount(Post, batch_size, {
+            'comments_count': count_of(Comment, 'post'),
+        })
+
+        self.stdout.write(self.style.SUCCESS(f"Recounted {users} users and {posts} posts."))
+
+    def recount(self, model, batch_size, counters):
+        """Update ``counters`` in primary key ranges of ``batch_size`` rows."""
+        total = 0
+        last_pk = 0
+        while True:
+            pks = list(
+                model.objects.filter(pk__gt=last_pk).order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not pks:
+                return total
+            model.objects.filter(pk__gte=pks[0], pk__lte=pks[-1]).update(**counters)
+            total += len(pks)
+            last_pk = pks[-1]
@@ -1,17 +1,51 @@
 from django.db import models
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
 from django.conf import settings
+from django.contrib.auth import get_user_model
 
 User = settings.AUTH_USER_MODEL
 
+
+class PostQuerySet(models.QuerySet):
+    def with_comments(self):
+        """Load authors and every comment (with its author) in two queries."""
+        return self.select_related('author').prefetch_related(
+            models.Prefetch('comments', queryset=Comment.objects.select_related('author'))
+        )
+
+    def with_latest_comments(self, limit=None):
+        """
+        Load authors and only the latest ``limit`` comments of each post (as
+        ``latest_comments``), for list responses.
+        """
+        if limit is None:
+            limit = getattr(settings, 'POST_LIST_COMMENTS_LIMIT', 3)
+        latest = Comment.objects.select_related('author').order_by('-created_at', '-id')[:limit]
+        return self.select_related('author').prefetch_related(
+            models.Prefetch('comments', queryset=latest, to_attr='latest_comments')
+        )
+
+
 class Post(models.Model):
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='posts')
     title = models.CharField(max_length=255)
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Denormalized, see the signal handlers below
+    comments_count = models.IntegerField(default=0)
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination on (created_at, id), globally and per author
+            models.Index(fields=['created_at', 'id'], name='post_created_id_idx'),
+            models.Index(fields=['author', 'created_at', 'id'], name='post_author_created_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} by {self.author}"
@@ -26,6 +60,101 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            # Keyset pagination on (created_at, id), globally and per post
+            models.Index(fields=['created_at', 'id'], name='comment_created_id_idx'),
+            models.Index(fields=['post', 'created_at', 'id'], name='comment_post_created_id_idx'),
+        ]
 
     def __str__(self):
         return f"Comment by {self.author} on {self.post_id}"
+
+
+# Follow/unfollow changes which authors feed a user's home timeline, so the
+# materialized timeline is dropped and rebuilt on the next feed read.
+@receiver(m2m_changed, sender='accounts.CustomUser_following')
+def invalidate_timelines_on_follow_change(sender, instance, action, reverse, pk_set, **kwargs):
+    from . import timeline
+
+    if action in ('post_add', 'post_remove'):
+        user_ids = pk_set if reverse else [instance.pk]
+    elif action == 'pre_clear':
+        user_ids = instance.followers.values_list('id', flat=True) if reverse else [instance.pk]
+    else:
+        return
+    for user_id in user_ids:
+        timeline.invalidate(user_id)
+
+
+# -----------------------
+# Denormalized counters
+# -----------------------
+@receiver(post_save, sender=Post)
+def increment_posts_count(sender, instance, created, **kwargs):
+    if created:
+        get_user_model().objects.filter(pk=instance.author_id).update(posts_count=F('posts_count') + 1)
+
+
+def _deleted_model(origin):
+    """The model whose ``delete()`` started a (possibly cascading) deletion."""
+    return origin.model if isinstance(origin, models.QuerySet) else type(origin)
+
+
+@receiver(pre_delete, sender=Post)
+def decrement_posts_count(sender, instance, origin=None, **kwargs):
+    if _deleted_model(origin) is get_user_model():
+        return  # the author is being deleted too
+    get_user_model().objects.filter(pk=instance.author_id).update(posts_count=F('posts_count') - 1)
+
+
+@receiver(post_save, sender=Comment)
+def increment_comments_count(sender, instance, created, **kwargs):
+    if created:
+        Post.objects.filter(pk=instance.post_id).update(comments_count=F('comments_count') + 1)
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comments_count(sender, instance, origin=None, **kwargs):
+    # Comments removed by the cascade from a deleted post or user are
+    # accounted for by the receivers on those models, in one query.
+    if _deleted_model(origin) is Comment:
+        Post.objects.filter(pk=instance.post_id).update(comments_count=F('comments_count') - 1)
+
+
+@receiver(pre_delete, sender=User)
+def release_comment_counts(sender, instance, **kwargs):
+    """
+    A deleted user's comments go with them. Their own posts go too, so only
+    the counts of other users' posts need the grouped decrement.
+    """
+    counts = dict(
+        Comment.objects.filter(author=instance).exclude(post__author=instance).order_by()
+        .values('post_id').annotate(count=models.Count('id')).values_list('post_id', 'count')
+    )
+    _add(Post, 'comments_count', {pk: -count for pk, count in counts.items()})
+
+
+def count_bulk_posts(posts):
+    """Counter updates for posts inserted with bulk_create, which sends no signals."""
+    _increment(get_user_model(), 'posts_count', [post.author_id for post in posts])
+
+
+def count_bulk_comments(comments):
+    """Counter updates for comments inserted with bulk_create."""
+    _increment(Post, 'comments_count', [comment.post_id for comment in comments])
+
+
+def _increment(model, field, ids):
+    counts = {}
+    for pk in ids:
+        counts[pk] = counts.get(pk, 0) + 1
+    _add(model, field, counts)
+
+
+def _add(model, field, counts):
+    """Add ``{pk: amount}`` to ``field``: one UPDATE per distinct amount, not per row."""
+    by_amount = {}
+    for pk, amount in counts.items():
+        by_amount.setdefault(amount, []).append(pk)
+    for amount, pks in by_amount.items():
+        model.objects.filter(pk__in=pks).update(**{field: F(field) + amount})
@@ -0,0 +1,226 @@
+"""
+Keyset (cursor) pagination for posts, comments, the feed and follow lists.
+
+Page number pagination runs a ``COUNT(*)`` and an ``OFFSET`` scan that grows
+with the page number. Keyset pagination instead remembers the sort key of the
+last row it returned, ``(created_at, id)``, and asks for the rows after it, so
+every page is an index range scan no matter how deep it is.
+
+Clients opt in with ``?pagination=cursor`` and then follow the opaque
+``next``/``previous`` links. Requests without it keep the page number format.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginate on ``(created_at, id)`` using opaque cursor tokens.
+
+    The sort order comes from the view's ``cursor_ordering`` attribute and
+    defaults to newest first; ``('id',)`` paginates on the primary key alone.
+    Besides querysets, a list of ids sorted newest first (a materialized
+    timeline) can be paginated, in which case the id alone is used as the
+    key.
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    ordering = ('-created_at', '-id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        ordering = self._prepare(request, view)
+        if isinstance(queryset, list):
+            rows = self._slice_ids(queryset)
+        else:
+            rows = list(self._slice_queryset(queryset, ordering))
+        return self._finish(rows)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """``paginate_queryset`` for async views, fetching with the async ORM."""
+        ordering = self._prepare(request, view)
+        if isinstance(queryset, list):
+            rows = self._slice_ids(queryset)
+        else:
+            sliced = self._slice_queryset(queryset, ordering)
+            rows = [row async for row in sliced.aiterator(chunk_size=self.page_size + 1)]
+        return self._finish(rows)
+
+    def _prepare(self, request, view):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.cursor = self.decode_cursor(request)
+        ordering = getattr(view, 'cursor_ordering', self.ordering)
+        self.field = ordering[0].lstrip('-')
+        self.descending = ordering[0].startswith('-')
+        return ordering
+
+    def _finish(self, rows):
+        reverse = self.cursor is not None and self.cursor[2]
+        has_more = len(rows) > self.page_size
+        page = rows[:self.page_size]
+        if reverse:
+            page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+
+        self.page = page
+        return page
+
+    def _slice_queryset(self, queryset, ordering):
+        """Return the (unevaluated) queryset of the rows on this page, plus one."""
+        if self.cursor is None:
+            return queryset.order_by(*ordering)[:self.page_size + 1]
+
+        position, pk, reverse = self.cursor
+        lookup = 'lt' if self.descending != reverse else 'gt'
+        if position is None:
+            queryset = queryset.filter(**{f'pk__{lookup}': pk})
+        else:
+            queryset = queryset.filter(
+                Q(**{f'{self.field}__{lookup}': position})
+                | Q(**{self.field: position, f'pk__{lookup}': pk})
+            )
+        if reverse:
+            ordering = [f[1:] if f.startswith('-') else f'-{f}' for f in ordering]
+        return queryset.order_by(*ordering)[:self.page_size + 1]
+
+    def _slice_ids(self, ids):
+        if self.cursor is None:
+            return ids[:self.page_size + 1]
+
+        _, pk, reverse = self.cursor
+        if reverse:
+            newer = [post_id for post_id in ids if post_id > pk]
+            return newer[::-1][:self.page_size + 1]
+        return [post_id for post_id in ids if post_id < pk][:self.page_size + 1]
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    # -----------------------
+    # Cursor tokens
+    # -----------------------
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            data = json.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+            if not isinstance(data, dict):
+                raise ValueError(token)
+            position, pk, reverse = data.get('p'), data['i'], data.get('r', 0)
+            if type(pk) is not int or reverse not in (0, 1):
+                raise ValueError(token)
+            if position is not None:
+                position = datetime.fromisoformat(position)
+            return position, pk, bool(reverse)
+        except (TypeError, ValueError, KeyError, UnicodeEncodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, row, reverse=False):
+        if isinstance(row, int):
+            data = {'i': row}
+        elif self.field in ('id', 'pk'):
+            data = {'i': row.pk}
+        else:
+            data = {'p': getattr(row, self.field).isoformat(), 'i': row.pk}
+        if reverse:
+            data['r'] = 1
+        token = base64.urlsafe_b64encode(json.dumps(data, separators=(',', ':')).encode('ascii'))
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, token.decode('ascii'))
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1])
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+
+class CursorOptInPagination(PageNumberPagination):
+    """
+    Page number pagination that switches to keyset pagination when the
+    client asks for it with ``?pagination=cursor`` (or sends a cursor).
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    mode_query_param = 'pagination'
+    keyset_class = KeysetPagination
+
+    def use_cursor(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or self.keyset_class.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.use_cursor(request):
+            return self._make_keyset().paginate_queryset(queryset, request, view=view)
+        return super().paginate_queryset(queryset, request, view=view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """``paginate_queryset`` for async views, fetching with the async ORM."""
+        self.keyset = None
+        if self.use_cursor(request):
+            return await self._make_keyset().apaginate_queryset(queryset, request, view=view)
+        if isinstance(queryset, list):
+            return self.paginate_queryset(queryset, request, view=view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        paginator = self.django_paginator_class(queryset, page_size)
+        # Paginator.count is a cached property; fill it without a sync query
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+        self.page.object_list = [row async for row in self.page.object_list.aiterator(chunk_size=page_size)]
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        return list(self.page)
+
+    def _make_keyset(self):
+        self.keyset = self.keyset_class()
+        self.keyset.page_size = self.page_size
+        self.keyset.max_page_size = self.max_page_size
+        return self.keyset
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -1,25 +1,46 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
+from .bulk import BatchedPrimaryKeyRelatedField, BulkCreateListSerializer
 from .models import Post, Comment
+from django_perf.readplan import ReadPlanMixin
 
 User = get_user_model()
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(ReadPlanMixin, serializers.ModelSerializer):
     author = serializers.StringRelatedField(read_only=True)
     author_id = serializers.PrimaryKeyRelatedField(source='author', read_only=True)
+    post = BatchedPrimaryKeyRelatedField(queryset=Post.objects.all())
 
     class Meta:
         model = Comment
         fields = ['id', 'post', 'author', 'author_id', 'content', 'created_at', 'updated_at']
         read_only_fields = ['id', 'author', 'author_id', 'created_at', 'updated_at']
+        list_serializer_class = BulkCreateListSerializer
 
 
-class PostSerializer(serializers.ModelSerializer):
+class PostSerializer(ReadPlanMixin, serializers.ModelSerializer):
     author = serializers.StringRelatedField(read_only=True)
     author_id = serializers.PrimaryKeyRelatedField(source='author', read_only=True)
-    comments = CommentSerializer(many=True, read_only=True)  # nested read-only
+    comments = serializers.SerializerMethodField()  # nested read-only
 
     class Meta:
         model = Post
-        fields = ['id', 'author', 'author_id', 'title', 'content', 'created_at', 'updated_at', 'comments']
-        read_only_fields = ['id', 'author', 'author_id', 'created_at', 'updated_at', 'comments']
+        fields = ['id', 'author', 'author_id', 'title', 'content', 'created_at', 'updated_at',
+                  'comments', 'comments_count']
+        read_only_fields = ['id', 'author', 'author_id', 'created_at', 'updated_at',
+                            'comments', 'comments_count']
+        list_serializer_class = BulkCreateListSerializer
+
+    def get_comments(self, obj):
+        # List querysets only prefetch the latest comments (newest first);
+        # show them oldest first like the full comment list.
+        latest = getattr(obj, 'latest_comments', None)
+        comments = latest[::-1] if latest is not None else obj.comments.all()
+        return [self.comment_serializer.to_representation(comment) for comment in comments]
+
+    @cached_property
+    def comment_serializer(self):
+        # One nested serializer (and read plan) for the whole page, rather
+        # than building its fields again for every post
+        return CommentSerializer(context=self.context)
@@ -1,3 +1,485 @@
-from django.test import TestCase
+import base64
+import datetime
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import skipUnless
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from .models import Post, Comment
+from .serializers import CommentSerializer
+from . import timeline
+
+User = get_user_model()
+
+
+class FeedTimelineTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.reader = User.objects.create_user(username="reader", password="password123")
+        self.author = User.objects.create_user(username="author", password="password123")
+        self.stranger = User.objects.create_user(username="stranger", password="password123")
+        self.reader.following.add(self.author)
+        self.feed_url = reverse("feed")
+
+    def create_post(self, user, title):
+        user.refresh_from_db()  # pick up counters changed by earlier requests
+        self.client.force_authenticate(user)
+        with self.captureOnCommitCallbacks(execute=True):  # fan-out waits for the commit
+            response = self.client.post(reverse("post-list"), {"title": title, "content": "..."})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data["id"]
+
+    def get_feed_titles(self):
+        self.client.force_authenticate(self.reader)
+        response = self.client.get(self.feed_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [post["title"] for post in response.data["results"]]
+
+    def test_feed_contains_followed_posts_newest_first(self):
+        self.create_post(self.author, "first")
+        self.create_post(self.stranger, "not followed")
+        self.create_post(self.author, "second")
+        self.assertEqual(self.get_feed_titles(), ["second", "first"])
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+    def test_fan_out_drops_timelines_without_redis(self):
+        self.get_feed_titles()  # materialize the reader's timeline
+        self.create_post(self.author, "fresh")
+        self.assertIsNone(timeline.cached_ids(self.reader.id))
+        self.assertEqual(self.get_feed_titles(), ["fresh"])
+
+    @skipUnless(os.environ.get("REDIS_URL"), "needs a Redis server (REDIS_URL)")
+    def test_fan_out_pushes_onto_redis_lists(self):
+        with override_settings(CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": os.environ["REDIS_URL"]},
+        }):
+            cache.clear()
+            self.assertEqual(self.get_feed_titles(), [])
+            self.assertEqual(timeline.cached_ids(self.reader.id), [])
+            first = self.create_post(self.author, "first")
+            second = Post.objects.create(author=self.author, title="second", content="...")
+            timeline.fan_out_many([second])
+            timeline.fan_out(Post.objects.get(pk=first))  # a repeated push is harmless
+            self.assertEqual(timeline.cached_ids(self.reader.id), [second.id, first])
+            self.assertIsNone(timeline.cached_ids(self.stranger.id))
+            with override_settings(TIMELINE_MAX_LENGTH=1):
+                timeline.fan_out_many([Post.objects.create(author=self.author, title="third", content="...")])
+                self.assertEqual(len(timeline.cached_ids(self.reader.id)), 1)
+            cache.clear()
+
+    def test_follow_change_invalidates_timeline(self):
+        self.create_post(self.stranger, "now followed")
+        self.assertEqual(self.get_feed_titles(), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.reader.following.add(self.stranger)
+        self.assertEqual(self.get_feed_titles(), ["now followed"])
+
+    def test_deleted_posts_are_skipped(self):
+        self.get_feed_titles()
+        post_id = self.create_post(self.author, "gone")
+        Post.objects.filter(id=post_id).delete()
+        self.assertEqual(self.get_feed_titles(), [])
+
+    @override_settings(TIMELINE_CELEBRITY_THRESHOLD=1)
+    def test_celebrity_posts_are_merged_at_read_time(self):
+        self.get_feed_titles()
+        self.create_post(self.author, "celebrity post")
+        self.assertEqual(timeline.cached_ids(self.reader.id), [])
+        self.assertEqual(self.get_feed_titles(), ["celebrity post"])
+
+    def test_fan_out_waits_for_commit(self):
+        self.get_feed_titles()
+        self.client.force_authenticate(self.author)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.client.post(reverse("post-list"), {"title": "pending", "content": "..."})
+        self.assertEqual(timeline.cached_ids(self.reader.id), [])
+        self.assertEqual(len(callbacks), 1)
+
+    def test_rebuild_timelines_command(self):
+        post = Post.objects.create(author=self.author, title="imported", content="...")
+        with self.assertRaises(CommandError):  # the timelines would die with the command's process
+            call_command("rebuild_timelines", stdout=StringIO())
+        with tempfile.TemporaryDirectory() as location, override_settings(CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": location},
+        }):
+            call_command("rebuild_timelines", stdout=StringIO())
+            self.assertEqual(timeline.cached_ids(self.reader.id), [post.id])
+
+
+class CursorPaginationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="writer", password="password123")
+        self.posts = [
+            Post.objects.create(author=self.user, title=f"post {i}", content="...")
+            for i in range(5)
+        ]
+
+    def walk(self, url, params):
+        titles = []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn("count", response.data)
+            titles.extend(post["title"] for post in response.data["results"])
+            if not response.data["next"]:
+                return titles
+            response = self.client.get(response.data["next"])
+
+    def test_walks_every_post_once_newest_first(self):
+        titles = self.walk(reverse("post-list"), {"pagination": "cursor", "page_size": 2})
+        self.assertEqual(titles, [f"post {i}" for i in reversed(range(5))])
+
+    def test_previous_link_returns_to_earlier_page(self):
+        first = self.client.get(reverse("post-list"), {"pagination": "cursor", "page_size": 2})
+        second = self.client.get(first.data["next"])
+        back = self.client.get(second.data["previous"])
+        self.assertEqual(back.data["results"], first.data["results"])
+
+    def test_user_posts_cursor(self):
+        url = reverse("user-posts", args=[self.user.id])
+        titles = self.walk(url, {"pagination": "cursor", "page_size": 3})
+        self.assertEqual(len(titles), 5)
+
+    def test_page_number_is_default(self):
+        response = self.client.get(reverse("post-list"))
+        self.assertEqual(response.data["count"], 5)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse("post-list"), {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        for data in ([1], "x", 1, {"i": "1"}, {"i": 1, "r": "yes"}, {"i": 1, "p": 5}):
+            token = base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+            response = self.client.get(reverse("post-list"), {"pagination": "cursor", "cursor": token})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, data)
+
+    def test_feed_cursor(self):
+        reader = User.objects.create_user(username="follower", password="password123")
+        reader.following.add(self.user)
+        self.client.force_authenticate(reader)
+        titles = self.walk(reverse("feed"), {"pagination": "cursor", "page_size": 2})
+        self.assertEqual(titles, [f"post {i}" for i in reversed(range(5))])
+
+
+class PostQueryBudgetTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.users = [
+            User.objects.create_user(username=f"user{i}", password="password123")
+            for i in range(3)
+        ]
+        self.reader = self.users[0]
+        self.reader.following.add(*self.users[1:])
+
+    def seed(self, num_posts, comments_per_post):
+        for i in range(num_posts):
+            post = Post.objects.create(author=self.users[i % 3], title=f"post {i}", content="...")
+            for j in range(comments_per_post):
+                Comment.objects.create(post=post, author=self.users[j % 3], content=f"comment {j}")
+
+    def test_post_list_query_count_is_constant(self):
+        self.seed(num_posts=10, comments_per_post=8)
+        # ETag aggregate, COUNT(*), posts with authors, latest comments
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse("post-list"))
+        self.assertEqual(len(response.data["results"]), 10)
+
+    def test_post_list_embeds_latest_comments_and_count(self):
+        self.seed(num_posts=1, comments_per_post=8)
+        with self.settings(POST_LIST_COMMENTS_LIMIT=3):
+            response = self.client.get(reverse("post-list"))
+        post = response.data["results"][0]
+        self.assertEqual(post["comments_count"], 8)
+        self.assertEqual(
+            [comment["content"] for comment in post["comments"]],
+            ["comment 5", "comment 6", "comment 7"],
+        )
+
+    def test_post_detail_query_count(self):
+        self.seed(num_posts=1, comments_per_post=8)
+        post = Post.objects.get()
+        # ETag aggregate, post with author, comments with authors
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("post-detail", args=[post.id]))
+        self.assertEqual(len(response.data["comments"]), 8)
+        self.assertEqual(response.data["comments_count"], 8)
+
+    def test_feed_query_count_is_constant(self):
+        self.seed(num_posts=10, comments_per_post=5)
+        self.client.force_authenticate(self.reader)
+        self.client.get(reverse("feed"))  # materialize the timeline
+        # ETag aggregate, posts with authors, latest comments; the follow
+        # graph and celebrity set come from the cache
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("feed"))
+        self.assertEqual(len(response.data["results"]), 6)
+
+
+class ConditionalGetTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="writer", password="password123")
+        self.post = Post.objects.create(author=self.user, title="hello", content="...")
+
+    def assertRevalidates(self, url):
+        """Fetch ``url`` and check that its ETag answers 304; return the ETag."""
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        again = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(again.status_code, status.HTTP_304_NOT_MODIFIED)
+        return first["ETag"]
+
+    def test_post_detail_and_list(self):
+        for url in (reverse("post-detail", args=[self.post.id]), reverse("post-list")):
+            etag = self.assertRevalidates(url)
+            Comment.objects.create(post=self.post, author=self.user, content="new comment")
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_comment_edit_changes_post_etag(self):
+        comment = Comment.objects.create(post=self.post, author=self.user, content="first")
+        url = reverse("post-detail", args=[self.post.id])
+        etag = self.assertRevalidates(url)
+        comment.content = "edited"
+        comment.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_if_modified_since(self):
+        comment = Comment.objects.create(post=self.post, author=self.user, content="first")
+        url = reverse("comment-detail", args=[comment.id])
+        first = self.client.get(url)
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_deleting_from_a_list_page_is_not_a_304(self):
+        older = Post.objects.create(author=self.user, title="older", content="...")
+        Post.objects.filter(pk=older.pk).update(created_at=self.post.created_at - datetime.timedelta(days=1))
+        self.client.force_authenticate(self.user)
+        for url in (reverse("post-list"), reverse("async-post-list"), reverse("feed")):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn("Last-Modified", response)
+        self.assertIn("Last-Modified", self.client.get(reverse("post-detail", args=[self.post.id])))
+        url = reverse("post-list")
+        etag = self.client.get(url)["ETag"]
+        self.post.delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_list_validators_only_cover_the_page(self):
+        older = Post.objects.create(author=self.user, title="older", content="...")
+        Post.objects.filter(pk=older.pk).update(created_at=self.post.created_at - datetime.timedelta(days=1))
+        url = reverse("post-list") + "?pagination=cursor&page_size=1"
+        etag = self.assertRevalidates(url)
+        # The page row, then the aggregate over its pk only
+        with self.assertNumQueries(2) as captured:
+            self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertIn(f"IN ({self.post.pk})", captured.captured_queries[-1]["sql"])
+
+        Comment.objects.create(post=older, author=self.user, content="off the page")
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+        Comment.objects.create(post=self.post, author=self.user, content="on the page")
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_feed_poll_costs_one_query(self):
+        reader = User.objects.create_user(username="reader", password="password123")
+        reader.following.add(self.user)
+        self.client.force_authenticate(reader)
+        etag = self.assertRevalidates(reverse("feed"))
+        # ETag aggregate only
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("feed"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.post.title = "edited"
+        self.post.save()
+        response = self.client.get(reverse("feed"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+@override_settings(BULK_CREATE_BATCH_SIZE=2)
+class BulkCreateTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username="author", password="password123")
+        self.reader = User.objects.create_user(username="reader", password="password123")
+        self.reader.following.add(self.author)
+        self.client.force_authenticate(self.reader)
+        self.client.get(reverse("feed"))  # materialize the reader's timeline
+        self.client.force_authenticate(self.author)
+
+    def test_bulk_posts(self):
+        payload = [{"title": f"post {i}", "content": "..."} for i in range(5)]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse("post-bulk"), payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([post["title"] for post in response.data], [f"post {i}" for i in range(5)])
+        self.assertEqual(Post.objects.filter(author=self.author).count(), 5)
+
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.posts_count, 5)
+        ids = sorted((post["id"] for post in response.data), reverse=True)
+        self.assertEqual(timeline.get_timeline(self.reader), ids)
+
+    def test_invalid_item_rejects_whole_batch(self):
+        payload = [{"title": "fine", "content": "..."}, {"content": "no title"}]
+        response = self.client.post(reverse("post-bulk"), payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(list(response.data), [1])
+        self.assertIn("title", response.data[1])
+        self.assertFalse(Post.objects.exists())
+
+    @override_settings(BULK_CREATE_MAX_ITEMS=2)
+    def test_too_many_items(self):
+        payload = [{"title": "t", "content": "..."}] * 3
+        response = self.client.post(reverse("post-bulk"), payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_comments(self):
+        first = Post.objects.create(author=self.author, title="first", content="...")
+        second = Post.objects.create(author=self.author, title="second", content="...")
+        payload = [
+            {"post": first.id, "content": "a"},
+            {"post": second.id, "content": "b"},
+            {"post": first.id, "content": "c"},
+        ]
+        # post lookup, two INSERT chunks, one counter UPDATE per distinct
+        # amount, plus the savepoint
+        with self.assertNumQueries(7):
+            response = self.client.post(reverse("comment-bulk"), payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.comments_count, second.comments_count), (2, 1))
+
+    def test_bulk_comment_errors_are_per_item(self):
+        post = Post.objects.create(author=self.author, title="first", content="...")
+        payload = [{"post": post.id, "content": "ok"}, {"post": 9999, "content": "x"}, {"post": "abc", "content": "y"}]
+        response = self.client.post(reverse("comment-bulk"), payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(sorted(response.data), [1, 2])
+        self.assertIn("post", response.data[1])
+        self.assertIn("post", response.data[2])
+        self.assertFalse(Comment.objects.exists())
+
+
+class AsyncViewTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username="author", password="password123")
+        self.reader = User.objects.create_user(username="reader", password="password123")
+        self.reader.following.add(self.author)
+        for i in range(12):
+            post = Post.objects.create(author=self.author, title=f"post {i}", content="...")
+            Comment.objects.create(post=post, author=self.reader, content=f"comment {i}")
+        self.post = post
+        self.token = Token.objects.create(user=self.reader)
+
+    def assertSameResponse(self, sync_url, async_url, **params):
+        expected = self.client.get(sync_url, params)
+        actual = self.client.get(async_url, params)
+        self.assertEqual(actual.status_code, expected.status_code)
+        # Byte for byte, once pagination links point at the same views
+        self.assertEqual(actual.content.replace(b"/api/async/", b"/api/"), expected.content)
+        self.assertEqual(actual.get("ETag"), expected.get("ETag"))
+        return actual
+
+    def test_post_list_and_detail_match_sync_views(self):
+        self.assertSameResponse(reverse("post-list"), reverse("async-post-list"))
+        self.assertSameResponse(reverse("post-list"), reverse("async-post-list"), page=2)
+        self.assertSameResponse(reverse("post-list"), reverse("async-post-list"), search="post 1")
+        response = self.assertSameResponse(
+            reverse("post-list"), reverse("async-post-list"), pagination="cursor", page_size=5
+        )
+        next_url = response.json()["next"]
+        self.assertSameResponse(next_url.replace("/api/async/", "/api/"), next_url)
+        self.assertSameResponse(
+            reverse("post-detail", args=[self.post.id]), reverse("async-post-detail", args=[self.post.id])
+        )
+        self.assertSameResponse(reverse("post-detail", args=[9999]), reverse("async-post-detail", args=[9999]))
+
+    def test_user_posts_and_feed_match_sync_views(self):
+        self.assertSameResponse(
+            reverse("user-posts", args=[self.author.id]), reverse("async-user-posts", args=[self.author.id])
+        )
+        self.assertSameResponse(reverse("user-posts", args=[9999]), reverse("async-user-posts", args=[9999]))
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        self.assertSameResponse(reverse("feed"), reverse("async-feed"))
+        self.assertSameResponse(reverse("profile"), reverse("async-profile"))
+
+    def test_feed_requires_authentication(self):
+        response = self.client.get(reverse("async-feed"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response["WWW-Authenticate"], "Token")
+
+    async def test_async_client_revalidates(self):
+        headers = {"Authorization": f"Token {self.token.key}"}
+        first = await self.async_client.get(reverse("async-feed"), headers=headers)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(first.json()["results"]), 10)
+        again = await self.async_client.get(
+            reverse("async-feed"), headers={**headers, "If-None-Match": first["ETag"]}
+        )
+        self.assertEqual(again.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+class FastJSONTests(APITestCase):
+    def test_api_round_trip(self):
+        user = User.objects.create_user(username="writer", password="password123")
+        self.client.force_authenticate(user)
+        response = self.client.post(
+            reverse("post-list"), {"title": "caf\u00e9", "content": "..."}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        post = Post.objects.get()
+        self.assertEqual(post.title, "café")
+        response = self.client.get(reverse("post-detail", args=[post.id]))
+        self.assertEqual(response.content, JSONRenderer().render(response.data))
+        self.assertTrue(response.json()["created_at"].endswith("Z"))
+
+
+class ReadPlanTests(APITestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username="author", password="password123")
+        self.reader = User.objects.create_user(username="reader", password="password123")
+        for i in range(3):
+            post = Post.objects.create(author=self.author, title=f"Post {i}", content="...")
+            Comment.objects.create(post=post, author=self.reader, content=f"Comment {i}")
+
+    def get_pages(self):
+        return [
+            self.client.get(reverse("post-list")).content,
+            self.client.get(reverse("post-detail", args=[Post.objects.first().id])).content,
+            self.client.get(reverse("comment-list")).content,
+        ]
+
+    def test_output_matches_drf(self):
+        planned = self.get_pages()
+        with override_settings(SERIALIZER_READ_PLANS=False):
+            self.assertEqual(self.get_pages(), planned)
+
+    def test_current_timezone_is_respected(self):
+        comment = Comment.objects.select_related("author").first()
+        with timezone.override(datetime.timezone(datetime.timedelta(hours=2))):
+            data = CommentSerializer(comment).data
+            with override_settings(SERIALIZER_READ_PLANS=False):
+                self.assertEqual(CommentSerializer(comment).data, data)
+        self.assertTrue(data["created_at"].endswith("+02:00"))
+
+    def test_null_values(self):
+        comment = Comment(id=1, post_id=None, author=self.reader, content="...")
+        data = CommentSerializer(comment).data
+        self.assertIsNone(data["post"])
+        self.assertIsNone(data["created_at"])
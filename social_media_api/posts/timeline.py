@@ -0,0 +1,253 @@
+"""
+Materialized home timelines (fan-out on write).
+
+Every user who reads their feed gets a capped list of post ids stored in the
+cache, newest first. When a post is created its id is pushed onto the
+timeline of each follower (fan-out on write), so reading the feed is a single
+cache lookup plus hydrating one page of posts.
+
+Authors with a very large audience are not fanned out: pushing one post into
+hundreds of thousands of timelines is too expensive. Their recent posts are
+merged into the timeline at read time instead (hybrid mode).
+
+Post ids grow with ``created_at``, so the ids themselves are used as the sort
+key when merging lists.
+
+A fan-out must not read a timeline, add to it and write it back: two posts
+fanned out at once would each write their own copy and one id would be lost
+for good. With Redis as the default cache a timeline is a native list and the
+push is an atomic ``LPUSHX`` + ``LTRIM``. Other backends can only store the
+whole list, so there the fan-out drops the timelines it reaches and each is
+rebuilt from the database on its owner's next read.
+"""
+import heapq
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.core.cache.backends.redis import RedisCache
+
+from accounts import graph
+
+from .models import Post
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def max_length():
+    """Number of post ids kept per timeline."""
+    return _setting('TIMELINE_MAX_LENGTH', 800)
+
+
+def celebrity_threshold():
+    """Follower count from which an author is merged at read time."""
+    return _setting('TIMELINE_CELEBRITY_THRESHOLD', 10000)
+
+
+def fan_out_batch_size():
+    return _setting('TIMELINE_FAN_OUT_BATCH_SIZE', 500)
+
+
+def celebrity_cache_timeout():
+    return _setting('TIMELINE_CELEBRITY_CACHE_TIMEOUT', 60)
+
+
+def timeline_key(user_id):
+    return f'timeline:{user_id}'
+
+
+def celebrities_key():
+    return f'timeline:celebrities:{celebrity_threshold()}'
+
+
+# Redis has no empty lists, so every stored timeline ends with this marker
+_END = 0
+
+
+def _redis():
+    """The default cache when it is Redis, whose lists can be pushed onto atomically."""
+    backend = caches['default']
+    return backend if isinstance(backend, RedisCache) else None
+
+
+def _redis_key(backend, user_id):
+    return backend.make_and_validate_key(timeline_key(user_id))
+
+
+def cached_ids(user_id):
+    """The user's materialized timeline, newest first, or None if it isn't built."""
+    backend = _redis()
+    if backend is None:
+        return cache.get(timeline_key(user_id))
+    key = _redis_key(backend, user_id)
+    raw = backend._cache.get_client(key).lrange(key, 0, -1)
+    if not raw:
+        return None
+    # Pushes from concurrent fan-outs may land out of order
+    return sorted({int(post_id) for post_id in raw} - {_END}, reverse=True)[:max_length()]
+
+
+def _store(user_id, ids):
+    backend = _redis()
+    if backend is None:
+        cache.set(timeline_key(user_id), ids, timeout=None)
+        return
+    key = _redis_key(backend, user_id)
+    with backend._cache.get_client(key, write=True).pipeline() as pipe:
+        pipe.delete(key)
+        pipe.rpush(key, *ids, _END)
+        pipe.execute()
+
+
+def _merge(*id_lists):
+    """Merge id lists sorted newest first, dropping duplicates."""
+    merged = []
+    seen = set()
+    for post_id in heapq.merge(*id_lists, reverse=True):
+        if post_id not in seen:
+            seen.add(post_id)
+            merged.append(post_id)
+            if len(merged) == max_length():
+                break
+    return merged
+
+
+# -----------------------
+# Write path
+# -----------------------
+def is_celebrity(user):
+    return user.followers_count >= celebrity_threshold()
+
+
+def fan_out(post):
+    """Push a new post onto the timeline of every follower of its author."""
+    fan_out_many([post])
+
+
+def fan_out_many(posts):
+    """
+    Push new posts onto the timeline of every follower of their authors.
+
+    Only timelines that are already materialized are updated; the rest are
+    built from the database the first time their owner reads the feed. Each
+    timeline is written once, however many of the posts reach it.
+    """
+    post_ids_by_author = {}
+    authors = {}
+    for post in posts:
+        post_ids_by_author.setdefault(post.author_id, []).append(post.id)
+        if Post.author.is_cached(post):
+            authors[post.author_id] = post.author
+    missing = [author_id for author_id in post_ids_by_author if author_id not in authors]
+    if missing:
+        authors.update(get_user_model().objects.only('id', 'followers_count').in_bulk(missing))
+
+    new_ids = {}
+    for author_id, post_ids in post_ids_by_author.items():
+        if is_celebrity(authors[author_id]):
+            continue
+        for follower_id in graph.follower_ids(author_id):
+            new_ids.setdefault(follower_id, []).extend(post_ids)
+
+    follower_ids = list(new_ids)
+    for start in range(0, len(follower_ids), fan_out_batch_size()):
+        batch = follower_ids[start:start + fan_out_batch_size()]
+        _push({user_id: new_ids[user_id] for user_id in batch})
+
+
+def _push(new_ids):
+    """Add ``{user_id: post ids}`` to the materialized timelines among them."""
+    backend = _redis()
+    if backend is None:
+        cache.delete_many([timeline_key(user_id) for user_id in new_ids])
+        return
+    with backend._cache.get_client(write=True).pipeline(transaction=False) as pipe:
+        for user_id, post_ids in new_ids.items():
+            key = _redis_key(backend, user_id)
+            pipe.lpushx(key, *sorted(post_ids))
+            pipe.ltrim(key, 0, max_length())
+        pipe.execute()
+
+
+def invalidate(user_id):
+    """Drop a user's timeline, e.g. after they follow or unfollow someone."""
+    cache.delete(timeline_key(user_id))
+
+
+# -----------------------
+# Read path
+# -----------------------
+def all_celebrity_ids():
+    """
+    Ids of every author over the celebrity threshold. The set is small and
+    shared by all users, so it is cached briefly instead of being queried on
+    every feed read.
+    """
+    ids = cache.get(celebrities_key())
+    if ids is None:
+        ids = set(
+            get_user_model().objects.filter(followers_count__gte=celebrity_threshold())
+            .values_list('id', flat=True)
+        )
+        cache.set(celebrities_key(), ids, celebrity_cache_timeout())
+    return ids
+
+
+def celebrity_ids(user):
+    """Ids of the followed authors whose posts are merged at read time."""
+    celebrities = all_celebrity_ids()
+    return [user_id for user_id in graph.following_ids(user.id) if user_id in celebrities]
+
+
+def build(user):
+    """Rebuild a user's materialized timeline from the database."""
+    celebrities = all_celebrity_ids()
+    author_ids = [user_id for user_id in graph.following_ids(user.id) if user_id not in celebrities]
+    ids = []
+    if author_ids:
+        ids = list(
+            Post.objects.filter(author_id__in=author_ids).order_by('-created_at', '-id')
+            .values_list('id', flat=True)[:max_length()]
+        )
+    _store(user.id, ids)
+    return ids
+
+
+def get_timeline(user):
+    """
+    Return the ids of the posts in a user's home feed, newest first.
+
+    Combines the materialized timeline with recent posts from followed
+    celebrities.
+    """
+    ids = cached_ids(user.id)
+    if ids is None:
+        ids = build(user)
+
+    celebrities = celebrity_ids(user)
+    if celebrities:
+        recent = list(
+            Post.objects.filter(author__in=celebrities).order_by('-created_at', '-id')
+            .values_list('id', flat=True)[:max_length()]
+        )
+        ids = _merge(ids, recent)
+    return ids
+
+
+def hydrate(post_ids, queryset=None):
+    """Load posts for a page of ids, keeping the timeline order."""
+    if queryset is None:
+        queryset = Post.objects.all()
+    posts = queryset.in_bulk(post_ids)
+    # Posts deleted since they were fanned out are simply skipped.
+    return [posts[post_id] for post_id in post_ids if post_id in posts]
+
+
+async def ahydrate(post_ids, queryset=None):
+    """``hydrate`` for async views."""
+    if queryset is None:
+        queryset = Post.objects.all()
+    posts = await queryset.ain_bulk(post_ids)
+    return [posts[post_id] for post_id in post_ids if post_id in posts]
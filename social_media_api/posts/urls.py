@@ -1,6 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import PostViewSet, CommentViewSet, FeedView
+from .views import PostViewSet, CommentViewSet, FeedView, UserPostsView
+from .async_views import AsyncPostListView, AsyncPostDetailView, AsyncFeedView, AsyncUserPostsView
 
 router = DefaultRouter()
 router.register(r'posts', PostViewSet)
@@ -9,4 +10,11 @@ router.register(r'comments', CommentViewSet)
 urlpatterns = [
     path('', include(router.urls)),
     path('feed/', FeedView.as_view(), name='feed'),
+    path('users/<int:user_id>/posts/', UserPostsView.as_view(), name='user-posts'),
+
+    # Async variants for ASGI deployments (posts/async_views.py)
+    path('async/posts/', AsyncPostListView.as_view(), name='async-post-list'),
+    path('async/posts/<int:pk>/', AsyncPostDetailView.as_view(), name='async-post-detail'),
+    path('async/feed/', AsyncFeedView.as_view(), name='async-feed'),
+    path('async/users/<int:user_id>/posts/', AsyncUserPostsView.as_view(), name='async-user-posts'),
 ]
@@ -3,12 +3,16 @@ from rest_framework import viewsets, permissions, status, filters
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework.pagination import PageNumberPagination
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import get_user_model
+from django.db import transaction
 
-from .models import Post, Comment
+from .models import Post, Comment, count_bulk_comments, count_bulk_posts
 from .serializers import PostSerializer, CommentSerializer
+from .pagination import CursorOptInPagination
+from .bulk import BulkCreateMixin
+from .conditional import ConditionalGetMixin, compute_validators, conditional_get
+from . import timeline
 
 User = get_user_model()
 
@@ -28,34 +32,57 @@ class IsOwnerOrReadOnly(permissions.BasePermission):
 # -----------------------
 # Post and Comment ViewSets
 # -----------------------
-class PostViewSet(viewsets.ModelViewSet):
+class PostViewSet(BulkCreateMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     # Ensure the exact substring is present for checks
     queryset = Post.objects.all()
     serializer_class = PostSerializer
     permission_classes = [IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
     filter_backends = [filters.SearchFilter]
     search_fields = ['title', 'content']
-    pagination_class = PageNumberPagination
+    pagination_class = CursorOptInPagination
+    cursor_ordering = ('-created_at', '-id')
+    conditional_with_comments = True
+
+    def get_queryset(self):
+        if self.action == 'list':
+            return Post.objects.with_latest_comments().order_by('-created_at', '-id')
+        return Post.objects.with_comments()
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user)
+        post = serializer.save(author=self.request.user)
+        # Push the new post into followers' home timelines once it is visible to them
+        transaction.on_commit(lambda: timeline.fan_out(post))
 
+    def perform_bulk_create(self, serializer):
+        posts = serializer.save(author=self.request.user)
+        count_bulk_posts(posts)
+        transaction.on_commit(lambda: timeline.fan_out_many(posts))
+        for post in posts:
+            post.latest_comments = []  # nothing to load for brand new posts
 
-class CommentViewSet(viewsets.ModelViewSet):
+
+class CommentViewSet(BulkCreateMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     # Ensure the exact substring is present for checks
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
     permission_classes = [IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
-    pagination_class = PageNumberPagination
+    pagination_class = CursorOptInPagination
+    cursor_ordering = ('created_at', 'id')
+
+    def get_queryset(self):
+        return Comment.objects.select_related('author')
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
+    def perform_bulk_create(self, serializer):
+        count_bulk_comments(serializer.save(author=self.request.user))
+
 
 # -----------------------
 # Feed View (posts from users current user follows)
 # -----------------------
-class FeedPagination(PageNumberPagination):
+class FeedPagination(CursorOptInPagination):
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 100
@@ -65,22 +92,33 @@ class FeedView(APIView):
     """
     Return a paginated feed of posts from users the current user follows,
     ordered by newest first.
+
+    The feed is read from the user's materialized timeline (see
+    ``posts.timeline``), so only the posts on the requested page are loaded.
     """
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = FeedPagination
 
     def get(self, request, *args, **kwargs):
-        # Get the users the requester follows (must match check substring)
-        following_users = request.user.following.all()
-
-        # Build queryset: posts by followed users, ordered newest first
-        qs = Post.objects.filter(author__in=following_users).order_by('-created_at')
+        # Pre-sorted post ids, newest first
+        post_ids = timeline.get_timeline(request.user)
 
-        # Paginate
+        # Paginate the ids, then hydrate only the current page
         paginator = self.pagination_class()
-        page = paginator.paginate_queryset(qs, request, view=self)
-        serializer = PostSerializer(page, many=True, context={'request': request})
-        return paginator.get_paginated_response(serializer.data)
+        page_ids = paginator.paginate_queryset(post_ids, request, view=self)
+
+        # Polling clients get a 304 after a single aggregate query
+        validators = compute_validators(
+            Post.objects.filter(pk__in=page_ids), with_comments=True,
+            extra=[len(post_ids), *page_ids], dated=False,
+        )
+
+        def render():
+            page = timeline.hydrate(page_ids, Post.objects.with_latest_comments())
+            serializer = PostSerializer(page, many=True, context={'request': request})
+            return paginator.get_paginated_response(serializer.data)
+
+        return conditional_get(request, validators, render)
 
 
 # Optional convenience endpoint: posts for a specific user (owner or any)
@@ -93,7 +131,7 @@ class UserPostsView(APIView):
 
     def get(self, request, user_id, *args, **kwargs):
         user = get_object_or_404(User, id=user_id)
-        qs = Post.objects.filter(author=user).order_by('-created_at')
+        qs = Post.objects.with_latest_comments().filter(author=user).order_by('-created_at', '-id')
         paginator = self.pagination_class()
         page = paginator.paginate_queryset(qs, request, view=self)
         serializer = PostSerializer(page, many=True, context={'request': request})
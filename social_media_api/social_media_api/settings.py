@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -44,9 +45,14 @@ INSTALLED_APPS = [
     'accounts',
     'posts',
     'django_filters',
+    'django_perf.instrumentation',
+    'django_perf.benchmarks',
+    'django_perf.tokencache',
+    'benchmarks',
 ]
 
 MIDDLEWARE = [
+    'django_perf.instrumentation.middleware.InstrumentationMiddleware',  # outermost, so it times everything
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -134,7 +140,7 @@ AUTH_USER_MODEL = 'accounts.User'
 # DRF global settings (optional but recommended)
 REST_FRAMEWORK = {
 'DEFAULT_AUTHENTICATION_CLASSES': [
-'rest_framework.authentication.TokenAuthentication',
+'django_perf.tokencache.authentication.CachedTokenAuthentication',
 'rest_framework.authentication.SessionAuthentication',
 ],
 'DEFAULT_PERMISSION_CLASSES': [
@@ -148,6 +154,16 @@ MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
 REST_FRAMEWORK.update({
+    # orjson-backed when installed, stdlib json otherwise (django_perf/fastjson.py)
+    'DEFAULT_RENDERER_CLASSES': [
+        'django_perf.fastjson.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'django_perf.fastjson.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
     'DEFAULT_FILTER_BACKENDS': [
@@ -156,3 +172,43 @@ REST_FRAMEWORK.update({
     ],
 })
 AUTH_USER_MODEL = 'accounts.CustomUser'
+
+# Timelines, the follow graph, suggestions and the token cache must be shared
+# by every worker: local memory is only for tests and single-process runs.
+# Set REDIS_URL in production.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+if os.environ.get('REDIS_URL'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['REDIS_URL'],
+    }
+
+# Home timelines (posts/timeline.py)
+TIMELINE_MAX_LENGTH = 800  # post ids kept per user
+TIMELINE_CELEBRITY_THRESHOLD = 10000  # authors with more followers are merged at read time
+
+# Bulk create endpoints (posts/bulk.py)
+BULK_CREATE_MAX_ITEMS = 1000  # objects per request
+BULK_CREATE_BATCH_SIZE = 500  # rows per INSERT
+
+# Precompiled serializer read path (django_perf/readplan.py); False falls back to DRF's
+SERIALIZER_READ_PLANS = True
+
+# Follow graph (accounts/graph.py)
+FOLLOW_GRAPH_TIMEOUT = 3600  # seconds an adjacency list stays cached
+FOLLOW_BULK_MAX_USERS = 100  # user ids per bulk follow/unfollow request
+SUGGESTIONS_LIMIT = 20  # "who to follow" entries kept per user (accounts/suggestions.py)
+
+# Token lookup cache (django_perf/tokencache/authentication.py)
+TOKEN_CACHE_MAX_SIZE = 10000  # entries in each process's LRU
+TOKEN_CACHE_LOCAL_TTL = 10  # seconds; bounds staleness in other processes
+TOKEN_CACHE_SHARED_TTL = 300  # seconds in the shared cache
+
+# Query and latency instrumentation (django_perf/instrumentation/middleware.py)
+INSTRUMENTATION_SAMPLE_RATE = 1.0 if DEBUG else 0.1  # share of requests whose queries are recorded
+INSTRUMENTATION_SERVER_TIMING = True  # Server-Timing header on sampled responses to INTERNAL_IPS (any in DEBUG)
+INSTRUMENTATION_METRICS_TOKEN = None  # bearer token for /metrics/; unset: INTERNAL_IPS only (any in DEBUG)
@@ -7,6 +7,7 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/accounts/', include('accounts.urls')),
     path('api/', include('posts.urls')),   # or 'api/posts/' if you prefer
+    path('metrics/', include('django_perf.instrumentation.urls')),
 
 ]
 